@@ -0,0 +1,7 @@
+"""
+Benchmark suite - timings for the fetch, parse, classify, filter, summary and analysis stages
+
+Feeds and AI responses come from local stub servers, so runs need
+no network and are repeatable. Results are appended to a JSON history and
+compared with the previous run. See python -m benchmarks --help.
+"""
@@ -0,0 +1,135 @@
+"""
+Benchmark runner - time the pipeline stages and record them in a JSON history
+
+Usage:
+    python -m benchmarks
+    python -m benchmarks --stage classify --stage filter --quick
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import rss_collector.ai as ai
+import rss_collector.fetch as fetch
+
+from .server import StubFeedServer, StubMessagesServer
+from .stages import STAGE_SIZES, STAGES, BenchmarkContext
+
+HISTORY_PATH = os.path.join(os.path.dirname(__file__), 'history.json')
+REGRESSION_RATIO = 1.2  # Slower than the previous run by this much is flagged
+
+
+def measure(fn, repeat):
+    """
+    Time fn repeat times after one untimed warm-up call
+    Returns: (best, median) in seconds
+    """
+    fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings), statistics.median(timings)
+
+
+def git_revision():
+    """Short commit hash of the working tree, or None outside a checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(__file__)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    """Previous runs, oldest first"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def save_history(path, history):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2)
+        f.write('\n')
+
+
+def result_key(result):
+    return (result['stage'], result['name'], result['size'])
+
+
+def run_benchmarks(stages, quick, repeat, previous):
+    """
+    Run the selected stages against the stub server, printing as they go
+    Returns: list of result dicts
+    """
+    previous_best = {result_key(result): result['best'] for result in previous}
+    results = []
+    
+    # Pace nothing: the benchmarks measure our own overhead, not the politeness budget
+    fetch.HOST_REQUESTS_PER_SECOND = 1e9
+    fetch.HOST_BURST = 1e9
+    
+    with StubFeedServer() as server, StubMessagesServer() as api, \
+            tempfile.TemporaryDirectory(prefix='rss-bench-') as directory:
+        fetch.GOOGLE_NEWS_RSS_URL = server.url
+        ai.ANTHROPIC_API_URL = api.url
+        context = BenchmarkContext(directory)
+        for stage in stages:
+            sizes = STAGE_SIZES[stage][:1] if quick else STAGE_SIZES[stage]
+            for size in sizes:
+                for name, fn in STAGES[stage](size, context):
+                    best, median = measure(fn, repeat)
+                    result = {'stage': stage, 'name': name, 'size': size, 'best': best, 'median': median}
+                    results.append(result)
+                    
+                    line = f"{stage:<9} {name:<45} {size:>9,} {best * 1000:>11.2f} ms {median * 1000:>11.2f} ms"
+                    before = previous_best.get(result_key(result))
+                    if before:
+                        ratio = best / before
+                        line += f"  {ratio:5.2f}x" + ("  SLOWER" if ratio > REGRESSION_RATIO else "")
+                    print(line, flush=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.splitlines()[1])
+    parser.add_argument('--stage', action='append', choices=list(STAGES),
+                        help="stage to run, may be repeated (default: all)")
+    parser.add_argument('--quick', action='store_true', help="only the smallest size of each stage")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per benchmark (default: %(default)s)")
+    parser.add_argument('--history', default=HISTORY_PATH, help="JSON history file (default: %(default)s)")
+    parser.add_argument('--no-save', action='store_true', help="compare with the history but do not append to it")
+    args = parser.parse_args(argv)
+    
+    history = load_history(args.history)
+    previous = history[-1]['results'] if history else []
+    print(f"{'stage':<9} {'benchmark':<45} {'size':>9} {'best':>14} {'median':>14}")
+    results = run_benchmarks(args.stage or list(STAGES), args.quick, args.repeat, previous)
+    
+    if not args.no_save:
+        history.append({
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'results': results
+        })
+        save_history(args.history, history)
+        print(f"Saved to {args.history}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
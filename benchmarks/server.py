@@ -0,0 +1,132 @@
+"""
+Stub servers - fixture feeds and a stand-in Messages API on localhost
+
+The feed server answers any path with the fixture feed for its ?q= query
+and honours If-None-Match, so the fetch benchmarks exercise the same
+conditional GET and 304 paths as the live service. The Messages API stub
+answers every prompt with a short canned summary after a fixed delay.
+"""
+
+import hashlib
+import http.server
+import json
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+from .fixtures import feed_xml
+
+
+class FeedHandler(http.server.BaseHTTPRequestHandler):
+    """Serve the fixture feed for the request's query"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query).get('q', [''])[0]
+        body = self.server.feed(query)
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml; charset=UTF-8')
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubFeedServer(http.server.ThreadingHTTPServer):
+    """
+    Threaded local server; use as a context manager
+    Feed bodies are generated once per query and kept in memory, so the
+    server itself costs next to nothing inside a timing.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FeedHandler)
+        self.bodies = {}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        """Base URL to use in place of GOOGLE_NEWS_RSS_URL"""
+        return f"http://127.0.0.1:{self.server_address[1]}/rss/search"
+
+    def feed(self, query):
+        with self.lock:
+            if query not in self.bodies:
+                self.bodies[query] = feed_xml(query)
+            return self.bodies[query]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+class MessagesHandler(http.server.BaseHTTPRequestHandler):
+    """Answer Messages API requests with a canned response"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        prompt = request['messages'][0]['content']
+        self.server.record(prompt)
+        time.sleep(self.server.latency)
+        
+        text = f"- Summary of a {len(prompt)} character prompt\n- Main theme: coverage volume"
+        body = json.dumps({'content': [{'type': 'text', 'text': text}]}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubMessagesServer(http.server.ThreadingHTTPServer):
+    """
+    Threaded local stand-in for the Messages API; use as a context manager
+    latency is slept per request to model the real service, so bounded
+    concurrency shows up in the timings. Prompts received are counted and
+    kept in arrival order, for tests that check what was sent.
+    """
+    daemon_threads = True
+
+    def __init__(self, latency=0.05):
+        super().__init__(('127.0.0.1', 0), MessagesHandler)
+        self.latency = latency
+        self.requests = 0
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        """URL to use in place of ANTHROPIC_API_URL"""
+        return f"http://127.0.0.1:{self.server_address[1]}/v1/messages"
+
+    def record(self, prompt):
+        with self.lock:
+            self.requests += 1
+            self.prompts.append(prompt)
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,316 @@
+"""
+Benchmark stages - one function per pipeline stage
+
+Each stage function takes its size and a BenchmarkContext and returns a
+list of (name, callable) pairs. Setup happens in the stage function; only
+the callables are timed.
+"""
+
+import itertools
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+import feedparser
+
+import rss_collector.fetch as fetch
+from rss_collector.ai import AnalysisCache, analyze_articles
+from rss_collector.classify import calculate_reach_tier, categorize_source, classify_source
+from rss_collector.collect import collect_articles
+from rss_collector.enrich import classify_sources, day_to_date
+from rss_collector.export import available_formats, export_bytes
+from rss_collector.filters import FilterEngine
+from rss_collector.keywords import keyword_counts
+from rss_collector.parse import feedparser_columns, stream_feed_columns
+from rss_collector.store import ArticleStore
+from rss_collector.summary import coverage_stats, rollup_stats
+
+from .fixtures import article_set, benchmark_keywords, feed_xml, overlapping_keywords, source_names
+
+# Default sizes per stage; --quick keeps only the first
+STAGE_SIZES = {
+    'fetch': [1, 25],  # keywords
+    'parse': [100],  # items per feed
+    'classify': [10_000, 100_000, 1_000_000],  # source names
+    'filter': [10_000, 100_000],  # articles
+    'summary': [10_000, 100_000],  # articles
+    'analysis': [1_000, 5_000],  # articles
+    'ingest': [10_000, 100_000],  # articles already stored
+    'export': [10_000, 100_000],  # articles exported
+}
+
+
+class BenchmarkContext:
+    """Shared state for a run: the scratch directory feed caches and stores go in"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def scratch(self, prefix):
+        """A fresh empty directory under the run's scratch space"""
+        return tempfile.mkdtemp(prefix=prefix, dir=self.directory)
+
+
+def _with_ttl(ttl, fn):
+    """Run fn with FEED_CACHE_TTL temporarily set to ttl"""
+    def run():
+        saved = fetch.FEED_CACHE_TTL
+        fetch.FEED_CACHE_TTL = ttl
+        try:
+            return fn()
+        finally:
+            fetch.FEED_CACHE_TTL = saved
+    return run
+
+
+def _collect_all_feeds():
+    """The Streamlit app's collect_all_feeds, or None when Streamlit is missing"""
+    try:
+        from rss_collector_with_reach_tiers import collect_all_feeds
+    except ImportError:
+        return None
+    return collect_all_feeds
+
+
+class _Widget:
+    """Stands in for the progress bar and status text Streamlit would render"""
+
+    def progress(self, value):
+        pass
+
+    def text(self, value):
+        pass
+
+
+def fetch_stage(size, context):
+    """
+    Fetching through the stub server: a cold cache (HTTP and parse), a fresh
+    cache hit, and a stale cache revalidated with 304 Not Modified; a
+    recollection into a store that already holds every article; and a
+    watchlist of narrowed keywords, with and without query merging
+    """
+    keywords = benchmark_keywords(size)
+    benchmarks = []
+    
+    if size == 1:
+        keyword = keywords[0]
+        cache_dir = context.scratch('fetch-')
+        fetch.fetch_google_news_rss(keyword, fetch.FeedCache(cache_dir))
+        benchmarks.append(('fetch_google_news_rss cold',
+                           lambda: fetch.fetch_google_news_rss(keyword, fetch.FeedCache(context.scratch('cold-')))))
+        benchmarks.append(('fetch_google_news_rss cached',
+                           lambda: fetch.fetch_google_news_rss(keyword, fetch.FeedCache(cache_dir))))
+        benchmarks.append(('fetch_google_news_rss revalidated',
+                           _with_ttl(0, lambda: fetch.fetch_google_news_rss(keyword, fetch.FeedCache(cache_dir)))))
+        return benchmarks
+    
+    benchmarks.append(('collect_articles cold',
+                       lambda: collect_articles(keywords, cache=fetch.FeedCache(context.scratch('cold-')))))
+    # Recollecting into a store that already holds everything the feeds return
+    quiet_dir = context.scratch('quiet-')
+    quiet_store = ArticleStore(os.path.join(quiet_dir, 'articles.db'))
+    collect_articles(keywords, store=quiet_store, cache=fetch.FeedCache(quiet_dir))
+    for name, include_known in [('collect_articles nothing new', False), ('collect_articles nothing new, read back', True)]:
+        benchmarks.append((name, lambda include_known=include_known: collect_articles(
+            keywords, store=quiet_store, cache=fetch.FeedCache(quiet_dir), include_known=include_known)))
+    overlapping = overlapping_keywords(size)
+    for name, merge_queries in [('collect_articles overlapping', False), ('collect_articles overlapping, merged', True)]:
+        benchmarks.append((name, lambda merge_queries=merge_queries: collect_articles(
+            overlapping, cache=fetch.FeedCache(context.scratch('cold-')), merge_queries=merge_queries)))
+    
+    collect_all_feeds = _collect_all_feeds()
+    if collect_all_feeds is not None:
+        def run_collect_all_feeds():
+            # collect_all_feeds uses the module-wide cache, pointed at a cold one
+            fetch.feed_cache = fetch.FeedCache(context.scratch('cold-'))
+            return collect_all_feeds(_Widget(), _Widget(), keywords)
+        benchmarks.append(('collect_all_feeds cold', run_collect_all_feeds))
+        
+        warm_dir = context.scratch('warm-')
+        collect_articles(keywords, cache=fetch.FeedCache(warm_dir))
+        
+        def run_collect_all_feeds_revalidated():
+            fetch.feed_cache = fetch.FeedCache(warm_dir)
+            return collect_all_feeds(_Widget(), _Widget(), keywords)
+        benchmarks.append(('collect_all_feeds revalidated', _with_ttl(0, run_collect_all_feeds_revalidated)))
+    return benchmarks
+
+
+def parse_stage(size, context):
+    """Feed body to entry columns: the streaming parser against feedparser"""
+    body = feed_xml('parse benchmark', items=size)
+    return [
+        ('stream_feed_columns', lambda: stream_feed_columns(body)),
+        ('feedparser', lambda: feedparser_columns(feedparser.parse(body))),
+    ]
+
+
+def classify_stage(size, context):
+    """
+    Source classification with the memo cleared before every run, so each
+    distinct name is classified once per run as on a fresh process
+    """
+    names = source_names(size)
+
+    def per_name():
+        classify_source.cache_clear()
+        for name in names:
+            categorize_source(name)
+            calculate_reach_tier(name)
+
+    def vectorized():
+        classify_source.cache_clear()
+        classify_sources(list(dict.fromkeys(names)))
+    
+    return [
+        ('categorize_source + calculate_reach_tier', per_name),
+        ('classify_sources distinct', vectorized),
+    ]
+
+
+def filter_stage(size, context):
+    """
+    Search & Filter tab: a fresh engine applying every filter, then a rerun
+    that only changes the search term, with and without the FTS index, and
+    one page of the results table against sorting the whole filtered frame
+    """
+    df, membership = article_set(size)
+    keywords = list(membership['Keyword'].cat.categories[:3])
+    filters = {'tiers': [1, 2], 'keywords': keywords, 'categories': ['Mainstream Media', 'Trade Press']}
+    
+    store = ArticleStore(os.path.join(context.scratch('store-'), 'articles.db'))
+    store.add_articles(df, membership)
+    indexed = store.load_articles()
+    indexed_membership = store.load_keyword_membership()
+
+    def fresh(frame, members, text_search=None):
+        def run():
+            engine = FilterEngine(frame, members, text_search=text_search)
+            engine.apply('policy', **filters)
+            return engine
+        return run
+
+    def rerun(frame, members, text_search=None):
+        engine = fresh(frame, members, text_search)()
+        # Alternate terms so every run misses the search stage's cache
+        terms = itertools.cycle(['markets OR outage', 'policy'])
+        return lambda: engine.apply(next(terms), **filters)
+    
+    engine = FilterEngine(df, membership)
+    _, mask = engine.apply('', **filters)
+    engine.sort_order('Published_Date', False)
+    
+    benchmarks = [
+        ('FilterEngine scan', fresh(df, membership)),
+        ('FilterEngine scan, search changed', rerun(df, membership)),
+        ('sort filtered frame', lambda: df[mask].sort_values('Published_Date', ascending=False)),
+        ('FilterEngine.page presorted', lambda: engine.page(mask, 'Published_Date', False, 2, 50)),
+    ]
+    if store.fts_enabled:
+        benchmarks += [
+            ('FilterEngine fts', fresh(indexed, indexed_membership, store.search)),
+            ('FilterEngine fts, search changed', rerun(indexed, indexed_membership, store.search)),
+        ]
+    return benchmarks
+
+
+def summary_stage(size, context):
+    """
+    Summary & Analysis tab statistics for a stored window of articles: loaded
+    and computed from the articles, and summed from the daily rollups
+    """
+    df, membership = article_set(size)
+    store = ArticleStore(os.path.join(context.scratch('store-'), 'articles.db'))
+    store.add_articles(df, membership)
+    start_date, end_date = day_to_date(df['Published_Day'].min()), day_to_date(df['Published_Day'].max())
+    
+    def from_articles():
+        return coverage_stats(store.load_articles(start_date, end_date),
+                              store.load_keyword_membership(start_date, end_date))
+    
+    def from_rollups():
+        rollups, keyword_rollups = store.load_rollups(start_date, end_date)
+        return rollup_stats(rollups, keyword_rollups, *store.story_stats(start_date, end_date),
+                            store.load_sources())
+    
+    return [
+        ('coverage_stats from articles', from_articles),
+        ('rollup_stats from rollups', from_rollups),
+    ]
+
+
+def analysis_stage(size, context):
+    """
+    Map-reduce AI analysis against the stub Messages API: a cold cache, and
+    the window widened by one day after the rest was analyzed
+    """
+    df, membership = article_set(size)
+    last_day = df['Published_Day'].max()
+    start_date, end_date = day_to_date(df['Published_Day'].min()), day_to_date(last_day)
+    earlier = df[df['Published_Day'] < last_day]
+    keywords = keyword_counts(membership).head(5).index.tolist()
+    
+    warm_dir = context.scratch('analysis-')
+    analyze_articles('stub-key', earlier, keywords, start_date, end_date - timedelta(days=1),
+                     cache=AnalysisCache(warm_dir))
+    
+    def cold():
+        return analyze_articles('stub-key', df, keywords, start_date, end_date,
+                                cache=AnalysisCache(context.scratch('cold-')))
+    
+    def one_more_day():
+        cache_dir = context.scratch('extended-')
+        shutil.copytree(warm_dir, cache_dir, dirs_exist_ok=True)
+        return analyze_articles('stub-key', df, keywords, start_date, end_date, cache=AnalysisCache(cache_dir))
+    
+    return [
+        ('analyze_articles cold', cold),
+        ('analyze_articles one more day', one_more_day),
+    ]
+
+
+def ingest_stage(size, context):
+    """
+    Appending a collection of 1000 new articles to a store that already holds
+    size articles: insert, keyword membership and story clustering
+    """
+    df, membership = article_set(size + 1000 * 50)
+    store = ArticleStore(os.path.join(context.scratch('ingest-'), 'articles.db'))
+    batches = iter(range(size, len(df), 1000))
+    
+    def add(rows):
+        return store.add_articles(rows, membership[membership['article_id'].isin(rows.index)])
+    
+    add(df.iloc[:size])
+    
+    def add_batch():
+        start = next(batches)
+        return add(df.iloc[start:start + 1000])
+    
+    return [('ArticleStore.add_articles 1000 new', add_batch)]
+
+
+def export_stage(size, context):
+    """
+    Download payloads: what the app rendered on every rerun before, and each
+    export format built in chunks
+    """
+    df, _ = article_set(size)
+    benchmarks = [('to_csv + to_json(indent=2)',
+                   lambda: (df.to_csv(index=False).encode('utf-8'), df.to_json(orient='records', indent=2)))]
+    for fmt in available_formats():
+        benchmarks.append((f"export_bytes {fmt}", lambda fmt=fmt: export_bytes(df, fmt)))
+    return benchmarks
+
+
+STAGES = {
+    'fetch': fetch_stage,
+    'parse': parse_stage,
+    'classify': classify_stage,
+    'filter': filter_stage,
+    'summary': summary_stage,
+    'analysis': analysis_stage,
+    'ingest': ingest_stage,
+    'export': export_stage,
+}
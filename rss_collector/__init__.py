@@ -0,0 +1,12 @@
+"""
+RSS collector core - fetching, classification, enrichment and storage
+
+Shared by the Streamlit app (rss_collector_with_reach_tiers.py) and the
+headless collector (python -m rss_collector). Nothing here imports Streamlit.
+"""
+
+from .classify import calculate_reach_tier, categorize_source, classify_source
+from .collect import collect_articles
+from .enrich import ARTICLE_COLUMNS, enrich_articles
+from .fetch import FeedCache, fetch_google_news_rss, parse_boolean_search
+from .store import ArticleStore
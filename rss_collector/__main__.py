@@ -0,0 +1,191 @@
+"""
+Headless collector - run collections from cron or a worker, no Streamlit needed
+
+Usage:
+    python -m rss_collector collect --keywords keywords.txt --out rss_store/
+    python -m rss_collector collect --keywords keywords.txt --every 15
+    python -m rss_collector export --out articles.parquet --from 2025-01-01 --search "climate AND policy"
+    python -m rss_collector export --out eu.csv --saved "EU policy"
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import date
+
+from .collect import collect_articles
+from .export import available_formats, format_for_path, write_export
+from .fetch import FEED_CACHE_DIR, MAX_CONCURRENT_FETCHES, FeedCache
+from .filters import text_matches
+from .metrics import metrics
+from .query import plan_queries
+from .store import ARTICLE_STORE_PATH, ArticleStore
+
+logger = logging.getLogger('rss_collector')
+
+
+def read_keywords(path):
+    """Read one keyword per line, skipping blanks, # comments and repeats"""
+    keywords = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            keyword = line.strip()
+            if keyword and not keyword.startswith('#') and keyword not in keywords:
+                keywords.append(keyword)
+    return keywords
+
+
+def report_progress(keyword, done, total, error):
+    """Log per-keyword progress from the collection engine"""
+    if error is not None:
+        logger.warning("Error fetching %s: %s", keyword, error)
+    else:
+        logger.debug("Fetched %s (%d/%d)", keyword, done, total)
+
+
+def run_collection(keywords, store, cache, batch_size, max_workers, merge_queries=True):
+    """
+    Collect every keyword once, batch by batch
+    Each batch is written to the store before the next is fetched, so memory
+    is bounded by the batch size rather than the size of the watchlist.
+    Overlapping keywords are merged within a batch, not across batches.
+    Returns: number of new articles stored
+    """
+    stored_before = store.count()
+    for start in range(0, len(keywords), batch_size):
+        batch = keywords[start:start + batch_size]
+        plan = plan_queries(batch) if merge_queries else None
+        if plan is not None:
+            for keyword in plan.merged():
+                logger.info("Matching %s within the results of %s", keyword, ', '.join(plan.sources[keyword]))
+        # Only new articles are enriched and returned; known URLs cost a lookup
+        df, _ = collect_articles(batch, store=store, max_workers=max_workers, cache=cache, on_progress=report_progress,
+                                 merge_queries=merge_queries, plan=plan, include_known=False)
+        logger.info("Keywords %d-%d of %d: %d new articles", start + 1, start + len(batch), len(keywords), len(df))
+    return store.count() - stored_before
+
+
+def write_metrics(path):
+    """Write stage metrics to path: Prometheus text for .prom files, JSON otherwise"""
+    text = metrics.to_prometheus() if path.endswith('.prom') else metrics.to_json()
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def collect_command(args):
+    """Run the collect subcommand, once or on a fixed interval"""
+    store = ArticleStore(os.path.join(args.out, os.path.basename(ARTICLE_STORE_PATH)))
+    cache = FeedCache(args.cache_dir)
+    
+    while True:
+        started = time.monotonic()
+        # Re-read the watchlist every cycle so edits apply without a restart
+        keywords = read_keywords(args.keywords)
+        reclassified = store.sync_source_registry()
+        if reclassified:
+            logger.info("Source registry changed: reclassified %d stored articles", reclassified)
+        new_articles = run_collection(keywords, store, cache, args.batch_size, args.workers,
+                                      merge_queries=not args.no_merge_queries)
+        logger.info("Collected %d keywords: %d new articles, %d in history",
+                    len(keywords), new_articles, store.count())
+        if args.metrics:
+            write_metrics(args.metrics)
+        
+        if not args.every:
+            return 0
+        time.sleep(max(0.0, args.every * 60 - (time.monotonic() - started)))
+
+
+def matching_chunks(store, chunks, search_term, start_date, end_date):
+    """Keep the articles of each chunk that match a text search, via the full-text index if possible"""
+    article_ids = store.search(search_term, start_date, end_date)
+    for chunk in chunks:
+        mask = chunk.index.isin(article_ids) if article_ids is not None else text_matches(chunk, search_term)
+        yield chunk[mask]
+
+
+def export_command(args):
+    """Run the export subcommand, streaming stored articles to a file or stdout"""
+    fmt = args.format or format_for_path(args.out)
+    if fmt not in available_formats():
+        logger.error("Export format %s is not available (Parquet needs pyarrow)", fmt)
+        return 2
+    
+    store_path = os.path.join(args.store, os.path.basename(ARTICLE_STORE_PATH))
+    if not os.path.exists(store_path):
+        # Opening it would create a new, empty store
+        logger.error("No article store at %s", store_path)
+        return 2
+    store = ArticleStore(store_path)
+    search_term = args.search
+    if args.saved:
+        search_term = store.saved_searches().get(args.saved)
+        if search_term is None:
+            logger.error("No saved search named %s", args.saved)
+            return 2
+    
+    chunks = store.iter_articles(args.start, args.end)
+    if search_term:
+        chunks = matching_chunks(store, chunks, search_term, args.start, args.end)
+    
+    if args.out == '-':
+        written = write_export(chunks, fmt, sys.stdout.buffer)
+    else:
+        # Write to a temp file first so a failed export never leaves a partial file
+        tmp_path = args.out + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            written = write_export(chunks, fmt, f)
+        os.replace(tmp_path, args.out)
+    logger.info("Exported %d bytes of %s to %s", written, fmt, args.out)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m rss_collector', description=__doc__.splitlines()[1])
+    parser.add_argument('-v', '--verbose', action='store_true', help="log every keyword")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    collect = subparsers.add_parser('collect', help="fetch feeds for a keyword list into the article store")
+    collect.add_argument('--keywords', required=True, help="text file with one keyword per line")
+    collect.add_argument('--out', default=os.path.dirname(ARTICLE_STORE_PATH),
+                         help="article store directory (default: %(default)s)")
+    collect.add_argument('--cache-dir', default=FEED_CACHE_DIR, help="feed cache directory (default: %(default)s)")
+    collect.add_argument('--workers', type=int, default=MAX_CONCURRENT_FETCHES,
+                         help="feeds fetched in parallel (default: %(default)s)")
+    collect.add_argument('--batch-size', type=int, default=25,
+                         help="keywords held in memory at once (default: %(default)s)")
+    collect.add_argument('--no-merge-queries', action='store_true',
+                         help="request every keyword, even those implied by broader ones in the list")
+    collect.add_argument('--every', type=float, metavar='MINUTES',
+                         help="keep running and collect again every MINUTES")
+    collect.add_argument('--metrics', metavar='FILE',
+                         help="write stage timings and counters after each run (.prom for Prometheus, else JSON)")
+    collect.set_defaults(handler=collect_command)
+    
+    export = subparsers.add_parser('export', help="write stored articles to CSV, JSON, NDJSON or Parquet")
+    export.add_argument('--out', required=True, help="output file, or - for stdout")
+    export.add_argument('--format', choices=list(available_formats()),
+                        help="output format (default: from the file extension, else csv)")
+    export.add_argument('--store', default=os.path.dirname(ARTICLE_STORE_PATH),
+                        help="article store directory (default: %(default)s)")
+    export.add_argument('--from', dest='start', type=date.fromisoformat, metavar='YYYY-MM-DD',
+                        help="first publication date to include")
+    export.add_argument('--to', dest='end', type=date.fromisoformat, metavar='YYYY-MM-DD',
+                        help="last publication date to include")
+    search = export.add_mutually_exclusive_group()
+    search.add_argument('--search', help="only articles matching this boolean text search")
+    search.add_argument('--saved', metavar='NAME', help="only articles matching a search saved in the app")
+    export.set_defaults(handler=export_command)
+    
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(asctime)s %(levelname)s %(message)s')
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
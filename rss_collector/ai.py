@@ -0,0 +1,389 @@
+"""
+AI thematic analysis - prompt building, Anthropic API calls and a response cache
+
+Every article in the window is analyzed by map-reduce: day-sized chunks are
+summarized concurrently and the summaries reduced into the final analysis.
+Responses are cached on disk under a key derived from the exact articles and
+prompt, so reopening a window whose articles have not changed costs no
+tokens, and widening it by a day only summarizes the new day.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from .enrich import day_to_date
+
+ANTHROPIC_API_URL = 'https://api.anthropic.com/v1/messages'
+ANTHROPIC_VERSION = '2023-06-01'
+ANALYSIS_MODEL = 'claude-sonnet-4-20250514'
+ANALYSIS_MAX_TOKENS = 1500
+ANALYSIS_TIMEOUT = 30
+
+# Map-reduce settings: articles are chunked by day, each chunk is summarized,
+# then the chunk summaries are reduced into the final analysis
+MAP_CHUNK_ARTICLES = 200  # Articles per chunk at most
+MAP_CHUNK_CHARS = 16000  # Article text per chunk at most
+MAP_MAX_TOKENS = 400
+REDUCE_FAN_IN = 20  # Summaries combined per reduce request
+MAX_CONCURRENT_REQUESTS = 4  # Chunk summaries requested in parallel
+
+# Analysis cache settings
+ANALYSIS_CACHE_DIR = os.path.join('.rss_cache', 'analysis')
+ANALYSIS_CACHE_TTL = 7 * 24 * 3600  # Seconds a cached analysis stays valid
+ANALYSIS_CACHE_MAX_ENTRIES = 5000  # Least recently used entries are evicted past this; chunks count too
+ANALYSIS_CACHE_EVICT_TO = 0.9  # Eviction trims to this share of max_entries, so the directory is rarely scanned
+
+
+class AnalysisAPIError(Exception):
+    """The API answered with an error status"""
+
+    def __init__(self, status, body):
+        super().__init__(f"API Error {status}: {body}")
+        self.status = status
+        self.body = body
+
+
+def article_set_fingerprint(df):
+    """
+    Content hash of a set of articles, independent of row order
+    Two windows with the same URLs and titles share a fingerprint.
+    """
+    row_hashes = np.sort(pd.util.hash_pandas_object(df[['URL', 'Title']], index=False).to_numpy())
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()
+
+
+def analysis_cache_key(fingerprint, prompt, model=ANALYSIS_MODEL, max_tokens=ANALYSIS_MAX_TOKENS):
+    """Cache key for one request: the article set, the prompt and the model settings"""
+    payload = json.dumps([fingerprint, prompt, model, max_tokens])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class AnalysisCache:
+    """
+    On-disk cache of analysis responses, one JSON file per key
+    Entries expire after ttl seconds; past max_entries the least recently
+    used are evicted. A file's mtime records its last use. The entry count
+    is kept in memory, so a put only scans the directory when it overflows,
+    and eviction then trims to ANALYSIS_CACHE_EVICT_TO of the cap.
+    """
+
+    def __init__(self, directory=ANALYSIS_CACHE_DIR, ttl=ANALYSIS_CACHE_TTL, max_entries=ANALYSIS_CACHE_MAX_ENTRIES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = None  # Entries on disk, counted on the first put; other processes' writes show up at eviction
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def get(self, key):
+        """Return the cached record for key, or None if missing or expired"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - record['created_at'] >= self.ttl:
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return record
+
+    def put(self, key, analysis, **details):
+        """Store an analysis, with any details worth showing alongside it"""
+        os.makedirs(self.directory, exist_ok=True)
+        record = dict(details, analysis=analysis, created_at=time.time())
+        path = self._path(key)
+        added = not os.path.exists(path)
+        # Write to a temp file first so readers never see a partial file
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f)
+        os.replace(tmp_path, path)
+        if added:
+            self._evict()
+        return record
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Count a new entry, scanning and trimming the directory only once it is over the cap"""
+        with self.lock:
+            if self.entries is None:
+                self.entries = sum(name.endswith('.json') for name in os.listdir(self.directory))
+            else:
+                self.entries += 1
+            if self.entries <= self.max_entries:
+                return
+            
+            entries = []
+            for name in os.listdir(self.directory):
+                if name.endswith('.json'):
+                    path = os.path.join(self.directory, name)
+                    try:
+                        entries.append((os.path.getmtime(path), path))
+                    except OSError:
+                        continue
+            if len(entries) <= self.max_entries:
+                self.entries = len(entries)
+                return
+            keep = int(self.max_entries * ANALYSIS_CACHE_EVICT_TO)
+            entries.sort()
+            for _, path in entries[:len(entries) - keep]:
+                self._remove(path)
+            self.entries = keep
+
+
+analysis_cache = AnalysisCache()
+
+
+def request_analysis(api_key, prompt, model=ANALYSIS_MODEL, max_tokens=ANALYSIS_MAX_TOKENS):
+    """
+    Send one prompt to the Messages API
+    Raises AnalysisAPIError for error responses.
+    Returns: the response text
+    """
+    body = json.dumps({
+        'model': model,
+        'max_tokens': max_tokens,
+        'messages': [
+            {'role': 'user', 'content': prompt}
+        ]
+    }).encode('utf-8')
+    request = urllib.request.Request(ANTHROPIC_API_URL, data=body, method='POST', headers={
+        'Content-Type': 'application/json',
+        'x-api-key': api_key,
+        'anthropic-version': ANTHROPIC_VERSION
+    })
+    try:
+        with urllib.request.urlopen(request, timeout=ANALYSIS_TIMEOUT) as response:
+            result = json.load(response)
+    except urllib.error.HTTPError as e:
+        raise AnalysisAPIError(e.code, e.read().decode('utf-8', errors='replace'))
+    return result['content'][0]['text']
+
+
+def article_line(source, title):
+    """One article as listed in a prompt"""
+    return f"• [{source}] {title}"
+
+
+def day_chunks(df):
+    """
+    Split articles into chunks that never span a day
+    Within a day articles are ordered by URL and cut by MAP_CHUNK_ARTICLES
+    and MAP_CHUNK_CHARS, so a chunk's content only changes when its own day
+    does. Undated articles form their own chunks at the end.
+    Returns: list of (label, chunk DataFrame)
+    """
+    chunks = []
+    days = df['Published_Day']
+    for day in sorted(days.dropna().unique()) + ([None] if days.isna().any() else []):
+        day_df = df[days.isna()] if day is None else df[days == day]
+        day_df = day_df.sort_values('URL')
+        label = 'undated' if day is None else day_to_date(day).strftime('%B %d, %Y')
+        
+        start = 0
+        chars = 0
+        lengths = (day_df['Source'].astype(str).str.len() + day_df['Title'].str.len() + 5).to_numpy()
+        for position, length in enumerate(lengths):
+            if position > start and (position - start >= MAP_CHUNK_ARTICLES or chars + length > MAP_CHUNK_CHARS):
+                chunks.append((label, day_df.iloc[start:position]))
+                start, chars = position, 0
+            chars += length
+        if start < len(day_df):
+            chunks.append((label, day_df.iloc[start:]))
+    return chunks
+
+
+def build_map_prompt(label, chunk):
+    """
+    Prompt summarizing one chunk of articles
+    Syndicated copies of a story are listed once, with their count.
+    """
+    if 'Story_ID' in chunk:
+        stories = chunk.groupby('Story_ID', sort=False).agg(
+            Source=('Source', 'first'), Title=('Title', 'first'), Copies=('Title', 'size'))
+        lines = '\n'.join(
+            article_line(source, title) + (f" (carried by {copies} outlets)" if copies > 1 else '')
+            for source, title, copies in zip(stories['Source'], stories['Title'], stories['Copies'])
+        )
+    else:
+        lines = '\n'.join(article_line(source, title) for source, title in zip(chunk['Source'], chunk['Title']))
+    return f"""Summarize these {len(chunk)} news articles published on {label}.
+
+{lines}
+
+In at most 5 short bullet points, name the main themes, the stories and angles being covered, the overall tone, and anything notable. Mention sources only when they matter. Do not add an introduction."""
+
+
+def build_reduce_prompt(summaries, start_date, end_date, total_articles, keywords, final=True):
+    """
+    Prompt combining chunk summaries
+    With final=False the result is another intermediate summary, used when
+    there are more summaries than fit in one request; the dates and totals
+    only apply to the final prompt.
+    """
+    notes = '\n\n'.join(summaries)
+    if not final:
+        # Nothing window-specific here, so widening the window reuses these
+        return f"""Merge these summaries of news coverage into one summary of at most 8 bullet points, keeping the most significant themes, narratives and patterns:
+
+{notes}"""
+    
+    period = f"{start_date.strftime('%B %d, %Y')} to {end_date.strftime('%B %d, %Y')}"
+    return f"""Below are summaries of all {total_articles} news articles collected from {period}, grouped by day.
+Keywords analyzed: {', '.join(keywords)}
+
+{notes}
+
+Based on these summaries, please provide a concise thematic analysis covering:
+1. **Main Themes**: What are the 3-4 dominant themes or topics in this coverage?
+2. **Key Narratives**: What stories or narratives are emerging? What angles are journalists taking?
+3. **Sentiment & Tone**: What is the overall sentiment (positive, negative, neutral, mixed)?
+4. **Notable Patterns**: Any interesting patterns, controversies, or developments you notice?
+
+Keep the analysis to 3-4 paragraphs, written in clear professional language suitable for an executive summary.
+Focus specifically on what happened during THIS time period ({start_date.strftime('%B %d')} to {end_date.strftime('%B %d, %Y')})."""
+
+
+def cached_request(api_key, fingerprint, prompt, max_tokens, cache, refresh=False):
+    """
+    One API request, answered from the cache when the same content was sent before
+    refresh: always send the request, replacing any cached response
+    Returns: (response text, whether it was cached)
+    """
+    key = analysis_cache_key(fingerprint, prompt, max_tokens=max_tokens)
+    record = None if refresh else cache.get(key)
+    if record is not None:
+        return record['analysis'], True
+    analysis = request_analysis(api_key, prompt, max_tokens=max_tokens)
+    cache.put(key, analysis)
+    return analysis, False
+
+
+def run_requests(api_key, requests, cache, max_workers=MAX_CONCURRENT_REQUESTS, on_progress=None, refresh=False):
+    """
+    Send (fingerprint, prompt, max_tokens) requests concurrently
+    refresh: bypass cached responses (see cached_request)
+    on_progress(done, total, cached) is called from the calling thread as
+    each request completes.
+    Returns: response texts, in request order
+    """
+    results = [None] * len(requests)
+    if not requests:
+        return results
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(requests)))) as executor:
+        futures = {
+            executor.submit(cached_request, api_key, fingerprint, prompt, max_tokens, cache, refresh): position
+            for position, (fingerprint, prompt, max_tokens) in enumerate(requests)
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            results[futures[future]], cached = future.result()
+            if on_progress is not None:
+                on_progress(done, len(requests), cached)
+    return results
+
+
+def analysis_key(df, keywords, start_date, end_date):
+    """Cache key of the final analysis for exactly these articles, period and top keywords"""
+    context = json.dumps([start_date.isoformat(), end_date.isoformat(), keywords])
+    return analysis_cache_key(article_set_fingerprint(df), context)
+
+
+def window_key(window, keywords, start_date, end_date):
+    """
+    Cache key of the final analysis for a stored window, by its signature
+    (ArticleStore.window_signature) rather than its articles' content
+    """
+    context = json.dumps([start_date.isoformat(), end_date.isoformat(), keywords])
+    return analysis_cache_key(json.dumps(['window'] + list(window)), context)
+
+
+def cached_window_analysis(window, keywords, start_date, end_date, cache=None):
+    """
+    Look up a cached analysis of a stored window without loading its articles
+    Returns: cached record or None
+    """
+    cache = cache or analysis_cache
+    return cache.get(window_key(window, keywords, start_date, end_date))
+
+
+def cached_analysis(df, keywords, start_date, end_date, cache=None):
+    """
+    Look up a cached analysis for exactly these articles
+    df only needs URL and Title.
+    Returns: (cache key, cached record or None)
+    """
+    cache = cache or analysis_cache
+    key = analysis_key(df, keywords, start_date, end_date)
+    return key, cache.get(key)
+
+
+def analyze_articles(api_key, df, keywords, start_date, end_date, cache=None,
+                     max_workers=MAX_CONCURRENT_REQUESTS, on_progress=None, refresh=False, window=None):
+    """
+    Thematic analysis of every article, by map-reduce
+    keywords: the window's most covered keywords, named in the final prompt.
+    Each day's chunks are summarized concurrently, then the summaries are
+    reduced (in rounds of REDUCE_FAN_IN if needed) into the final analysis.
+    Chunk and reduce results are cached by content, so widening the window
+    by a day only summarizes that day's chunks plus the reduce steps.
+    on_progress(done, total, cached) reports chunk summaries as they finish.
+    refresh: regenerate the analysis instead of returning a cached one; the
+    reduce steps are requested again, while the summaries of unchanged
+    chunks are still reused, as they describe the same articles.
+    window: signature of the stored window df holds; the analysis is also
+    cached under it, for cached_window_analysis.
+    Returns: (record with 'analysis', 'article_count' and 'chunk_count',
+    whether it came from the cache without any request)
+    """
+    cache = cache or analysis_cache
+    if refresh:
+        key = analysis_key(df, keywords, start_date, end_date)
+    else:
+        key, record = cached_analysis(df, keywords, start_date, end_date, cache)
+        if record is not None:
+            if window is not None:
+                cache.put(window_key(window, keywords, start_date, end_date), record['analysis'],
+                          article_count=record.get('article_count'), chunk_count=record.get('chunk_count'))
+            return record, True
+    
+    chunks = day_chunks(df)
+    summaries = run_requests(api_key, [
+        (article_set_fingerprint(chunk), build_map_prompt(label, chunk), MAP_MAX_TOKENS)
+        for label, chunk in chunks
+    ], cache, max_workers, on_progress)
+    summaries = [f"{label}:\n{summary}" for (label, _), summary in zip(chunks, summaries)]
+    
+    while len(summaries) > REDUCE_FAN_IN:
+        batches = [summaries[start:start + REDUCE_FAN_IN] for start in range(0, len(summaries), REDUCE_FAN_IN)]
+        summaries = run_requests(api_key, [
+            ('', build_reduce_prompt(batch, None, None, None, None, final=False), MAP_MAX_TOKENS * 2)
+            for batch in batches
+        ], cache, max_workers, refresh=refresh)
+    
+    analysis = request_analysis(api_key, build_reduce_prompt(summaries, start_date, end_date, len(df), keywords))
+    if window is not None:
+        cache.put(window_key(window, keywords, start_date, end_date), analysis,
+                  article_count=len(df), chunk_count=len(chunks))
+    return cache.put(key, analysis, article_count=len(df), chunk_count=len(chunks)), False
@@ -0,0 +1,250 @@
+"""
+Source classification - category and reach tier lookups for news outlets
+
+Category terms and outlet reputations live in a versioned registry file
+(source_registry.json next to this module). It is compiled into a SourceIndex
+and reloaded whenever the file's mtime changes, so edits apply without a
+restart; the article store then reclassifies only the sources they affect.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+
+from .metrics import metrics
+
+SOURCE_REGISTRY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'source_registry.json')
+
+logger = logging.getLogger('rss_collector')
+
+
+class SourceIndex:
+    """
+    Character trie over every category and reach tier term
+    One scan of a source name finds all terms it contains; for each table the
+    term with the lowest priority wins, matching the old ordered `in` checks.
+    """
+
+    def __init__(self, category_terms, reach_tiers, default_reach):
+        self.root = {}
+        self.default_reach = default_reach
+        priority = 0
+        for category, terms in category_terms:
+            for term in terms:
+                self._add(term, 0, (priority, category))
+                priority += 1
+        
+        priority = 0
+        for tier, reach_estimate, reach_label, sources in reach_tiers:
+            for term, data in sources.items():
+                self._add(term, 1, (priority, {
+                    'tier': tier,
+                    'reach_estimate': reach_estimate,
+                    'reach_score': data['score'],
+                    'reach_label': reach_label,
+                    'reasoning': data['reason']
+                }))
+                priority += 1
+
+    def _add(self, term, table, entry):
+        node = self.root
+        for ch in term:
+            node = node.setdefault(ch, {})
+        # The None key holds [category entry, reach entry] for terms ending here
+        hits = node.setdefault(None, [None, None])
+        if hits[table] is None:
+            hits[table] = entry
+
+    def lookup(self, source_lower):
+        """Return (category, reach data) for a lowercased source name"""
+        best = [None, None]
+        root = self.root
+        for start in range(len(source_lower)):
+            node = root
+            for i in range(start, len(source_lower)):
+                node = node.get(source_lower[i])
+                if node is None:
+                    break
+                hits = node.get(None)
+                if hits is not None:
+                    for table in (0, 1):
+                        if hits[table] is not None and (best[table] is None or hits[table][0] < best[table][0]):
+                            best[table] = hits[table]
+        
+        category = best[0][1] if best[0] is not None else "Other"
+        reach = best[1][1] if best[1] is not None else self.default_reach
+        return category, reach
+
+
+def load_registry(path):
+    """
+    Read a source registry file
+    Returns: dict with version, digest, category_terms [(category, terms)],
+    reach_tiers [(tier, reach_estimate, reach_label, {term: {score, reason}})]
+    and default_reach; raises ValueError if the file is malformed
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    try:
+        data = json.loads(raw)
+        return {
+            'version': data['version'],
+            'digest': hashlib.sha256(raw).hexdigest(),
+            'category_terms': [(entry['category'], list(entry['terms'])) for entry in data['categories']],
+            'reach_tiers': [
+                (entry['tier'], entry['reach_estimate'], entry['reach_label'], dict(entry['sources']))
+                for entry in data['reach_tiers']
+            ],
+            'default_reach': dict(data['default_reach'])
+        }
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Malformed source registry {path}: {e!r}") from e
+
+
+def registry_entries(registry):
+    """
+    What each term resolves to, per table, in priority order
+    Returns: (dict of term -> category, dict of term -> (tier, estimate, label, score, reason))
+    """
+    categories, reaches = {}, {}
+    for category, terms in registry['category_terms']:
+        for term in terms:
+            categories.setdefault(term, category)
+    for tier, reach_estimate, reach_label, sources in registry['reach_tiers']:
+        for term, data in sources.items():
+            reaches.setdefault(term, (tier, reach_estimate, reach_label, data['score'], data['reason']))
+    return categories, reaches
+
+
+def changed_terms(old, new):
+    """
+    Terms whose matches classify differently between two registries
+    Covers added, removed and edited terms, and terms whose priority moved
+    relative to the others. An empty string - contained in every source
+    name - stands for a change to the defaults, which affects any source.
+    """
+    changed = set()
+    for old_table, new_table in zip(registry_entries(old), registry_entries(new)):
+        changed.update(term for term in old_table.keys() | new_table.keys()
+                       if old_table.get(term) != new_table.get(term))
+        old_order = [term for term in old_table if term in new_table]
+        new_order = [term for term in new_table if term in old_table]
+        changed.update(term for pair in zip(old_order, new_order) if pair[0] != pair[1] for term in pair)
+    if old['default_reach'] != new['default_reach']:
+        changed.add('')
+    return changed
+
+
+def terms_pattern(terms):
+    """Regex matching lowercased source names that contain any of terms"""
+    return re.compile('|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True)))
+
+
+class SourceRegistry:
+    """
+    Registry file compiled into a SourceIndex, reloaded when its mtime changes
+    Keeps the previous version's changed terms so a store classified with
+    it can be brought up to date by reclassifying only what they match.
+    """
+
+    def __init__(self, path=SOURCE_REGISTRY_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.mtime = os.stat(path).st_mtime_ns
+        self.registry = load_registry(path)
+        self.index = self._compile(self.registry)
+        self.previous_digest = None
+        self.changes = set()
+
+    @property
+    def digest(self):
+        return self.registry['digest']
+
+    @property
+    def version(self):
+        return self.registry['version']
+
+    def _compile(self, registry):
+        return SourceIndex(registry['category_terms'], registry['reach_tiers'], registry['default_reach'])
+
+    def reload_if_changed(self):
+        """
+        Reload the registry file if its mtime changed
+        A malformed file is logged and ignored; the loaded registry stays.
+        Returns: True if a new registry was loaded
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return False
+        with self.lock:
+            if mtime == self.mtime:
+                return False
+            self.mtime = mtime
+            try:
+                registry = load_registry(self.path)
+            except (OSError, ValueError) as e:
+                logger.warning("Keeping the loaded source registry: %s", e)
+                metrics.count('registry.errors')
+                return False
+            if registry['digest'] == self.digest:
+                return False
+            
+            self.changes = changed_terms(self.registry, registry)
+            self.previous_digest = self.digest
+            self.registry = registry
+            self.index = self._compile(registry)
+            classify_source.cache_clear()
+            metrics.count('registry.reloads')
+            logger.info("Loaded source registry version %s (%d terms changed)", registry['version'], len(self.changes))
+            return True
+
+    def changes_since(self, digest):
+        """
+        Terms to reclassify for data classified with the registry of digest
+        Returns: set of terms; empty when digest is current, {''} (everything)
+        when it is older than the previous version
+        """
+        with self.lock:
+            if digest == self.digest:
+                return set()
+            if digest is not None and digest == self.previous_digest:
+                return set(self.changes)
+            return {''}
+
+
+source_registry = SourceRegistry()
+
+
+@functools.lru_cache(maxsize=65536)
+def classify_source(source_name):
+    """
+    Memoized (category, reach data) lookup for a source name
+    Cleared whenever the source registry reloads.
+    """
+    return source_registry.index.lookup(source_name.lower())
+
+
+def categorize_source(source_name):
+    """
+    Categorize news sources into different types
+    Returns: category name
+    """
+    return classify_source(source_name)[0]
+
+
+def calculate_reach_tier(source_name):
+    """
+    Calculate reach tier based on reputation and authority
+    Returns: dict with tier, reach_estimate, reach_score, and reasoning
+    
+    Tier 1: Global news wires & papers of record (90-100 points)
+    Tier 2: Major industry leaders & established media (60-89 points)
+    Tier 3: Respected niche/trade publications (30-59 points)
+    Tier 4: Smaller outlets, blogs, unknown sources (1-29 points)
+    """
+    return dict(classify_source(source_name)[1])
@@ -0,0 +1,102 @@
+"""
+Collection pipeline - fetch, de-duplicate, enrich and store articles
+"""
+
+import pandas as pd
+
+from .enrich import ARTICLE_COLUMNS, EPOCH, apply_article_schema, enrich_articles
+from .fetch import MAX_CONCURRENT_FETCHES, MERGE_OVERLAPPING_QUERIES, fetch_all_keywords
+from .keywords import build_keyword_membership
+from .metrics import metrics
+
+
+def collect_articles(keywords, store=None, max_workers=MAX_CONCURRENT_FETCHES, cache=None, on_progress=None,
+                     merge_queries=MERGE_OVERLAPPING_QUERIES, plan=None, include_known=True):
+    """
+    Collect articles for a list of keywords
+    Each URL becomes one article row, whose Keyword column holds the first
+    keyword that found it; every matching keyword is recorded in the
+    membership table. When a store is given, both are appended to it (see
+    store_collection): URLs it already holds skip enrichment and storage.
+    merge_queries: answer narrower keywords from broader ones' results
+    instead of requesting them (see fetch_all_keywords).
+    plan: plan_queries(keywords), when the caller has already made it
+    include_known: with a store, also return the articles it already held,
+    read back from it; otherwise only the new ones are returned.
+    Returns: (enriched DataFrame of unique articles, keyword membership)
+    """
+    with metrics.timer('collect.total'):
+        rows = pd.DataFrame(fetch_all_keywords(keywords, max_workers=max_workers, cache=cache, on_progress=on_progress,
+                                               merge_queries=merge_queries, plan=plan))
+        
+        # One row per URL; keyword hits are kept separately
+        with metrics.timer('collect.dedup'):
+            df = rows
+            if not df.empty:
+                df = df.drop_duplicates(subset=['URL'], keep='first').reset_index(drop=True)
+            membership = build_keyword_membership(rows, df)
+        metrics.count('collect.rows', len(rows))
+        metrics.count('collect.articles', len(df))
+        
+        if store is None:
+            return enrich_articles(df), membership
+        return store_collection(store, keywords, df, membership, include_known)
+
+
+def keyword_runs(keywords, membership, published_ts, new_ids):
+    """
+    Each keyword's high-water mark for one collection
+    published_ts: publication time (epoch seconds) by article id; new_ids:
+    ids of the articles stored for the first time
+    Returns: DataFrame with Keyword, high_water_ts and new, one row per keyword
+    """
+    hits = pd.DataFrame({
+        'Keyword': membership['Keyword'],
+        'high_water_ts': membership['article_id'].map(published_ts).astype('Int64'),
+        'new': membership['article_id'].isin(new_ids)
+    })
+    runs = hits.groupby('Keyword', observed=True).agg(high_water_ts=('high_water_ts', 'max'), new=('new', 'sum'))
+    runs = runs.reindex(list(dict.fromkeys(keywords)))
+    runs['new'] = runs['new'].fillna(0).astype(int)
+    return runs.rename_axis('Keyword').reset_index()
+
+
+def store_collection(store, keywords, df, membership, include_known=True):
+    """
+    Append a de-duplicated collection to the store, doing work only for what is new
+    URLs already stored are found with one indexed lookup and are neither
+    enriched nor inserted again; only their new keyword hits are recorded.
+    The URL index is exact, so no article is skipped by mistake. Each
+    keyword's high-water mark (latest publication time seen) and count of
+    new articles are updated, so recollecting quiet feeds costs a lookup and
+    a few small writes.
+    Returns: (articles, membership) as collect_articles does
+    """
+    with metrics.timer('collect.known'):
+        known = store.lookup_urls(df['URL']) if not df.empty else store.lookup_urls([])
+        known_urls = df.loc[df['URL'].isin(known.index), 'URL'] if not df.empty else pd.Series(dtype=object)
+    new_df = enrich_articles(df.drop(index=known_urls.index))
+    is_new_member = ~membership['article_id'].isin(known_urls.index)
+    metrics.count('collect.known', len(known_urls))
+    metrics.count('collect.new', len(new_df))
+    
+    published_ts = pd.concat([
+        pd.Series(known['published_ts'].reindex(known_urls).to_numpy(), index=known_urls.index, dtype='Int64'),
+        ((new_df['Published_Date'] - EPOCH) // pd.Timedelta(seconds=1)).astype('Int64') if not new_df.empty
+        else pd.Series(dtype='Int64')
+    ])
+    with metrics.timer('collect.store'):
+        store.add_articles(new_df, membership[is_new_member])
+        store.add_keyword_hits(df['URL'], membership[~is_new_member])
+        store.record_keyword_runs(keyword_runs(keywords, membership, published_ts, new_df.index))
+    
+    if not include_known or known_urls.empty:
+        return new_df, membership[is_new_member]
+    
+    # Articles already stored, read back in this collection's order and attribution
+    with metrics.timer('collect.load_known'):
+        stored = store.load_articles_by_id(known['article_id']).set_index('URL')
+        known_df = stored.reindex(known_urls).reset_index().set_axis(known_urls.index)
+        known_df['Keyword'] = df.loc[known_urls.index, 'Keyword']
+    articles = pd.concat([new_df, known_df[ARTICLE_COLUMNS]]) if not new_df.empty else known_df[ARTICLE_COLUMNS]
+    return apply_article_schema(articles.sort_index()), membership
@@ -0,0 +1,146 @@
+"""
+Article enrichment - publication dates, source category and reach data
+"""
+
+from datetime import date, timedelta
+
+import pandas as pd
+from dateutil import parser as date_parser
+
+from .classify import classify_source, source_registry
+from .metrics import metrics
+
+# Column order of enriched article frames
+ARTICLE_COLUMNS = [
+    'Keyword', 'Title', 'URL', 'Published', 'Published_Date', 'Published_Day', 'Source', 'Source_Category',
+    'Reach_Tier', 'Reach_Estimate', 'Reach_Score', 'Reach_Label', 'Reach_Reasoning', 'Description'
+]
+
+# Per-source attributes, one row per source in the source dimension table
+SOURCE_COLUMNS = ['Source_Category', 'Reach_Tier', 'Reach_Estimate', 'Reach_Score', 'Reach_Label', 'Reach_Reasoning']
+
+# Compact in-memory schema: repeated strings become categoricals (int codes
+# plus one lookup table of distinct values) and tier/score become small ints
+ARTICLE_DTYPES = {
+    'Keyword': 'category',
+    'Source': 'category',
+    'Source_Category': 'category',
+    'Reach_Tier': 'int8',
+    'Reach_Estimate': 'category',
+    'Reach_Score': 'int8',
+    'Reach_Label': 'category',
+    'Reach_Reasoning': 'category',
+}
+
+EPOCH = pd.Timestamp(0, tz='UTC')
+EPOCH_DATE = date(1970, 1, 1)
+
+
+def apply_article_schema(df):
+    """Cast an article frame to the compact ARTICLE_DTYPES layout"""
+    return df.astype(ARTICLE_DTYPES)
+
+
+def observed_counts(values):
+    """
+    value_counts without the zero rows a categorical reports for values
+    that do not occur in this (filtered) frame
+    """
+    counts = values.value_counts()
+    return counts[counts > 0]
+
+
+def day_bucket(dates):
+    """Whole UTC days since the Unix epoch for a UTC datetime column (nullable Int32)"""
+    return ((dates - EPOCH) // pd.Timedelta(days=1)).astype('Int32')
+
+
+def date_to_day(day):
+    """Day bucket of a calendar date"""
+    return (day - EPOCH_DATE).days
+
+
+def day_to_date(day):
+    """Calendar date of a day bucket"""
+    return EPOCH_DATE + timedelta(days=int(day))
+
+
+def parse_published_dates(published):
+    """
+    Parse a column of RSS date strings into UTC timestamps in one pass
+    RFC 822 dates (what Google News sends) take a fixed-format fast path;
+    anything else falls back to dateutil once per distinct string.
+    """
+    normalized = published.str.replace(r' (GMT|UTC|UT|Z)$', ' +0000', regex=True)
+    dates = pd.to_datetime(normalized, format='%a, %d %b %Y %H:%M:%S %z', utc=True, errors='coerce')
+    
+    leftover = dates.isna() & (published != '')
+    if leftover.any():
+        def parse_one(value):
+            try:
+                parsed = pd.Timestamp(date_parser.parse(value))
+            except (ValueError, OverflowError):
+                return pd.NaT
+            return parsed.tz_localize('UTC') if parsed.tzinfo is None else parsed.tz_convert('UTC')
+        
+        fallback = {value: parse_one(value) for value in published[leftover].unique()}
+        dates[leftover] = pd.to_datetime(published[leftover].map(fallback), utc=True)
+    
+    return dates
+
+
+def classify_sources(sources):
+    """
+    Classify each distinct source name once
+    Returns: source dimension table - DataFrame indexed by source with the
+    SOURCE_COLUMNS category and reach columns
+    """
+    rows = []
+    for source_name in sources:
+        category, reach_data = classify_source(source_name)
+        rows.append((
+            category,
+            reach_data['tier'],
+            reach_data['reach_estimate'],
+            reach_data['reach_score'],
+            reach_data['reach_label'],
+            reach_data['reasoning']
+        ))
+    return pd.DataFrame(rows, index=pd.Index(sources, name='Source'), columns=SOURCE_COLUMNS)
+
+
+def source_dimension(df):
+    """
+    Source dimension table of an enriched article frame: each source's
+    category and reach, as attached at classification time
+    Returns: DataFrame indexed by source with the SOURCE_COLUMNS
+    """
+    sources = df.drop_duplicates('Source')
+    return pd.DataFrame(
+        {column: sources[column].to_numpy() for column in SOURCE_COLUMNS},
+        index=pd.Index(sources['Source'].astype(object).to_numpy(), name='Source')
+    )
+
+
+def enrich_articles(raw_df):
+    """
+    Add parsed dates, source category and reach data to raw articles
+    Dates are normalized here, once: Published_Date is a UTC datetime column
+    and Published_Day its integer day bucket, used for all date filtering.
+    Works column-wise: dates are parsed vectorized and each distinct source is
+    classified once, with results broadcast to its rows.
+    """
+    if raw_df.empty:
+        return raw_df
+    
+    with metrics.timer('enrich.classify'):
+        # Pick up registry edits before classifying anything new
+        source_registry.reload_if_changed()
+        sources = raw_df['Source'].unique()
+        df = raw_df.join(classify_sources(sources), on='Source')
+    metrics.count('enrich.distinct_sources', len(sources))
+    with metrics.timer('enrich.dates'):
+        df['Published_Date'] = parse_published_dates(df['Published'])
+        df['Published_Day'] = day_bucket(df['Published_Date'])
+    with metrics.timer('enrich.schema'):
+        return apply_article_schema(df[ARTICLE_COLUMNS])
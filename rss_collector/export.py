@@ -0,0 +1,221 @@
+"""
+Article export - CSV, JSON, NDJSON and Parquet payloads written in row chunks
+
+Payloads are built only when someone asks for them, chunk by chunk, so the
+intermediate text never exceeds one chunk's worth. Finished payloads are
+cached by the fingerprint of the filters that produced them, so repeated
+downloads of an unchanged result reuse the bytes.
+"""
+
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from .enrich import ARTICLE_COLUMNS, apply_article_schema
+from .metrics import metrics
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional
+    pa = pq = None
+
+EXPORT_CHUNK_ROWS = 5000  # Rows serialized at a time
+EXPORT_CACHE_ENTRIES = 8  # Finished payloads kept; least recently used are dropped
+
+# Format -> (MIME type, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'json': ('application/json', 'json'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+
+def available_formats():
+    """Export formats usable in this environment (Parquet needs pyarrow)"""
+    return [fmt for fmt in EXPORT_FORMATS if fmt != 'parquet' or pq is not None]
+
+
+def format_for_path(path, default='csv'):
+    """Export format implied by a file name's extension"""
+    extension = path.rsplit('.', 1)[-1].lower() if '.' in path else ''
+    for fmt, (_, fmt_extension) in EXPORT_FORMATS.items():
+        if extension == fmt_extension:
+            return fmt
+    return default
+
+
+def filter_fingerprint(*parts):
+    """Stable hash of whatever determines a result set: store version, window, filters"""
+    payload = json.dumps(parts, default=str, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def empty_articles():
+    """Article frame with no rows, typed as enriched articles are"""
+    df = pd.DataFrame({column: pd.Series(dtype=object) for column in ARTICLE_COLUMNS})
+    df['Published_Date'] = pd.Series(dtype='datetime64[ns, UTC]')
+    df['Published_Day'] = pd.Series(dtype='Int32')
+    return apply_article_schema(df)
+
+
+def _chunks(frames, chunk_rows):
+    """
+    Row chunks of a DataFrame, or the frames of an iterable as they come
+    Always at least one chunk, so an empty export still gets its header or schema.
+    """
+    if isinstance(frames, pd.DataFrame):
+        for start in range(0, max(len(frames), 1), chunk_rows):
+            yield frames.iloc[start:start + chunk_rows]
+        return
+    empty = True
+    for chunk in frames:
+        empty = False
+        yield chunk
+    if empty:
+        yield empty_articles()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only stream that hands back what was written since the last drain"""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def _iter_csv(chunks):
+    for position, chunk in enumerate(chunks):
+        yield chunk.to_csv(index=False, header=position == 0).encode('utf-8')
+
+
+def _iter_json(chunks):
+    # One indented array, as DataFrame.to_json(orient='records', indent=2) writes it
+    yield b'['
+    separator = '\n'
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        body = chunk.to_json(orient='records', indent=2, date_format='iso')[1:-1].strip('\n')
+        yield (separator + body).encode('utf-8')
+        separator = ',\n'
+    yield b'\n]' if separator != '\n' else b']'
+
+
+def _iter_ndjson(chunks):
+    for chunk in chunks:
+        if not chunk.empty:
+            yield chunk.to_json(orient='records', lines=True, date_format='iso').rstrip('\n').encode('utf-8') + b'\n'
+
+
+def _parquet_field(field):
+    """Column type to write: categoricals as their values; columns with no values at all as strings"""
+    if pa.types.is_dictionary(field.type):
+        field = field.with_type(field.type.value_type)
+    # An empty first chunk leaves text columns untyped
+    return field.with_type(pa.large_string()) if pa.types.is_null(field.type) else field
+
+
+def _iter_parquet(chunks):
+    sink = _ChunkSink()
+    writer = schema = None
+    for chunk in chunks:
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            # Categoricals become plain strings: each chunk's categories differ,
+            # and Parquet dictionary-encodes repeated strings on its own
+            schema = pa.schema([_parquet_field(field) for field in table.schema])
+            writer = pq.ParquetWriter(sink, schema, compression='zstd')
+        writer.write_table(table.cast(schema))
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+    yield sink.drain()
+
+
+_WRITERS = {'csv': _iter_csv, 'json': _iter_json, 'ndjson': _iter_ndjson, 'parquet': _iter_parquet}
+
+
+def iter_export(frames, fmt, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Serialize articles in the given format, one chunk of rows at a time
+    frames: a DataFrame, or an iterable of DataFrames with the same columns
+    (e.g. ArticleStore.iter_articles)
+    Returns: iterator of bytes; concatenated they form the whole file
+    """
+    if fmt not in available_formats():
+        raise ValueError(f"Unsupported export format: {fmt}")
+    return _WRITERS[fmt](_chunks(frames, chunk_rows))
+
+
+def export_bytes(frames, fmt, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Whole export payload in memory, for download buttons"""
+    with metrics.timer(f"export.{fmt}"):
+        return b''.join(iter_export(frames, fmt, chunk_rows))
+
+
+def write_export(frames, fmt, out, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Stream an export to a binary file object
+    Returns: number of bytes written
+    """
+    written = 0
+    with metrics.timer(f"export.{fmt}"):
+        for data in iter_export(frames, fmt, chunk_rows):
+            out.write(data)
+            written += len(data)
+    return written
+
+
+class ExportCache:
+    """
+    Finished export payloads by (fingerprint, format), in memory
+    Thread-safe: Streamlit builds deferred downloads off the script thread.
+    """
+
+    def __init__(self, max_entries=EXPORT_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, fingerprint, fmt, build):
+        """Cached payload for the key, calling build() to make it on a miss"""
+        key = (fingerprint, fmt)
+        with self.lock:
+            payload = self.entries.get(key)
+            if payload is not None:
+                self.entries.move_to_end(key)
+                metrics.count('export.cache_hits')
+                return payload
+        
+        payload = build()
+        metrics.count('export.builds')
+        with self.lock:
+            self.entries[key] = payload
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return payload
+
+
+export_cache = ExportCache()
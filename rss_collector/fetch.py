@@ -0,0 +1,345 @@
+"""
+Feed fetching - Google News RSS queries, on-disk feed cache and rate limiting
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
+from urllib.parse import quote_plus, urlparse
+
+import feedparser
+import pandas as pd
+
+from .metrics import metrics
+from .parse import parse_feed_columns
+from .query import QuerySyntaxError, parse_query, plan_queries, query_mask, to_google_query
+
+# Collection engine settings
+GOOGLE_NEWS_RSS_URL = 'https://news.google.com/rss/search'  # Overridden by the benchmarks' stub server
+MAX_CONCURRENT_FETCHES = 8  # Feeds fetched in parallel
+HOST_REQUESTS_PER_SECOND = 1.0  # Politeness budget per host: one request a second, as the original sleep(1) loop
+HOST_BURST = 1  # Requests a host may receive back-to-back before pacing kicks in
+MERGE_OVERLAPPING_QUERIES = True  # Answer narrower keywords from broader ones' results (see query.plan_queries)
+
+# Feed cache settings
+FEED_CACHE_DIR = os.path.join('.rss_cache', 'feeds')
+FEED_CACHE_TTL = 3600  # Seconds a cached feed is reused before revalidating
+FEED_FETCH_TIMEOUT = 30
+FEED_MAX_RETRIES = 3  # Further attempts after a 429 Too Many Requests or 503 Service Unavailable
+FEED_RETRY_BACKOFF = 2.0  # Seconds before the first retry, doubled for each one after
+FEED_RETRY_MAX_WAIT = 60  # Longest wait honoured, whatever Retry-After asks for
+RETRY_STATUS_CODES = {429, 503}
+
+# Columns of the raw rows handed to enrich_articles
+RAW_COLUMNS = ['Keyword', 'Title', 'URL', 'Published', 'Source', 'Description']
+
+
+def parse_boolean_search(search_term):
+    """
+    Parse boolean search into Google News format
+    Supports: AND, OR, NOT operators, parentheses and "quoted phrases"
+    Examples:
+    - "climate AND policy" → "climate policy"
+    - "tesla OR spacex" → "tesla OR spacex"  
+    - "AI NOT crypto" → "AI -crypto"
+    - "solar NOT (rooftop OR residential)" → "solar -rooftop -residential"
+    """
+    try:
+        root = parse_query(search_term)
+    except QuerySyntaxError:
+        root = None
+    if root is not None:
+        return to_google_query(root)
+    
+    # Not a well-formed query: pass it on with the operators Google spells differently
+    search_term = search_term.replace(' NOT ', ' -')
+    return search_term.replace(' AND ', ' ')
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket used to pace requests to a single host
+    Tokens refill at `rate` per second up to `capacity`
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_host_buckets = {}
+_host_buckets_lock = threading.Lock()
+
+
+def throttle_host(url):
+    """Wait until the rate limiter for the URL's host allows another request"""
+    host = urlparse(url).netloc
+    with _host_buckets_lock:
+        bucket = _host_buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(HOST_REQUESTS_PER_SECOND, HOST_BURST)
+            _host_buckets[host] = bucket
+    bucket.acquire()
+
+
+class FeedCache:
+    """
+    On-disk cache of feed responses keyed by query URL
+    Stores the ETag/Last-Modified validators, the raw body and the entry
+    columns extracted from it, so a 304 Not Modified needs no parsing at all.
+    """
+
+    def __init__(self, directory=FEED_CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, url, suffix):
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key + suffix)
+
+    def _write(self, path, data):
+        # Write to a temp file first so readers never see a partial file
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def load(self, url):
+        """Return the cached record for url, or None"""
+        try:
+            with open(self._path(url, '.json'), 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Records from before the columnar layout are treated as missing
+        return record if 'columns' in record else None
+
+    def save(self, url, etag, last_modified, body, columns):
+        """Store a fresh response for url"""
+        os.makedirs(self.directory, exist_ok=True)
+        record = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': time.time(),
+            'columns': columns
+        }
+        self._write(self._path(url, '.xml'), body)
+        self._write(self._path(url, '.json'), json.dumps(record).encode('utf-8'))
+
+    def touch(self, record):
+        """Mark a cached record as revalidated now"""
+        record['fetched_at'] = time.time()
+        self._write(self._path(record['url'], '.json'), json.dumps(record).encode('utf-8'))
+
+
+feed_cache = FeedCache()
+
+
+def retry_delay(error, attempt):
+    """
+    Seconds to wait before retrying a throttled request
+    Honours the response's Retry-After (seconds or an HTTP date) and falls
+    back to exponential backoff; either way capped at FEED_RETRY_MAX_WAIT.
+    """
+    delay = FEED_RETRY_BACKOFF * 2 ** attempt
+    retry_after = error.headers.get('Retry-After') if error.headers is not None else None
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                pass
+    return min(max(delay, 0), FEED_RETRY_MAX_WAIT)
+
+
+def open_feed(url, headers):
+    """
+    GET a feed, retrying with backoff while the host answers 429 or 503
+    Every attempt goes through the host's rate limiter.
+    Returns: (body, ETag, Last-Modified)
+    Raises: urllib.error.HTTPError for other statuses (including 304) and
+    once FEED_MAX_RETRIES retries are used up
+    """
+    for attempt in range(FEED_MAX_RETRIES + 1):
+        # Be nice to Google's servers
+        with metrics.timer('fetch.throttle'):
+            throttle_host(url)
+        request = urllib.request.Request(url, headers=headers)
+        metrics.count('feed.requests')
+        try:
+            with metrics.timer('fetch.http'):
+                with urllib.request.urlopen(request, timeout=FEED_FETCH_TIMEOUT) as response:
+                    return response.read(), response.headers.get('ETag'), response.headers.get('Last-Modified')
+        except urllib.error.HTTPError as e:
+            if e.code not in RETRY_STATUS_CODES or attempt == FEED_MAX_RETRIES:
+                raise
+            delay = retry_delay(e, attempt)
+        metrics.count('feed.retries')
+        with metrics.timer('fetch.backoff'):
+            time.sleep(delay)
+
+
+def fetch_feed_columns(url, cache=None):
+    """
+    Fetch a feed's entry columns, reusing the on-disk cache where possible
+    Fresh cache records are returned without touching the network; stale ones
+    are revalidated with a conditional request and reused on 304 Not Modified.
+    Throttled requests are retried (see open_feed); if the host is still
+    throttling afterwards, a stale cache record is served rather than nothing.
+    """
+    cache = cache or feed_cache
+    metrics.count('feed.lookups')
+    with metrics.timer('fetch.cache_read'):
+        cached = cache.load(url)
+    if cached is not None and time.time() - cached['fetched_at'] < FEED_CACHE_TTL:
+        metrics.count('feed.cache_fresh')
+        return cached['columns']
+    
+    headers = {'User-Agent': feedparser.USER_AGENT}
+    if cached is not None:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+    
+    try:
+        body, etag, last_modified = open_feed(url, headers)
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cached is not None:
+            metrics.count('feed.not_modified')
+            cache.touch(cached)
+            return cached['columns']
+        if e.code in RETRY_STATUS_CODES and cached is not None:
+            # Still throttled after every retry: stale entries beat none
+            metrics.count('feed.stale')
+            return cached['columns']
+        raise
+    metrics.count('feed.downloaded')
+    metrics.count('feed.bytes', len(body))
+    
+    with metrics.timer('fetch.parse'):
+        columns = parse_feed_columns(body)
+    with metrics.timer('fetch.cache_write'):
+        cache.save(url, etag, last_modified, body, columns)
+    return columns
+
+
+def empty_raw_columns():
+    """Raw article columns with no rows"""
+    return {column: [] for column in RAW_COLUMNS}
+
+
+def fetch_google_news_rss(keyword, cache=None):
+    """
+    Fetch raw articles from Google News RSS for a specific keyword
+    Returns unenriched columns; see enrich_articles for dates and reach data.
+    Safe to call from worker threads; errors propagate to the caller
+    Returns: dict of raw column name -> list of values
+    """
+    # Parse boolean operators
+    parsed_keyword = parse_boolean_search(keyword)
+    url = f"{GOOGLE_NEWS_RSS_URL}?q={quote_plus(parsed_keyword)}&hl=en-US&gl=US&ceid=US:en"
+    
+    with metrics.timer('fetch.keyword'):
+        columns = fetch_feed_columns(url, cache)
+    metrics.count('feed.entries', len(columns['link']))
+    return {
+        'Keyword': [keyword] * len(columns['link']),
+        'Title': columns['title'],
+        'URL': columns['link'],
+        'Published': columns['published'],
+        'Source': columns['source'],
+        'Description': columns['summary']
+    }
+
+
+def served_columns(keyword, sources, root, results):
+    """
+    Raw columns for a keyword answered from other keywords' results
+    Rows are kept when the keyword's query matches their title and description.
+    """
+    frames = [pd.DataFrame(results[source]) for source in sources if results.get(source) is not None]
+    if not frames:
+        return empty_raw_columns()
+    rows = pd.concat(frames, ignore_index=True)
+    rows = rows[query_mask(rows, root)].drop_duplicates(subset=['URL'])
+    return {column: [keyword] * len(rows) if column == 'Keyword' else rows[column].tolist() for column in RAW_COLUMNS}
+
+
+def fetch_all_keywords(keywords, max_workers=MAX_CONCURRENT_FETCHES, cache=None, on_progress=None,
+                       merge_queries=MERGE_OVERLAPPING_QUERIES, plan=None):
+    """
+    Fetch raw articles for many keywords concurrently
+    Fetches run on a thread pool paced by the per-host rate limiter, so total
+    time is bounded by the politeness budget rather than the keyword count.
+    With merge_queries, keywords implied by broader ones in the list are not
+    requested but picked out of the broader results (see plan_queries).
+    plan: plan_queries(keywords), when the caller has already made it
+    on_progress(keyword, done, total, error) is called from the calling thread
+    as each request completes, in whatever order that is.
+    Returns: raw columns, with rows grouped in keyword order
+    """
+    results = {}
+    if len(keywords) == 0:
+        return empty_raw_columns()
+    
+    if plan is None and merge_queries:
+        plan = plan_queries(keywords)
+    requests = plan.requests if plan is not None else list(dict.fromkeys(keywords))
+    total_requests = len(requests)
+    metrics.count('query.keywords', len(keywords))
+    metrics.count('query.requests', total_requests)
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total_requests))) as executor:
+        futures = {executor.submit(fetch_google_news_rss, keyword, cache): keyword for keyword in requests}
+        
+        for done, future in enumerate(as_completed(futures), 1):
+            keyword = futures[future]
+            error = None
+            try:
+                results[keyword] = future.result()
+            except Exception as e:
+                results[keyword] = None
+                error = e
+                metrics.count('feed.errors')
+            if on_progress is not None:
+                on_progress(keyword, done, total_requests, error)
+    
+    # Answer merged keywords from the results they draw on
+    if plan is not None:
+        with metrics.timer('query.match'):
+            for keyword, root in plan.queries.items():
+                results[keyword] = served_columns(keyword, plan.sources[keyword], root, results)
+    
+    # Reassemble in keyword order so duplicate resolution stays deterministic
+    rows = empty_raw_columns()
+    for keyword in keywords:
+        if results[keyword] is None:
+            continue
+        for column, values in results[keyword].items():
+            rows[column].extend(values)
+    return rows
@@ -0,0 +1,134 @@
+"""
+Search & Filter engine - per-stage boolean masks with memoization
+
+Each filter stage caches its mask against that stage's own inputs, so a
+widget change recomputes one mask and ANDs it with the cached rest. The
+counts with and without the text search come out of the same pass.
+Results are paged server-side: each sort key's order over the whole window
+is computed once, and a page is that order restricted to the mask, sliced.
+"""
+
+import numpy as np
+
+from .keywords import articles_with_keywords
+from .query import QuerySyntaxError, parse_query, query_mask, search_text
+
+
+def text_matches(df, search_term, text=None):
+    """
+    Mask of articles whose title or description match a search box query
+    (case-insensitive scan; words match as prefixes, as in the full-text index).
+    A query that does not parse is looked for as plain text. text is
+    search_text(df) when the caller keeps it.
+    """
+    try:
+        root = parse_query(search_term)
+    except QuerySyntaxError:
+        root = None
+    if root is not None:
+        return query_mask(df, root, prefix=True, text=text)
+    return (
+        df['Title'].str.contains(search_term, case=False, na=False, regex=False) |
+        df['Description'].str.contains(search_term, case=False, na=False, regex=False)
+    )
+
+
+class FilterEngine:
+    """
+    Cached filter masks over one loaded window of articles
+    df is indexed by article_id; membership holds its keyword pairs.
+    text_search(term) may return the matching article ids from an index;
+    when it is missing or returns None, titles and descriptions are scanned.
+    """
+
+    def __init__(self, df, membership, text_search=None):
+        self.df = df
+        self.membership = membership
+        self.text_search = text_search
+        self._masks = {}
+        self._distinct = {}
+        self._orders = {}
+        self._text = None
+
+    def _stage(self, name, key, compute):
+        """Return the stage's mask, recomputing only when its inputs changed"""
+        cached = self._masks.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        mask = np.asarray(compute(), dtype=bool)
+        self._masks[name] = (key, mask)
+        return mask
+
+    def distinct(self, column):
+        """Sorted distinct values of a column, for filter options"""
+        if column not in self._distinct:
+            self._distinct[column] = sorted(self.df[column].unique().tolist())
+        return self._distinct[column]
+
+    def sort_order(self, column, ascending=True):
+        """
+        Row positions of the window sorted by a column, computed once per key
+        Missing values sort last either way; ties keep article id order.
+        """
+        key = (column, ascending)
+        if key not in self._orders:
+            values = self.df[column].reset_index(drop=True)
+            self._orders[key] = values.sort_values(ascending=ascending, na_position='last',
+                                                   kind='stable').index.to_numpy()
+        return self._orders[key]
+
+    def page(self, mask, column, ascending=True, page_number=1, page_size=50):
+        """
+        One page of the masked rows in sort order, without sorting or copying the rest
+        page_number counts from 1
+        Returns: DataFrame of at most page_size rows
+        """
+        order = self.sort_order(column, ascending)
+        ranks = np.flatnonzero(np.asarray(mask, dtype=bool)[order])
+        start = (page_number - 1) * page_size
+        return self.df.iloc[order[ranks[start:start + page_size]]]
+
+    def search_mask(self, search_term):
+        return self._stage('search', search_term, lambda: self._search(search_term))
+
+    def _search(self, search_term):
+        if self.text_search is not None:
+            article_ids = self.text_search(search_term)
+            if article_ids is not None:
+                return self.df.index.isin(article_ids)
+        if self._text is None:
+            self._text = search_text(self.df)
+        return text_matches(self.df, search_term, self._text)
+
+    def tier_mask(self, tiers):
+        return self._stage('tiers', frozenset(tiers), lambda: self.df['Reach_Tier'].isin(tiers))
+
+    def keyword_mask(self, keywords):
+        return self._stage('keywords', frozenset(keywords), lambda: self.df.index.isin(
+            articles_with_keywords(self.membership, keywords)
+        ))
+
+    def category_mask(self, categories):
+        return self._stage('categories', frozenset(categories), lambda: self.df['Source_Category'].isin(categories))
+
+    def source_mask(self, sources):
+        return self._stage('sources', frozenset(sources), lambda: self.df['Source'].isin(sources))
+
+    def apply(self, search_term='', tiers=(), keywords=(), categories=(), sources=()):
+        """
+        Combine the active stages; empty selections do not filter
+        Returns: (mask before the text search, final mask)
+        """
+        before_search = np.ones(len(self.df), dtype=bool)
+        if tiers:
+            before_search &= self.tier_mask(tiers)
+        if keywords:
+            before_search &= self.keyword_mask(keywords)
+        if categories:
+            before_search &= self.category_mask(categories)
+        if sources:
+            before_search &= self.source_mask(sources)
+        
+        if not search_term:
+            return before_search, before_search
+        return before_search, before_search & self.search_mask(search_term)
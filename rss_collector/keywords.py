@@ -0,0 +1,53 @@
+"""
+Keyword attribution - which keywords matched each article
+
+Articles are stored once; membership is a separate (article_id, Keyword)
+table, so an article found by five keywords counts towards all five without
+duplicating its row.
+"""
+
+import pandas as pd
+
+from .enrich import observed_counts
+
+MEMBERSHIP_COLUMNS = ['article_id', 'Keyword']
+
+
+def empty_membership():
+    """Membership frame with no rows"""
+    return pd.DataFrame({
+        'article_id': pd.Series(dtype='int64'),
+        'Keyword': pd.Categorical([])
+    })
+
+
+def build_keyword_membership(rows, articles):
+    """
+    Build the (article_id, Keyword) pairs for a collection
+    rows: raw rows, one per keyword hit; articles: the same rows de-duplicated
+    by URL, whose index supplies the article ids
+    """
+    if rows.empty:
+        return empty_membership()
+    
+    article_ids = pd.Series(articles.index, index=articles['URL'])
+    pairs = rows[['URL', 'Keyword']].drop_duplicates()
+    return pd.DataFrame({
+        'article_id': article_ids.reindex(pairs['URL']).to_numpy(),
+        'Keyword': pd.Categorical(pairs['Keyword'], categories=pd.unique(rows['Keyword']))
+    })
+
+
+def keyword_counts(membership, article_ids=None):
+    """
+    Articles per keyword, crediting every keyword an article matched
+    Restricted to article_ids when given. Sorted like value_counts.
+    """
+    if article_ids is not None:
+        membership = membership[membership['article_id'].isin(article_ids)]
+    return observed_counts(membership['Keyword'])
+
+
+def articles_with_keywords(membership, keywords):
+    """Ids of articles matched by any of the given keywords"""
+    return membership.loc[membership['Keyword'].isin(keywords), 'article_id'].unique()
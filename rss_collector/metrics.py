@@ -0,0 +1,125 @@
+"""
+Stage metrics - timings and counters for the collection pipeline and the app
+
+Instrumented code wraps work in `with metrics.timer('stage'):` and bumps
+counters with metrics.count(); both are cheap enough to leave on. Timings
+keep a bounded window of recent samples for percentiles plus running totals.
+"""
+
+import json
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+TIMING_WINDOW = 1024  # Recent samples kept per stage for percentiles
+PERCENTILES = (50, 90, 99)
+PROMETHEUS_PREFIX = 'rss_collector'
+
+
+class Metrics:
+    """Thread-safe registry of stage timings and counters"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget every sample and counter"""
+        with self.lock:
+            self.samples = {}
+            self.totals = {}
+            self.counters = {}
+            self.started_at = time.time()
+
+    def observe(self, stage, seconds):
+        """Record one duration for a stage"""
+        with self.lock:
+            samples = self.samples.get(stage)
+            if samples is None:
+                samples = self.samples[stage] = deque(maxlen=TIMING_WINDOW)
+                self.totals[stage] = [0, 0.0]
+            samples.append(seconds)
+            self.totals[stage][0] += 1
+            self.totals[stage][1] += seconds
+
+    @contextmanager
+    def timer(self, stage):
+        """Time the with-block as one sample of stage, even if it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def count(self, name, amount=1):
+        """Add amount to a counter"""
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self):
+        """
+        Current state as plain data
+        Returns: {'since', 'counters', 'stages'}; each stage has count, total,
+        mean and max seconds plus p50/p90/p99 over the recent window
+        """
+        with self.lock:
+            samples = {stage: np.fromiter(values, dtype=float) for stage, values in self.samples.items()}
+            totals = {stage: list(total) for stage, total in self.totals.items()}
+            counters = dict(self.counters)
+            since = self.started_at
+        
+        stages = {}
+        for stage in sorted(samples):
+            count, total = totals[stage]
+            window = samples[stage]
+            stats = {'count': count, 'total': total, 'mean': total / count, 'max': float(window.max())}
+            for percentile, value in zip(PERCENTILES, np.percentile(window, PERCENTILES)):
+                stats[f"p{percentile}"] = float(value)
+            stages[stage] = stats
+        return {'since': since, 'counters': dict(sorted(counters.items())), 'stages': stages}
+
+    def to_json(self):
+        """Snapshot as a JSON document"""
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """Snapshot in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in snapshot['counters'].items():
+            metric = f"{PROMETHEUS_PREFIX}_{_metric_name(name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        
+        metric = f"{PROMETHEUS_PREFIX}_stage_seconds"
+        if snapshot['stages']:
+            lines.append(f"# TYPE {metric} summary")
+        for stage, stats in snapshot['stages'].items():
+            for percentile in PERCENTILES:
+                lines.append(f'{metric}{{stage="{stage}",quantile="{percentile / 100}"}} {stats[f"p{percentile}"]:.6f}')
+            lines.append(f'{metric}_sum{{stage="{stage}"}} {stats["total"]:.6f}')
+            lines.append(f'{metric}_count{{stage="{stage}"}} {stats["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _metric_name(name):
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+
+def cache_hit_rate(counters):
+    """
+    Share of feed lookups answered without downloading a body
+    Fresh cache records and 304 revalidations both count as hits.
+    Returns: fraction in [0, 1], or None before any lookup
+    """
+    lookups = counters.get('feed.lookups', 0)
+    if lookups == 0:
+        return None
+    return (counters.get('feed.cache_fresh', 0) + counters.get('feed.not_modified', 0)) / lookups
+
+
+metrics = Metrics()
@@ -0,0 +1,355 @@
+"""
+Boolean queries - parse keywords and searches, compile them, plan feed requests
+
+Keywords and the search box share one syntax: words and "quoted phrases"
+combined with AND, OR, NOT (or a leading -) and parentheses. As in Google,
+OR binds tighter than AND, and words next to each other are ANDed, so
+"climate policy OR law" means climate AND (policy OR law). A parsed query
+compiles to Google News syntax (to_google_query), to an FTS5 expression
+(search.fts_expression) and to a vectorized mask over a frame of articles
+(query_mask), so stored articles can be searched exactly as Google was asked.
+
+Watchlists overlap: "solar", "solar AND policy" and "solar NOT rooftop"
+all draw on the same articles. plan_queries rewrites each keyword into OR-ed
+conjunctions of required and excluded terms. A keyword whose conjunctions
+are all implied by broader keywords in the same list is not requested at
+all. Its articles are picked out of the broader keywords' results with
+query_mask. Keywords using Google's own operators (when:1d, site:, intitle:)
+are always requested as written, since only Google can evaluate them.
+"""
+
+import re
+
+import numpy as np
+
+MAX_PLANNED_CONJUNCTIONS = 16  # Keywords expanding to more OR-ed terms are always requested as written
+
+TOKEN_PATTERN = re.compile(r'-?"[^"]*"?|-?\(|\)|[^\s()"]+')  # A leading - stays on its phrase or group
+OPERATORS = {'AND', 'OR', 'NOT'}
+
+_WORD = re.compile(r'\w+')
+_MARKUP = re.compile(r'<[^>]*>|&#?\w+;')  # Tags and entities, such as Google's <font color="#6f6f6f"> and &nbsp;
+
+
+class QuerySyntaxError(ValueError):
+    """A keyword that is not a well-formed boolean query"""
+
+
+def term_words(text):
+    """A term or text as lowercase words; terms match whole words, case-insensitively"""
+    return tuple(_WORD.findall(text.lower()))
+
+
+def parse_query(query):
+    """
+    Parse a boolean query into a syntax tree of tuples:
+    ('word', text), ('phrase', text), ('not', node), ('and', nodes) and
+    ('or', nodes), with term text as written
+    Returns: the root node, or None when the query has no terms
+    Raises: QuerySyntaxError on unbalanced parentheses or dangling operators
+    """
+    tokens = TOKEN_PATTERN.findall(query)
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def conjunction():
+        # Adjacent operands and explicit AND both mean AND
+        nodes = []
+        while peek() not in (None, ')'):
+            if peek() == 'AND':
+                take()
+                if not nodes or peek() in (None, ')', 'AND', 'OR'):
+                    raise QuerySyntaxError(f"AND needs a term on both sides in {query!r}")
+                continue
+            node = disjunction()
+            if node is not None:
+                nodes.append(node)
+        return _combine('and', nodes)
+
+    def disjunction():
+        nodes = [unary()]
+        while peek() == 'OR':
+            take()
+            nodes.append(unary())
+        return _combine('or', [node for node in nodes if node is not None])
+
+    def unary():
+        token = peek()
+        if token is None or token in ('AND', 'OR', ')'):
+            raise QuerySyntaxError(f"Expected a term in {query!r}")
+        if token == 'NOT':
+            take()
+            node = unary()
+            return None if node is None else ('not', node)
+        if token.startswith('-') and len(token) > 1:
+            # -word, -"phrase" or -( group ): the rest of the token is read as a term
+            tokens[position] = token[1:]
+            node = primary()
+            return None if node is None else ('not', node)
+        return primary()
+
+    def primary():
+        token = take()
+        if token == '(':
+            node = conjunction()
+            if peek() != ')':
+                raise QuerySyntaxError(f"Unbalanced parentheses in {query!r}")
+            take()
+            return node
+        if token.startswith('"'):
+            text = token.strip('"').strip()
+            return ('phrase', text) if term_words(text) else None
+        return ('word', token) if term_words(token) else None
+    
+    root = conjunction()
+    if peek() is not None:
+        raise QuerySyntaxError(f"Unbalanced parentheses in {query!r}")
+    return root
+
+
+def _combine(operator, nodes):
+    if not nodes:
+        return None
+    return nodes[0] if len(nodes) == 1 else (operator, tuple(nodes))
+
+
+def to_google_query(node):
+    """
+    Google News query for a syntax tree
+    AND becomes adjacency and NOT a leading -; negated groups are rewritten
+    by De Morgan, since Google only excludes single terms.
+    """
+    kind = node[0]
+    if kind == 'word':
+        return node[1]
+    if kind == 'phrase':
+        return f'"{node[1]}"'
+    if kind == 'not':
+        child = node[1]
+        if child[0] in ('word', 'phrase'):
+            return '-' + to_google_query(child)
+        if child[0] == 'not':
+            return to_google_query(child[1])
+        negated = tuple(('not', grandchild) for grandchild in child[1])
+        if child[0] == 'and':
+            return f"({to_google_query(('or', negated))})"
+        return to_google_query(('and', negated))
+    if kind == 'and':
+        return ' '.join(f"({to_google_query(child)})" if child[0] == 'or' else to_google_query(child)
+                        for child in node[1])
+    return ' OR '.join(f"({to_google_query(child)})" if child[0] == 'and' else to_google_query(child)
+                       for child in node[1])
+
+
+def prefixable(text):
+    """
+    Whether a bare word may match as a prefix: only plain words may, since
+    "c++" or "covid-19" would otherwise match anything starting with "c" or "covid"
+    """
+    return _WORD.fullmatch(text) is not None
+
+
+def term_pattern(words, prefix=False):
+    """Regex matching a term's words in order, as whole words (the last as a prefix if asked)"""
+    return r'\b' + r'\W+'.join(re.escape(word) for word in words) + ('' if prefix else r'\b')
+
+
+def description_text(descriptions):
+    """
+    Descriptions as searchable text, without HTML tags and entities
+    The full-text index is fed the same text, so both search paths agree.
+    """
+    return descriptions.fillna('').astype(str).str.replace(_MARKUP, ' ', regex=True)
+
+
+def search_text(df):
+    """Title and description of each article as one string, as description_text cleans it"""
+    return df['Title'].fillna('').astype(str) + ' ' + description_text(df['Description'])
+
+
+def query_mask(df, node, prefix=False, text=None):
+    """
+    Vectorized predicate: which articles' title or description satisfy the query
+    Each distinct term is one case-insensitive regex pass over the text;
+    AND, OR and NOT are then boolean array operations. prefix lets a plain
+    word (see prefixable) match the start of a longer word, as the search
+    box does. text is search_text(df), for callers that search the same
+    frame repeatedly.
+    Returns: bool array aligned with df
+    """
+    if text is None:
+        text = search_text(df)
+    term_masks = {}
+
+    def evaluate(node):
+        kind = node[0]
+        if kind in ('word', 'phrase'):
+            # Quoted phrases and words with punctuation always match exactly
+            key = (term_words(node[1]), prefix and kind == 'word' and prefixable(node[1]))
+            if key not in term_masks:
+                pattern = term_pattern(*key)
+                term_masks[key] = text.str.contains(pattern, case=False, regex=True).to_numpy(dtype=bool)
+            return term_masks[key]
+        if kind == 'not':
+            return ~evaluate(node[1])
+        masks = [evaluate(child) for child in node[1]]
+        return np.logical_and.reduce(masks) if kind == 'and' else np.logical_or.reduce(masks)
+    
+    return evaluate(node)
+
+
+def to_dnf(node, limit=MAX_PLANNED_CONJUNCTIONS):
+    """
+    Rewrite a syntax tree as OR-ed conjunctions
+    Each conjunction is (required terms, excluded terms), both frozensets of
+    word tuples; contradictory conjunctions are dropped.
+    Returns: list of conjunctions, or None when there would be more than limit
+    """
+    def expand(node, negated):
+        kind = node[0]
+        if kind in ('word', 'phrase'):
+            term = frozenset([term_words(node[1])])
+            return [(frozenset(), term)] if negated else [(term, frozenset())]
+        if kind == 'not':
+            return expand(node[1], not negated)
+        # De Morgan: under NOT, AND and OR swap
+        if (kind == 'and') != negated:
+            conjunctions = [(frozenset(), frozenset())]
+            for child in node[1]:
+                child_conjunctions = expand(child, negated)
+                if child_conjunctions is None:
+                    return None
+                conjunctions = [
+                    (required | child_required, excluded | child_excluded)
+                    for required, excluded in conjunctions
+                    for child_required, child_excluded in child_conjunctions
+                    if not (required | child_required) & (excluded | child_excluded)
+                ]
+                if len(conjunctions) > limit:
+                    return None
+            return conjunctions
+        conjunctions = []
+        for child in node[1]:
+            child_conjunctions = expand(child, negated)
+            if child_conjunctions is None:
+                return None
+            conjunctions.extend(child_conjunctions)
+        conjunctions = list(dict.fromkeys(conjunctions))
+        return conjunctions if len(conjunctions) <= limit else None
+    
+    return expand(node, False)
+
+
+def has_search_operator(query):
+    """Whether a query uses a Google operator such as when:1d or site:example.com (any unquoted term with a colon)"""
+    return any(':' in token for token in TOKEN_PATTERN.findall(query) if not token.lstrip('-').startswith('"'))
+
+
+def _represents(query, root):
+    """Whether every term written in query survives in its syntax tree (none were dropped as unsearchable)"""
+    written = sum(token not in OPERATORS and token not in ('(', '-(', ')') for token in TOKEN_PATTERN.findall(query))
+    stack = [root] if root is not None else []
+    kept = 0
+    while stack:
+        node = stack.pop()
+        if node[0] in ('word', 'phrase'):
+            kept += 1
+        elif node[0] == 'not':
+            stack.append(node[1])
+        else:
+            stack.extend(node[1])
+    return kept == written
+
+
+def _implies(narrow, broad):
+    """Whether every article matching conjunction narrow also matches broad"""
+    return broad[0] <= narrow[0] and broad[1] <= narrow[1]
+
+
+class QueryPlan:
+    """
+    Feed requests for a list of keywords
+    requests: keywords to fetch, in watchlist order
+    sources: keyword -> requested keywords whose results it draws from
+    queries: keyword -> syntax tree to evaluate locally (query_mask), for
+    keywords served from other requests; requested keywords keep everything
+    Google returns
+    """
+
+    def __init__(self, requests, sources, queries):
+        self.requests = requests
+        self.sources = sources
+        self.queries = queries
+
+    def merged(self):
+        """Keywords answered without a request of their own"""
+        return [keyword for keyword, sources in self.sources.items() if sources != [keyword]]
+
+
+def plan_queries(keywords):
+    """
+    Choose which keywords to request so that every keyword can be answered
+    A conjunction is implied by another when it requires and excludes at
+    least the same terms ("solar AND policy" by "solar"). Keywords that are a
+    single conjunction are requested unless a broader one is; keywords that
+    expand to several conjunctions are served only when each is implied by a
+    requested single-conjunction keyword, as "solar OR wind" is by "solar"
+    and "wind". Keywords that do not parse, drop a term the tree cannot hold,
+    use a Google operator, require nothing, or expand too far are requested
+    as written, and never serve other keywords.
+    Returns: QueryPlan
+    """
+    roots = {}
+    parsed = {}
+    for keyword in dict.fromkeys(keywords):
+        if has_search_operator(keyword):
+            continue
+        try:
+            roots[keyword] = parse_query(keyword)
+        except QuerySyntaxError:
+            continue
+        if not _represents(keyword, roots[keyword]):
+            continue
+        conjunctions = to_dnf(roots[keyword]) if roots[keyword] is not None else None
+        if conjunctions and all(required for required, _ in conjunctions):
+            parsed[keyword] = conjunctions
+    
+    # Single conjunctions, the first keyword for each; the broadest are requested
+    singles = {}
+    for keyword, conjunctions in parsed.items():
+        if len(conjunctions) == 1:
+            singles.setdefault(conjunctions[0], keyword)
+    broadest = {
+        conjunction: keyword for conjunction, keyword in singles.items()
+        if not any(other != conjunction and _implies(conjunction, other) for other in singles)
+    }
+    
+    sources = {}
+    served = {}
+    for keyword in dict.fromkeys(keywords):
+        conjunctions = parsed.get(keyword)
+        if conjunctions is None:
+            sources[keyword] = [keyword]
+            continue
+        covering = []
+        for conjunction in conjunctions:
+            broader = [source for other, source in broadest.items() if _implies(conjunction, other)]
+            if not broader:
+                covering = None
+                break
+            covering.extend(broader)
+        if covering is None or covering == [keyword]:
+            sources[keyword] = [keyword]
+        else:
+            sources[keyword] = list(dict.fromkeys(covering))
+            served[keyword] = roots[keyword]
+    
+    requests = [keyword for keyword in sources if keyword not in served]
+    return QueryPlan(requests, sources, served)
@@ -0,0 +1,72 @@
+"""
+Text search - compile the app's boolean search syntax into FTS5 queries
+
+Queries are parsed by query.parse_query, so the search box, saved searches
+and keywords sent to Google all read AND, OR, NOT, parentheses and "quoted
+phrases" the same way. Grouping is written out explicitly because FTS5's own
+precedence differs from Google's. In the search box, bare words match as
+prefixes, so "climat" still finds "climate"; words with punctuation, such as
+"c++", match exactly.
+"""
+
+from .query import OPERATORS, TOKEN_PATTERN, QuerySyntaxError, parse_query, prefixable, term_words
+
+
+def _quote(text):
+    """Quote text as an FTS5 string literal"""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def fts_expression(node, prefix=True):
+    """
+    FTS5 MATCH expression for a syntax tree
+    FTS5 has no unary NOT, so exclusions must hang off a positive term in
+    the same AND group.
+    Returns: expression string, or None when the query only excludes
+    """
+    kind = node[0]
+    if kind == 'word':
+        # "c++"* would be a prefix query for "c": words with punctuation match exactly
+        return _quote(node[1]) + ('*' if prefix and prefixable(node[1]) else '')
+    if kind == 'phrase':
+        return _quote(node[1])
+    if kind == 'not':
+        return None
+    
+    if kind == 'or':
+        parts = [fts_expression(child, prefix) for child in node[1]]
+        return None if None in parts else '(' + ' OR '.join(parts) + ')'
+    
+    included = [child for child in node[1] if child[0] != 'not']
+    excluded = [child[1] for child in node[1] if child[0] == 'not']
+    parts = [fts_expression(child, prefix) for child in included]
+    if not parts or None in parts:
+        return None
+    expression = '(' + ' AND '.join(parts) + ')'
+    for child in excluded:
+        child_expression = fts_expression(child, prefix)
+        if child_expression is None:
+            return None
+        expression += f" NOT {child_expression}"
+    return expression
+
+
+def to_fts_query(search_term, prefix=True):
+    """
+    Translate a search box query into an FTS5 MATCH expression
+    A query that does not parse is searched for as its plain words.
+    Returns: FTS5 query string, or None when nothing searchable remains
+    or the query cannot be expressed in FTS5
+    """
+    try:
+        root = parse_query(search_term)
+    except QuerySyntaxError:
+        words = [token.lstrip('-').strip('"') for token in TOKEN_PATTERN.findall(search_term)
+                 if token not in OPERATORS and token not in ('(', '-(', ')')]
+        words = [word for word in words if term_words(word)]
+        root = ('and', tuple(('word', word) for word in words)) if words else None
+    if root is None:
+        return None
+    if root[0] != 'and':
+        root = ('and', (root,))
+    return fts_expression(root, prefix)
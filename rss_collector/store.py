@@ -0,0 +1,949 @@
+"""
+Article store - SQLite history of every collected article
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .classify import source_registry, terms_pattern
+from .enrich import (ARTICLE_COLUMNS, EPOCH, SOURCE_COLUMNS, apply_article_schema, classify_sources, date_to_day,
+                     day_to_date, source_dimension)
+from .keywords import MEMBERSHIP_COLUMNS
+from .metrics import metrics
+from .query import QuerySyntaxError, description_text, parse_query, query_mask
+from .search import to_fts_query
+from .stories import band_keys, match_stories, title_signatures
+
+# Article store settings
+ARTICLE_STORE_PATH = os.path.join('rss_store', 'articles.db')
+
+
+# Article frame column -> article store column
+STORE_COLUMNS = {
+    'Keyword': 'keyword',
+    'Title': 'title',
+    'URL': 'url',
+    'Published': 'published',
+    'Source': 'source',
+    'Source_Category': 'source_category',
+    'Reach_Tier': 'reach_tier',
+    'Reach_Estimate': 'reach_estimate',
+    'Reach_Score': 'reach_score',
+    'Reach_Label': 'reach_label',
+    'Reach_Reasoning': 'reach_reasoning',
+    'Description': 'description',
+}
+
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    keyword TEXT,
+    title TEXT,
+    published TEXT,
+    published_ts INTEGER,
+    published_day INTEGER,
+    source TEXT,
+    source_category TEXT,
+    reach_tier INTEGER,
+    reach_estimate TEXT,
+    reach_score INTEGER,
+    reach_label TEXT,
+    reach_reasoning TEXT,
+    description TEXT,
+    description_text TEXT,
+    collected_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_articles_published_ts ON articles(published_ts);
+CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS keywords (
+    id INTEGER PRIMARY KEY,
+    keyword TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS article_keywords (
+    article_id INTEGER NOT NULL,
+    keyword_id INTEGER NOT NULL,
+    PRIMARY KEY (article_id, keyword_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    source_category TEXT,
+    reach_tier INTEGER,
+    reach_estimate TEXT,
+    reach_score INTEGER,
+    reach_label TEXT,
+    reach_reasoning TEXT
+);
+CREATE TABLE IF NOT EXISTS stories (
+    id INTEGER PRIMARY KEY,
+    signature BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS story_buckets (
+    key INTEGER NOT NULL,
+    band INTEGER NOT NULL,
+    story_id INTEGER NOT NULL,
+    PRIMARY KEY (key, band)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS keyword_runs (
+    keyword_id INTEGER PRIMARY KEY,
+    high_water_ts INTEGER,
+    last_run_at INTEGER NOT NULL,
+    last_new INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS saved_searches (
+    name TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    saved_at INTEGER NOT NULL
+);
+"""
+
+# Full-text index over titles and tag-stripped descriptions (description_text,
+# cleaned as query.search_text does), kept in sync by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE articles_fts USING fts5(
+    title, description_text,
+    content='articles', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE TRIGGER articles_fts_insert AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, description_text) VALUES (new.id, new.title, new.description_text);
+END;
+CREATE TRIGGER articles_fts_delete AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, description_text)
+    VALUES ('delete', old.id, old.title, old.description_text);
+END;
+CREATE TRIGGER articles_fts_update AFTER UPDATE OF title, description_text ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, description_text)
+    VALUES ('delete', old.id, old.title, old.description_text);
+    INSERT INTO articles_fts (rowid, title, description_text) VALUES (new.id, new.title, new.description_text);
+END;
+INSERT INTO articles_fts (articles_fts) VALUES ('rebuild');
+"""
+# Indexes built from the raw description HTML, dropped and rebuilt on open
+OLD_FTS_OBJECTS = """
+DROP TRIGGER IF EXISTS articles_fts_insert;
+DROP TRIGGER IF EXISTS articles_fts_delete;
+DROP TRIGGER IF EXISTS articles_fts_update;
+DROP TABLE IF EXISTS articles_fts;
+"""
+
+# Daily rollups: article counts per (day, source, tier, category) and per
+# (day, keyword), kept current by triggers so date-range summaries only sum
+# rollup rows. Keywords get their own table because an article can match
+# several. Undated articles are counted under UNDATED_DAY.
+UNDATED_DAY = -2**31
+_ROLLUP_DAY = "COALESCE({row}.published_day, %d)" % UNDATED_DAY
+_ROLLUP_KEY = ("day = " + _ROLLUP_DAY + " AND source = COALESCE({row}.source, '') "
+               "AND reach_tier = COALESCE({row}.reach_tier, 4) AND source_category = COALESCE({row}.source_category, '')")
+_ROLLUP_VALUES = (_ROLLUP_DAY + ", COALESCE({row}.source, ''), COALESCE({row}.reach_tier, 4), "
+                  "COALESCE({row}.source_category, ''), 1, COALESCE({row}.reach_score, 0)")
+ROLLUP_SCHEMA = f"""
+CREATE TABLE daily_rollups (
+    day INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    reach_tier INTEGER NOT NULL,
+    source_category TEXT NOT NULL,
+    articles INTEGER NOT NULL,
+    score_sum INTEGER NOT NULL,
+    PRIMARY KEY (day, source, reach_tier, source_category)
+) WITHOUT ROWID;
+CREATE TABLE daily_keyword_rollups (
+    day INTEGER NOT NULL,
+    keyword_id INTEGER NOT NULL,
+    articles INTEGER NOT NULL,
+    PRIMARY KEY (day, keyword_id)
+) WITHOUT ROWID;
+CREATE TRIGGER daily_rollups_insert AFTER INSERT ON articles BEGIN
+    INSERT INTO daily_rollups (day, source, reach_tier, source_category, articles, score_sum)
+    VALUES ({_ROLLUP_VALUES.format(row='new')})
+    ON CONFLICT (day, source, reach_tier, source_category)
+    DO UPDATE SET articles = articles + 1, score_sum = score_sum + excluded.score_sum;
+END;
+CREATE TRIGGER daily_rollups_delete AFTER DELETE ON articles BEGIN
+    UPDATE daily_rollups SET articles = articles - 1, score_sum = score_sum - COALESCE(old.reach_score, 0)
+    WHERE {_ROLLUP_KEY.format(row='old')};
+    UPDATE daily_keyword_rollups SET articles = articles - 1
+    WHERE day = {_ROLLUP_DAY.format(row='old')}
+    AND keyword_id IN (SELECT keyword_id FROM article_keywords WHERE article_id = old.id);
+END;
+CREATE TRIGGER daily_rollups_update
+AFTER UPDATE OF published_day, source, reach_tier, source_category, reach_score ON articles BEGIN
+    UPDATE daily_rollups SET articles = articles - 1, score_sum = score_sum - COALESCE(old.reach_score, 0)
+    WHERE {_ROLLUP_KEY.format(row='old')};
+    INSERT INTO daily_rollups (day, source, reach_tier, source_category, articles, score_sum)
+    VALUES ({_ROLLUP_VALUES.format(row='new')})
+    ON CONFLICT (day, source, reach_tier, source_category)
+    DO UPDATE SET articles = articles + 1, score_sum = score_sum + excluded.score_sum;
+END;
+CREATE TRIGGER daily_keyword_rollups_move AFTER UPDATE OF published_day ON articles
+WHEN old.published_day IS NOT new.published_day BEGIN
+    UPDATE daily_keyword_rollups SET articles = articles - 1
+    WHERE day = {_ROLLUP_DAY.format(row='old')}
+    AND keyword_id IN (SELECT keyword_id FROM article_keywords WHERE article_id = new.id);
+    INSERT INTO daily_keyword_rollups (day, keyword_id, articles)
+    SELECT {_ROLLUP_DAY.format(row='new')}, keyword_id, 1 FROM article_keywords WHERE article_id = new.id
+    ON CONFLICT (day, keyword_id) DO UPDATE SET articles = articles + 1;
+END;
+CREATE TRIGGER daily_keyword_rollups_insert AFTER INSERT ON article_keywords BEGIN
+    INSERT INTO daily_keyword_rollups (day, keyword_id, articles)
+    SELECT {_ROLLUP_DAY.format(row='a')}, new.keyword_id, 1 FROM articles a WHERE a.id = new.article_id
+    ON CONFLICT (day, keyword_id) DO UPDATE SET articles = articles + 1;
+END;
+CREATE TRIGGER daily_keyword_rollups_delete AFTER DELETE ON article_keywords BEGIN
+    UPDATE daily_keyword_rollups SET articles = articles - 1
+    WHERE keyword_id = old.keyword_id
+    AND day = (SELECT {_ROLLUP_DAY.format(row='a')} FROM articles a WHERE a.id = old.article_id);
+END;
+INSERT INTO daily_rollups (day, source, reach_tier, source_category, articles, score_sum)
+SELECT {_ROLLUP_DAY.format(row='a')}, COALESCE(a.source, ''), COALESCE(a.reach_tier, 4),
+       COALESCE(a.source_category, ''), COUNT(*), SUM(COALESCE(a.reach_score, 0))
+FROM articles a GROUP BY 1, 2, 3, 4;
+INSERT INTO daily_keyword_rollups (day, keyword_id, articles)
+SELECT {_ROLLUP_DAY.format(row='a')}, ak.keyword_id, COUNT(*)
+FROM article_keywords ak JOIN articles a ON a.id = ak.article_id GROUP BY 1, 2;
+"""
+
+# Articles per (day, story), kept current by triggers like the rollups above, so
+# story counts for a window come from these rows instead of every article.
+# Articles are inserted without a story and joined to one by an update.
+_STORY_ROLLUP_UPSERT = "ON CONFLICT (day, story_id) DO UPDATE SET articles = articles + 1"
+STORY_ROLLUP_SCHEMA = f"""
+CREATE TABLE daily_story_rollups (
+    day INTEGER NOT NULL,
+    story_id INTEGER NOT NULL,
+    articles INTEGER NOT NULL,
+    PRIMARY KEY (day, story_id)
+) WITHOUT ROWID;
+CREATE TRIGGER daily_story_rollups_insert AFTER INSERT ON articles WHEN new.story_id IS NOT NULL BEGIN
+    INSERT INTO daily_story_rollups (day, story_id, articles)
+    VALUES ({_ROLLUP_DAY.format(row='new')}, new.story_id, 1) {_STORY_ROLLUP_UPSERT};
+END;
+CREATE TRIGGER daily_story_rollups_delete AFTER DELETE ON articles WHEN old.story_id IS NOT NULL BEGIN
+    UPDATE daily_story_rollups SET articles = articles - 1
+    WHERE day = {_ROLLUP_DAY.format(row='old')} AND story_id = old.story_id;
+END;
+CREATE TRIGGER daily_story_rollups_update AFTER UPDATE OF story_id, published_day ON articles
+WHEN old.story_id IS NOT new.story_id OR old.published_day IS NOT new.published_day BEGIN
+    UPDATE daily_story_rollups SET articles = articles - 1
+    WHERE day = {_ROLLUP_DAY.format(row='old')} AND story_id = old.story_id;
+    INSERT INTO daily_story_rollups (day, story_id, articles)
+    SELECT {_ROLLUP_DAY.format(row='new')}, new.story_id, 1 WHERE new.story_id IS NOT NULL {_STORY_ROLLUP_UPSERT};
+END;
+INSERT INTO daily_story_rollups (day, story_id, articles)
+SELECT {_ROLLUP_DAY.format(row='a')}, a.story_id, COUNT(*) FROM articles a WHERE a.story_id IS NOT NULL GROUP BY 1, 2;
+"""
+
+# SQLite's default limit on bound parameters is 999
+SQL_BATCH_SIZE = 500
+STORY_BATCH_SIZE = 5000  # Articles clustered per pass
+
+
+def _nullable(values):
+    """Object column with missing values as None, ready for SQLite"""
+    return values.astype(object).where(values.notna(), None)
+
+
+def _window_clause(start_date, end_date, column='published_day', undated=None):
+    """
+    SQL condition selecting a publication date window (inclusive, UTC)
+    Compares integer day buckets; articles without a date always match,
+    recognized by NULL or, for rollups, by the undated sentinel day.
+    Returns: (sql, params), sql is empty when the window is unbounded
+    """
+    conditions, params = [], []
+    if start_date is not None:
+        conditions.append(f"{column} >= ?")
+        params.append(date_to_day(start_date))
+    if end_date is not None:
+        conditions.append(f"{column} <= ?")
+        params.append(date_to_day(end_date))
+    if not conditions:
+        return '', params
+    if undated is not None:
+        return f"({column} = ? OR ({' AND '.join(conditions)}))", [undated] + params
+    return f"({column} IS NULL OR ({' AND '.join(conditions)}))", params
+
+
+def _article_frame(df):
+    """Article frame from rows selected as load_articles does"""
+    df['Published_Date'] = pd.to_datetime(df.pop('published_ts'), unit='s', utc=True)
+    df['Published_Day'] = df.pop('published_day').astype('Int32')
+    story_ids = df.pop('story_id').astype('int64')
+    return apply_article_schema(df[ARTICLE_COLUMNS]).assign(Story_ID=story_ids)
+
+
+class ArticleStore:
+    """
+    SQLite history of every collected article
+    Articles are keyed by URL, so each collection only appends what is new and
+    any date window can be read back without refetching. WAL mode lets the
+    headless collector write while the web app reads.
+    """
+
+    def __init__(self, path=ARTICLE_STORE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        # One connection shared by Streamlit's script threads, serialized by the lock
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.revision = 0
+        with self.lock:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.executescript(STORE_SCHEMA)
+            self._add_day_bucket()
+            self._add_description_text()
+            self._backfill_membership()
+            self._backfill_sources()
+            self._add_story_ids()
+            self._create_rollups()
+            self.fts_enabled = self._create_fts()
+        self.sync_source_registry()
+
+    def _create_rollups(self):
+        """Create the daily rollup tables and triggers on first use, counting existing rows"""
+        for table, schema in [('daily_rollups', ROLLUP_SCHEMA), ('daily_story_rollups', STORY_ROLLUP_SCHEMA)]:
+            exists = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()
+            if not exists:
+                self.conn.executescript(f"BEGIN; {schema} COMMIT;")
+
+    def _create_fts(self):
+        """
+        Create the full-text index on first use, indexing existing rows
+        An index built from raw description HTML is replaced.
+        Returns: False when this SQLite build lacks FTS5
+        """
+        table = self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'"
+        ).fetchone()
+        if table is not None and 'description_text' in table[0]:
+            return True
+        try:
+            with metrics.timer('store.fts_rebuild'):
+                self.conn.executescript(f"BEGIN; {OLD_FTS_OBJECTS} {FTS_SCHEMA} COMMIT;")
+        except sqlite3.OperationalError:
+            self.conn.rollback()
+            return False
+        return True
+
+    def _add_day_bucket(self):
+        """Add and fill published_day in stores written before it existed"""
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(articles)")]
+        if 'published_day' not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE articles ADD COLUMN published_day INTEGER")
+                self.conn.execute("UPDATE articles SET published_day = published_ts / 86400 "
+                                  "WHERE published_ts IS NOT NULL")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_published_day ON articles(published_day)")
+
+    def _add_description_text(self):
+        """Add and fill description_text in stores written before it existed"""
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(articles)")]
+        if 'description_text' in columns:
+            return
+        self.conn.execute("ALTER TABLE articles ADD COLUMN description_text TEXT")
+        last_id = 0
+        with self.conn:
+            while True:
+                rows = pd.read_sql_query("SELECT id, description FROM articles WHERE id > ? ORDER BY id LIMIT ?",
+                                         self.conn, params=[last_id, STORY_BATCH_SIZE])
+                if rows.empty:
+                    return
+                last_id = int(rows['id'].iloc[-1])
+                # The old index's triggers watch description, not this column; _create_fts rebuilds it
+                self.conn.executemany("UPDATE articles SET description_text = ? WHERE id = ?",
+                                      zip(description_text(rows['description']).tolist(), rows['id'].tolist()))
+
+    def _backfill_membership(self):
+        """Credit each article's own keyword in stores written before membership existed"""
+        if self.conn.execute("SELECT 1 FROM article_keywords LIMIT 1").fetchone() is not None:
+            return
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO keywords (keyword) "
+                              "SELECT DISTINCT keyword FROM articles WHERE keyword IS NOT NULL")
+            self.conn.execute("INSERT OR IGNORE INTO article_keywords (article_id, keyword_id) "
+                              "SELECT a.id, k.id FROM articles a JOIN keywords k ON k.keyword = a.keyword")
+
+    def _backfill_sources(self):
+        """Fill the source dimension table in stores written before it existed"""
+        if self.conn.execute("SELECT 1 FROM sources LIMIT 1").fetchone() is not None:
+            return
+        columns = ', '.join(STORE_COLUMNS[c] for c in SOURCE_COLUMNS)
+        with self.conn:
+            # Each source as classified for its most recent article
+            self.conn.execute(f"INSERT INTO sources (source, {columns}) SELECT source, {columns} FROM articles "
+                              "WHERE id IN (SELECT MAX(id) FROM articles WHERE source IS NOT NULL GROUP BY source)")
+
+    def _add_story_ids(self):
+        """Add story_id to stores written before it existed and cluster their articles"""
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(articles)")]
+        if 'story_id' not in columns:
+            self.conn.execute("ALTER TABLE articles ADD COLUMN story_id INTEGER")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_story_id ON articles(story_id)")
+        with self.conn:
+            self._assign_stories()
+
+    def _assign_stories(self):
+        """
+        Cluster every article without a story, oldest first
+        Each pass loads only the LSH buckets its own articles hash to, so the
+        cost follows the number of new articles, not the size of the history.
+        Caller holds the lock and transaction.
+        """
+        while True:
+            rows = self.conn.execute(
+                "SELECT id, title, source FROM articles WHERE story_id IS NULL ORDER BY id LIMIT ?",
+                (STORY_BATCH_SIZE,)
+            ).fetchall()
+            if not rows:
+                return
+            article_ids, titles, sources = zip(*rows)
+            signatures, empty = title_signatures(titles, sources)
+            keys = band_keys(signatures)
+            
+            buckets = self._load_story_buckets(keys[~empty])
+            representatives = {}
+            story_list = list(set(buckets.values()))
+            for start in range(0, len(story_list), SQL_BATCH_SIZE):
+                batch = story_list[start:start + SQL_BATCH_SIZE]
+                for story_id, signature in self.conn.execute(
+                    f"SELECT id, signature FROM stories WHERE id IN ({', '.join('?' * len(batch))})", batch
+                ):
+                    representatives[story_id] = np.frombuffer(signature, dtype='<u4').astype(np.uint32)
+            
+            story_ids, new_stories, new_buckets = match_stories(
+                article_ids, signatures, empty, keys, buckets, representatives
+            )
+            positions = {article_id: position for position, article_id in enumerate(article_ids)}
+            self.conn.executemany("INSERT INTO stories (id, signature) VALUES (?, ?)", [
+                (story_id, signatures[positions[story_id]].astype('<u4').tobytes()) for story_id in new_stories
+            ])
+            self.conn.executemany("INSERT OR IGNORE INTO story_buckets (band, key, story_id) VALUES (?, ?, ?)",
+                                  new_buckets)
+            self.conn.executemany("UPDATE articles SET story_id = ? WHERE id = ?",
+                                  zip(story_ids.tolist(), article_ids))
+
+    def _load_story_buckets(self, keys):
+        """Existing (band, key) -> story_id entries for the given band keys"""
+        buckets = {}
+        wanted = {(band, int(key)) for row in keys for band, key in enumerate(row)}
+        unique_keys = list({key for _, key in wanted})
+        for start in range(0, len(unique_keys), SQL_BATCH_SIZE):
+            batch = unique_keys[start:start + SQL_BATCH_SIZE]
+            for key, band, story_id in self.conn.execute(
+                f"SELECT key, band, story_id FROM story_buckets WHERE key IN ({', '.join('?' * len(batch))})", batch
+            ):
+                if (band, key) in wanted:
+                    buckets[(band, key)] = story_id
+        return buckets
+
+    def add_articles(self, df, membership=None):
+        """
+        Append enriched articles, skipping URLs already in the store
+        Keyword membership (keyed by df's index) is merged in for new and
+        existing articles alike, so a known URL can gain keywords.
+        Returns: number of new articles stored
+        """
+        if df.empty:
+            return 0
+        
+        columns = list(STORE_COLUMNS)
+        published_ts = ((df['Published_Date'] - EPOCH) // pd.Timedelta(seconds=1)).astype('Int64')
+        records = df[columns].assign(
+            published_ts=_nullable(published_ts),
+            published_day=_nullable(df['Published_Day']),
+            description_text=description_text(df['Description']),
+            collected_at=int(time.time())
+        )
+        
+        sql_columns = ([STORE_COLUMNS[c] for c in columns]
+                       + ['published_ts', 'published_day', 'description_text', 'collected_at'])
+        sql = (f"INSERT OR IGNORE INTO articles ({', '.join(sql_columns)}) "
+               f"VALUES ({', '.join('?' * len(sql_columns))})")
+        with self.lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(sql, records.itertuples(index=False, name=None))
+            added = self.conn.total_changes - before
+            if membership is not None and not membership.empty:
+                self._add_membership(df['URL'], membership)
+            self._add_sources(source_dimension(df))
+            if added:
+                with metrics.timer('store.stories'):
+                    self._assign_stories()
+            self.revision += 1
+            return added
+
+    def lookup_urls(self, urls):
+        """
+        Which of these URLs are already stored: one indexed lookup per batch
+        Returns: DataFrame indexed by URL with the stored article_id and published_ts
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        rows = []
+        with self.lock:
+            for start in range(0, len(unique_urls), SQL_BATCH_SIZE):
+                batch = unique_urls[start:start + SQL_BATCH_SIZE]
+                rows += self.conn.execute(
+                    f"SELECT url, id, published_ts FROM articles WHERE url IN ({', '.join('?' * len(batch))})", batch
+                ).fetchall()
+        known = pd.DataFrame(rows, columns=['URL', 'article_id', 'published_ts']).set_index('URL')
+        known['published_ts'] = known['published_ts'].astype('Int64')
+        return known
+
+    def add_keyword_hits(self, urls, membership):
+        """
+        Record keyword hits on articles that are already stored
+        urls maps membership's article_id to URL, as df['URL'] does in add_articles.
+        Returns: number of new (article, keyword) pairs
+        """
+        if membership.empty:
+            return 0
+        with self.lock, self.conn:
+            before = self.conn.total_changes
+            self._add_membership(urls, membership)
+            added = self.conn.total_changes - before
+            if added:
+                self.revision += 1
+            return added
+
+    def record_keyword_runs(self, runs):
+        """
+        Store each keyword's high-water mark after a collection
+        runs: DataFrame with Keyword, high_water_ts (latest publication time
+        among the articles it found, nullable) and new (articles stored for
+        the first time). Marks only move forward.
+        """
+        if runs.empty:
+            return
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO keywords (keyword) VALUES (?)",
+                                  [(keyword,) for keyword in runs['Keyword']])
+            self.conn.executemany(
+                "INSERT INTO keyword_runs (keyword_id, high_water_ts, last_run_at, last_new) "
+                "SELECT id, ?, ?, ? FROM keywords WHERE keyword = ? "
+                "ON CONFLICT (keyword_id) DO UPDATE SET "
+                "high_water_ts = MAX(COALESCE(high_water_ts, excluded.high_water_ts), "
+                "COALESCE(excluded.high_water_ts, high_water_ts)), "
+                "last_run_at = excluded.last_run_at, last_new = excluded.last_new",
+                zip(_nullable(runs['high_water_ts']), [int(time.time())] * len(runs),
+                    runs['new'].astype(int).tolist(), runs['Keyword'])
+            )
+
+    def keyword_runs(self):
+        """
+        Each keyword's last collection: when it ran, how many articles were new
+        and the latest publication time it has seen
+        Returns: DataFrame indexed by Keyword with Last_Run, New_Since_Last_Run
+        and Latest_Published
+        """
+        with self.lock:
+            runs = pd.read_sql_query(
+                "SELECT k.keyword AS Keyword, r.last_run_at, r.last_new AS New_Since_Last_Run, r.high_water_ts "
+                "FROM keyword_runs r JOIN keywords k ON k.id = r.keyword_id", self.conn, index_col='Keyword'
+            )
+        runs['Last_Run'] = pd.to_datetime(runs.pop('last_run_at'), unit='s', utc=True)
+        runs['Latest_Published'] = pd.to_datetime(runs.pop('high_water_ts').astype('Int64'), unit='s', utc=True)
+        return runs
+
+    def _add_sources(self, sources):
+        """Insert or refresh source dimension rows; caller holds the lock and transaction"""
+        columns = [STORE_COLUMNS[c] for c in SOURCE_COLUMNS]
+        updates = ', '.join(f"{column} = excluded.{column}" for column in columns)
+        self.conn.executemany(
+            f"INSERT INTO sources (source, {', '.join(columns)}) VALUES ({', '.join('?' * (len(columns) + 1))}) "
+            f"ON CONFLICT (source) DO UPDATE SET {updates}",
+            sources[SOURCE_COLUMNS].astype(object).itertuples(name=None)
+        )
+
+    def _add_membership(self, urls, membership):
+        """Insert (article, keyword) pairs; caller holds the lock and transaction"""
+        url_ids = {}
+        unique_urls = urls.unique().tolist()
+        for start in range(0, len(unique_urls), SQL_BATCH_SIZE):
+            batch = unique_urls[start:start + SQL_BATCH_SIZE]
+            url_ids.update(self.conn.execute(
+                f"SELECT url, id FROM articles WHERE url IN ({', '.join('?' * len(batch))})", batch
+            ).fetchall())
+        
+        keywords = membership['Keyword'].unique().tolist()
+        self.conn.executemany("INSERT OR IGNORE INTO keywords (keyword) VALUES (?)", [(k,) for k in keywords])
+        keyword_ids = {}
+        for start in range(0, len(keywords), SQL_BATCH_SIZE):
+            batch = keywords[start:start + SQL_BATCH_SIZE]
+            keyword_ids.update(self.conn.execute(
+                f"SELECT keyword, id FROM keywords WHERE keyword IN ({', '.join('?' * len(batch))})", batch
+            ).fetchall())
+        
+        store_ids = membership['article_id'].map(urls).map(url_ids)
+        pairs = zip(store_ids.tolist(), membership['Keyword'].map(keyword_ids).tolist())
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO article_keywords (article_id, keyword_id) VALUES (?, ?)", pairs
+        )
+
+    def sync_source_registry(self, registry=None):
+        """
+        Bring stored classifications up to date with the source registry
+        Reloads the registry file if it changed. Stored sources are then
+        reclassified only if the store was classified with another registry,
+        and only those matching terms that changed since; sources whose
+        category and reach come out the same are left alone. Rollups follow
+        the rewritten articles through their triggers.
+        Returns: number of articles reclassified
+        """
+        registry = registry or source_registry
+        registry.reload_if_changed()
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM store_meta WHERE key = 'registry_digest'").fetchone()
+            terms = registry.changes_since(row[0] if row else None)
+            if not terms:
+                return 0
+            
+            with metrics.timer('store.reclassify'), self.conn:
+                pattern = terms_pattern(terms)
+                names = [name for (name,) in self.conn.execute("SELECT source FROM sources")
+                         if pattern.search(name.lower())]
+                updated = self._reclassify_sources(names)
+                self.conn.execute("INSERT INTO store_meta (key, value) VALUES ('registry_digest', ?) "
+                                  "ON CONFLICT (key) DO UPDATE SET value = excluded.value", (registry.digest,))
+            if updated:
+                self.revision += 1
+            metrics.count('registry.reclassified', updated)
+            return updated
+
+    def _reclassify_sources(self, names):
+        """
+        Reclassify the named sources, rewriting those whose category or reach
+        changed; caller holds the lock and transaction
+        Returns: number of articles updated
+        """
+        stored = {}
+        for start in range(0, len(names), SQL_BATCH_SIZE):
+            batch = names[start:start + SQL_BATCH_SIZE]
+            for row in self.conn.execute(
+                f"SELECT source, {', '.join(STORE_COLUMNS[c] for c in SOURCE_COLUMNS)} FROM sources "
+                f"WHERE source IN ({', '.join('?' * len(batch))})", batch
+            ):
+                stored[row[0]] = row[1:]
+        
+        fresh = classify_sources(names)
+        columns = [STORE_COLUMNS[c] for c in SOURCE_COLUMNS]
+        assignments = ', '.join(f"{column} = ?" for column in columns)
+        updated = 0
+        for name, values in zip(fresh.index, fresh[SOURCE_COLUMNS].astype(object).itertuples(index=False, name=None)):
+            if stored.get(name) == values:
+                continue
+            self.conn.execute(f"UPDATE sources SET {assignments} WHERE source = ?", values + (name,))
+            updated += self.conn.execute(f"UPDATE articles SET {assignments} WHERE source = ?",
+                                         values + (name,)).rowcount
+        return updated
+
+    def version(self):
+        """
+        Token that changes whenever the stored data changes
+        Covers writes through this store and commits from other processes.
+        """
+        with self.lock:
+            data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        return (self.revision, data_version)
+
+    def count(self):
+        """Total number of stored articles"""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def last_collected_at(self):
+        """Datetime of the most recent collection, or None"""
+        with self.lock:
+            # A collection that found nothing new still records its keyword runs
+            ts = self.conn.execute(
+                "SELECT MAX(ts) FROM (SELECT MAX(collected_at) AS ts FROM articles "
+                "UNION ALL SELECT MAX(last_run_at) FROM keyword_runs)"
+            ).fetchone()[0]
+        return datetime.fromtimestamp(ts) if ts is not None else None
+
+    def date_bounds(self):
+        """
+        First and last publication dates (UTC) in the store
+        Returns: (min_date, max_date), or None when no article has a date
+        """
+        with self.lock:
+            min_day, max_day = self.conn.execute(
+                "SELECT MIN(published_day), MAX(published_day) FROM articles"
+            ).fetchone()
+        if min_day is None:
+            return None
+        return (day_to_date(min_day), day_to_date(max_day))
+
+    def load_articles(self, start_date=None, end_date=None):
+        """
+        Load stored articles published between two dates (inclusive, UTC)
+        Articles without a publication date are always included.
+        Returns: DataFrame indexed by article_id, with each article's Story_ID
+        """
+        sql_columns = ', '.join(f"{column} AS {name}" for name, column in STORE_COLUMNS.items())
+        query = f"SELECT id AS article_id, {sql_columns}, published_ts, published_day, story_id FROM articles"
+        window, params = _window_clause(start_date, end_date)
+        if window:
+            query += f" WHERE {window}"
+        query += " ORDER BY id"
+        
+        with self.lock:
+            df = pd.read_sql_query(query, self.conn, params=params, index_col='article_id')
+        return _article_frame(df)
+
+    def load_articles_by_id(self, article_ids):
+        """
+        Load stored articles by id
+        Returns: DataFrame shaped like load_articles, in id order
+        """
+        sql_columns = ', '.join(f"{column} AS {name}" for name, column in STORE_COLUMNS.items())
+        query = f"SELECT id AS article_id, {sql_columns}, published_ts, published_day, story_id FROM articles"
+        ids = [int(article_id) for article_id in article_ids]
+        with self.lock:
+            frames = [pd.read_sql_query(f"{query} WHERE id IN ({', '.join('?' * len(batch))})", self.conn,
+                                        params=batch, index_col='article_id')
+                      for batch in (ids[start:start + SQL_BATCH_SIZE] for start in range(0, len(ids), SQL_BATCH_SIZE))]
+        if not frames:
+            frames = [pd.read_sql_query(f"{query} WHERE 0", self.conn, index_col='article_id')]
+        return _article_frame(pd.concat(frames).sort_index())
+
+    def iter_articles(self, start_date=None, end_date=None, chunk_rows=5000):
+        """
+        Stored articles in a date window, chunk_rows at a time in id order
+        Each chunk is a separate keyset query, so the lock is not held
+        between chunks and memory is bounded by the chunk size. An empty
+        window yields a single empty chunk.
+        Returns: iterator of DataFrames shaped like load_articles
+        """
+        sql_columns = ', '.join(f"{column} AS {name}" for name, column in STORE_COLUMNS.items())
+        query = (f"SELECT id AS article_id, {sql_columns}, published_ts, published_day, story_id FROM articles "
+                 "WHERE id > ?")
+        window, params = _window_clause(start_date, end_date)
+        if window:
+            query += f" AND {window}"
+        query += " ORDER BY id LIMIT ?"
+        
+        last_id = 0
+        while True:
+            with self.lock:
+                df = pd.read_sql_query(query, self.conn, params=[last_id] + params + [chunk_rows],
+                                       index_col='article_id')
+            if df.empty:
+                # An empty window still yields one chunk, so exports keep their columns
+                if last_id == 0:
+                    yield _article_frame(df)
+                return
+            last_id = int(df.index[-1])
+            yield _article_frame(df)
+            if len(df) < chunk_rows:
+                return
+
+    def search(self, search_term, start_date=None, end_date=None):
+        """
+        Find articles matching a boolean text query via the full-text index
+        Returns: array of article ids, or None if the index cannot answer
+        (FTS5 unavailable or a query it rejects)
+        """
+        fts_query = to_fts_query(search_term) if self.fts_enabled else None
+        if fts_query is None:
+            return None
+        
+        query = "SELECT f.rowid FROM articles_fts f"
+        params = [fts_query]
+        window, window_params = _window_clause(start_date, end_date, column='a.published_day')
+        if window:
+            query += " JOIN articles a ON a.id = f.rowid"
+        query += " WHERE articles_fts MATCH ?"
+        if window:
+            query += f" AND {window}"
+            params += window_params
+        
+        try:
+            with metrics.timer('store.search'), self.lock:
+                rows = self.conn.execute(query, params).fetchall()
+        except sqlite3.OperationalError:
+            return None
+        return np.fromiter((row[0] for row in rows), dtype='int64', count=len(rows))
+
+    def find_articles(self, search_term, start_date=None, end_date=None):
+        """
+        Articles matching a boolean text query, from the full-text index or,
+        when it cannot answer, a scan of the stored titles and descriptions
+        Returns: array of article ids
+        Raises: QuerySyntaxError if the query does not parse
+        """
+        article_ids = self.search(search_term, start_date, end_date)
+        if article_ids is not None:
+            return article_ids
+        
+        root = parse_query(search_term)
+        if root is None:
+            return np.empty(0, dtype='int64')
+        with metrics.timer('store.scan_search'):
+            matched = [chunk.index[query_mask(chunk, root, prefix=True)].to_numpy(dtype='int64')
+                       for chunk in self.iter_articles(start_date, end_date)]
+        return np.concatenate(matched) if matched else np.empty(0, dtype='int64')
+
+    def save_search(self, name, search_term):
+        """
+        Save a search query under a name, replacing any query of that name
+        Raises: QuerySyntaxError if the query does not parse or has no terms
+        """
+        if parse_query(search_term) is None:
+            raise QuerySyntaxError(f"No search terms in {search_term!r}")
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO saved_searches (name, query, saved_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET query = excluded.query, saved_at = excluded.saved_at",
+                (name, search_term, int(time.time()))
+            )
+
+    def delete_search(self, name):
+        """Forget a saved search"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM saved_searches WHERE name = ?", (name,))
+
+    def saved_searches(self):
+        """Saved search queries by name, in name order"""
+        with self.lock:
+            rows = self.conn.execute("SELECT name, query FROM saved_searches ORDER BY name").fetchall()
+        return dict(rows)
+
+    def load_keyword_membership(self, start_date=None, end_date=None):
+        """
+        Load (article_id, Keyword) pairs for articles in a date window
+        Returns: DataFrame with a categorical Keyword column
+        """
+        query = ("SELECT ak.article_id, k.keyword AS Keyword FROM article_keywords ak "
+                 "JOIN keywords k ON k.id = ak.keyword_id")
+        window, params = _window_clause(start_date, end_date, column='a.published_day')
+        if window:
+            query += f" JOIN articles a ON a.id = ak.article_id WHERE {window}"
+        
+        with self.lock:
+            membership = pd.read_sql_query(query, self.conn, params=params)
+            keywords = [row[0] for row in self.conn.execute("SELECT keyword FROM keywords ORDER BY id")]
+        membership['Keyword'] = pd.Categorical(membership['Keyword'], categories=keywords)
+        return membership[MEMBERSHIP_COLUMNS]
+
+    def load_rollups(self, start_date=None, end_date=None):
+        """
+        Load the daily rollup rows for a date window (inclusive, UTC)
+        Articles without a publication date are always included, with a
+        missing Published_Day.
+        Returns: (DataFrame of Published_Day, Source, Reach_Tier,
+        Source_Category, Articles and Score_Sum; DataFrame of Published_Day,
+        Keyword and Articles)
+        """
+        window, params = _window_clause(start_date, end_date, column='day', undated=UNDATED_DAY)
+        where = f"WHERE articles > 0 AND {window}" if window else "WHERE articles > 0"
+        with self.lock:
+            rollups = pd.read_sql_query(
+                "SELECT day AS Published_Day, source AS Source, reach_tier AS Reach_Tier, "
+                "source_category AS Source_Category, articles AS Articles, score_sum AS Score_Sum "
+                f"FROM daily_rollups {where}", self.conn, params=params
+            )
+            keyword_rollups = pd.read_sql_query(
+                "SELECT r.day AS Published_Day, k.keyword AS Keyword, r.articles AS Articles "
+                f"FROM daily_keyword_rollups r JOIN keywords k ON k.id = r.keyword_id {where}",
+                self.conn, params=params
+            )
+        for frame in (rollups, keyword_rollups):
+            frame['Published_Day'] = frame['Published_Day'].astype('Int32').mask(frame['Published_Day'] == UNDATED_DAY)
+        return rollups, keyword_rollups
+
+    def load_sources(self, sources=None):
+        """
+        Load the source dimension table, for the given source names or all
+        Returns: DataFrame indexed by Source with the SOURCE_COLUMNS
+        """
+        sql_columns = ', '.join(f"{STORE_COLUMNS[c]} AS {c}" for c in SOURCE_COLUMNS)
+        query = f"SELECT source AS Source, {sql_columns} FROM sources"
+        with self.lock:
+            if sources is None:
+                return pd.read_sql_query(query, self.conn, index_col='Source')
+            names = list(sources)
+            frames = [pd.read_sql_query(f"{query} WHERE source IN ({', '.join('?' * len(batch))})", self.conn,
+                                        params=batch, index_col='Source')
+                      for batch in (names[start:start + SQL_BATCH_SIZE]
+                                    for start in range(0, len(names), SQL_BATCH_SIZE))]
+        if not frames:
+            return pd.DataFrame(columns=SOURCE_COLUMNS, index=pd.Index([], name='Source'))
+        return pd.concat(frames)
+
+    def story_stats(self, start_date=None, end_date=None, limit=5):
+        """
+        Distinct stories in a date window and the most syndicated of them
+        Counted from the daily story rollups; only the top stories' titles
+        and sources are looked up among the articles.
+        Returns: (number of distinct stories, DataFrame shaped like
+        summary.syndicated_stories)
+        """
+        window, params = _window_clause(start_date, end_date, column='day', undated=UNDATED_DAY)
+        where = f"WHERE articles > 0 AND {window}" if window else "WHERE articles > 0"
+        article_window, article_params = _window_clause(start_date, end_date)
+        article_where = f" AND {article_window}" if article_window else ""
+        with self.lock:
+            # One grouping pass yields the story count and the largest stories,
+            # including every story tied with the last of them
+            rows = self.conn.execute(
+                "WITH s AS (SELECT story_id, SUM(articles) AS articles "
+                f"FROM daily_story_rollups {where} GROUP BY story_id) "
+                "SELECT (SELECT COUNT(*) FROM s), story_id, articles FROM s WHERE articles > 1 AND articles >= "
+                "COALESCE((SELECT articles FROM s WHERE articles > 1 ORDER BY articles DESC LIMIT 1 OFFSET ?), 2)",
+                params + [limit - 1]
+            ).fetchall()
+            if not rows:
+                unique_stories = self.conn.execute(
+                    f"SELECT COUNT(DISTINCT story_id) FROM daily_story_rollups {where}", params
+                ).fetchone()[0]
+                return unique_stories, pd.DataFrame(columns=['Title', 'Articles', 'Sources'])
+            unique_stories = rows[0][0]
+            
+            # Ties go to the story seen first in the window, as summary.syndicated_stories orders them
+            first_ids = {}
+            story_list = [story_id for _, story_id, _ in rows]
+            for start in range(0, len(story_list), SQL_BATCH_SIZE):
+                batch = story_list[start:start + SQL_BATCH_SIZE]
+                first_ids.update(self.conn.execute(
+                    f"SELECT story_id, MIN(id) FROM articles WHERE story_id IN ({', '.join('?' * len(batch))})"
+                    f"{article_where} GROUP BY story_id", batch + article_params
+                ).fetchall())
+            top = sorted(rows, key=lambda row: (-row[2], first_ids[row[1]]))[:limit]
+            
+            stories = []
+            for _, story_id, articles in top:
+                title, sources = self.conn.execute(
+                    "SELECT title, (SELECT COUNT(DISTINCT source) FROM articles "
+                    f"WHERE story_id = ?{article_where}) FROM articles WHERE id = ?",
+                    [story_id] + article_params + [first_ids[story_id]]
+                ).fetchone()
+                stories.append((title, articles, sources))
+        return unique_stories, pd.DataFrame(stories, columns=['Title', 'Articles', 'Sources'])
+
+    def window_signature(self, start_date=None, end_date=None):
+        """
+        Cheap identity of the set of articles in a date window, from the day index
+        Articles are only ever appended, and titles and URLs never change, so
+        the count and highest id change whenever the set does.
+        Returns: (store path, article count, highest article id)
+        """
+        window, params = _window_clause(start_date, end_date)
+        with self.lock:
+            count, max_id = self.conn.execute(
+                f"SELECT COUNT(*), MAX(id) FROM articles{' WHERE ' + window if window else ''}", params
+            ).fetchone()
+        return (os.path.abspath(self.path), count, max_id)
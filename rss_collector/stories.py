@@ -0,0 +1,127 @@
+"""
+Story clustering - group syndicated and near-duplicate articles into stories
+
+Titles are reduced to sets of words and word pairs and summarized by MinHash
+signatures; LSH banding turns each signature into BANDS bucket keys, and
+articles sharing a bucket with a story are compared against its signature. Buckets are plain
+(band, key) lookups, so matching a new article costs the same however many
+stories are already indexed. A story's id is the id of its first article.
+"""
+
+import re
+import zlib
+
+import numpy as np
+
+NUM_PERM = 64  # MinHash permutations per signature
+BANDS = 16  # LSH bands; NUM_PERM / BANDS rows each
+ROWS = NUM_PERM // BANDS
+STORY_SIMILARITY = 0.6  # Estimated Jaccard similarity needed to join a story
+SIGNATURE_BATCH = 10000  # Titles hashed at a time, bounds the working arrays
+
+STOPWORDS = frozenset(['a', 'an', 'and', 'as', 'at', 'by', 'for', 'from', 'in', 'is', 'of', 'on', 'the', 'to', 'with'])
+
+_rng = np.random.default_rng(20240101)
+# Multiply-shift hash family: ((a * x + b) mod 2**64) >> 32 with odd a
+_PERM_A = _rng.integers(1, 2**63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+_BAND_MIX = _rng.integers(1, 2**63, size=ROWS, dtype=np.uint64) | np.uint64(1)
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+def title_tokens(title, source=None):
+    """
+    Distinct words and word pairs of a title, without the ' - Source' suffix
+    Google News adds. Pairs keep titles that differ in one word ("Apple
+    earnings beat" / "Microsoft earnings beat") from looking alike.
+    """
+    title = title or ''
+    if source and title.endswith(f" - {source}"):
+        title = title[:-len(source) - 3]
+    words = [word for word in _WORD.findall(title.lower()) if word not in STOPWORDS]
+    return set(words).union(f"{first} {second}" for first, second in zip(words, words[1:]))
+
+
+def title_signatures(titles, sources):
+    """
+    MinHash signatures of titles
+    Returns: (uint32 array of shape (n, NUM_PERM), bool array marking titles
+    with no words, whose signatures are meaningless)
+    """
+    token_sets = [title_tokens(title, source) for title, source in zip(titles, sources)]
+    signatures = np.full((len(token_sets), NUM_PERM), np.iinfo(np.uint32).max, dtype=np.uint32)
+    empty = np.array([not tokens for tokens in token_sets], dtype=bool)
+    
+    with np.errstate(over='ignore'):
+        for start in range(0, len(token_sets), SIGNATURE_BATCH):
+            batch = token_sets[start:start + SIGNATURE_BATCH]
+            lengths = np.fromiter((len(tokens) for tokens in batch), dtype=np.int64, count=len(batch))
+            if lengths.sum() == 0:
+                continue
+            hashes = np.fromiter((zlib.crc32(token.encode('utf-8')) for tokens in batch for token in tokens),
+                                 dtype=np.uint64, count=int(lengths.sum()))
+            permuted = ((hashes[:, None] * _PERM_A + _PERM_B) >> np.uint64(32)).astype(np.uint32)
+            # Minimum over each title's run of tokens; titles without tokens keep the fill value
+            has_tokens = lengths > 0
+            offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])[has_tokens]
+            signatures[start + np.flatnonzero(has_tokens)] = np.minimum.reduceat(permuted, offsets, axis=0)
+    return signatures, empty
+
+
+def band_keys(signatures):
+    """
+    LSH bucket key of every band of every signature
+    Returns: int64 array of shape (n, BANDS), ready to store in SQLite
+    """
+    bands = signatures.reshape(len(signatures), BANDS, ROWS).astype(np.uint64)
+    with np.errstate(over='ignore'):
+        keys = (bands * _BAND_MIX).sum(axis=2, dtype=np.uint64)
+    return keys.view(np.int64)
+
+
+def signature_similarity(signature, others):
+    """Estimated Jaccard similarity between a signature and each row of others"""
+    return (others == signature).mean(axis=-1)
+
+
+def match_stories(article_ids, signatures, empty, keys, buckets, representatives):
+    """
+    Assign each article to a known story or start a new one
+    buckets maps (band, key) -> story_id and representatives maps story_id ->
+    signature; both hold whatever existing stories the caller loaded for
+    these keys and are updated in place as stories are added, so articles
+    in the same batch cluster with each other too.
+    Returns: (story ids, list of new story ids, list of new (band, key, story_id))
+    """
+    story_ids = np.empty(len(article_ids), dtype=np.int64)
+    new_stories = []
+    new_buckets = []
+    for position, article_id in enumerate(article_ids):
+        signature = signatures[position]
+        if empty[position]:
+            # Nothing to compare: a story of its own, never a bucket entry
+            story_ids[position] = article_id
+            new_stories.append(int(article_id))
+            continue
+        
+        article_keys = [(band, int(keys[position, band])) for band in range(BANDS)]
+        candidates = list(dict.fromkeys(buckets[bucket] for bucket in article_keys if bucket in buckets))
+        story_id = None
+        if candidates:
+            similarity = signature_similarity(signature, np.stack([representatives[c] for c in candidates]))
+            best = int(similarity.argmax())
+            if similarity[best] >= STORY_SIMILARITY:
+                story_id = candidates[best]
+        
+        if story_id is None:
+            story_id = int(article_id)
+            representatives[story_id] = signature
+            new_stories.append(story_id)
+            # A story is indexed under its first article's buckets only
+            for bucket in article_keys:
+                if bucket not in buckets:
+                    buckets[bucket] = story_id
+                    new_buckets.append(bucket + (story_id,))
+        story_ids[position] = story_id
+    return story_ids, new_stories, new_buckets
@@ -0,0 +1,106 @@
+"""
+Coverage summary - the statistics behind the Summary & Analysis tab
+"""
+
+import pandas as pd
+
+from .enrich import observed_counts, source_dimension
+from .keywords import keyword_counts
+
+
+def source_reach(sources, names):
+    """
+    Tier and reach label of each named source, joined from a source dimension table
+    Returns: DataFrame indexed by source name with Reach_Tier and Reach_Label
+    """
+    return pd.DataFrame(index=pd.Index(names, name='Source')).join(sources[['Reach_Tier', 'Reach_Label']])
+
+
+def _summed_counts(rollups, column):
+    """Articles per value of column summed over rollup rows, sorted like value_counts"""
+    counts = rollups.groupby(column, sort=False)['Articles'].sum()
+    counts = counts[counts > 0]
+    return counts.sort_values(ascending=False, kind='stable').rename('count')
+
+
+def syndicated_stories(df, limit=5):
+    """
+    Stories carried by more than one article, largest first
+    Returns: DataFrame with the first article's Title, Articles and Sources
+    """
+    if 'Story_ID' not in df or df.empty:
+        return pd.DataFrame(columns=['Title', 'Articles', 'Sources'])
+    stories = df.groupby('Story_ID', sort=False).agg(
+        Title=('Title', 'first'),
+        Articles=('Title', 'size'),
+        Sources=('Source', 'nunique')
+    )
+    stories = stories[stories['Articles'] > 1]
+    return stories.sort_values('Articles', ascending=False, kind='stable').head(limit).reset_index(drop=True)
+
+
+def coverage_stats(df, membership, sources=None):
+    """
+    Compute the summary statistics for a set of articles
+    df: enriched articles; membership: their keyword membership; sources:
+    source dimension table, built from df when not given
+    Returns: dict of named statistics, see the keys below
+    """
+    total_articles = len(df)
+    tier_counts = {tier: int((df['Reach_Tier'] == tier).sum()) for tier in (1, 2, 3, 4)}
+    high_tier_pct = ((tier_counts[1] + tier_counts[2]) / total_articles * 100) if total_articles > 0 else 0
+    
+    top_sources = observed_counts(df['Source']).head(5)
+    if sources is None:
+        sources = source_dimension(df)
+    return {
+        'total_articles': total_articles,
+        'unique_sources': df['Source'].nunique(),
+        # Syndicated copies of one story count once here
+        'unique_stories': df['Story_ID'].nunique() if 'Story_ID' in df else total_articles,
+        'syndicated_stories': syndicated_stories(df),
+        'avg_reach_score': df['Reach_Score'].mean(),
+        'tier_counts': tier_counts,
+        'high_tier_pct': high_tier_pct,
+        'top_sources': top_sources,
+        'top_source_reach': source_reach(sources, top_sources.index),
+        'top_tier1_sources': observed_counts(df[df['Reach_Tier'] == 1]['Source']).head(3),
+        # An article counts for every keyword it matched
+        'keyword_counts': keyword_counts(membership),
+        'category_counts': observed_counts(df['Source_Category']),
+        'day_counts': df['Published_Day'].value_counts().sort_index()
+    }
+
+
+def rollup_stats(rollups, keyword_rollups, unique_stories, syndicated, sources):
+    """
+    The coverage_stats statistics, summed from daily rollup rows
+    rollups, keyword_rollups: ArticleStore.load_rollups for the window;
+    unique_stories, syndicated: ArticleStore.story_stats for the window;
+    sources: source dimension table (ArticleStore.load_sources).
+    Returns: dict with the same keys as coverage_stats
+    """
+    total_articles = int(rollups['Articles'].sum())
+    tier_totals = rollups.groupby('Reach_Tier')['Articles'].sum()
+    tier_counts = {tier: int(tier_totals.get(tier, 0)) for tier in (1, 2, 3, 4)}
+    high_tier_pct = ((tier_counts[1] + tier_counts[2]) / total_articles * 100) if total_articles > 0 else 0
+    
+    top_sources = _summed_counts(rollups, 'Source').head(5)
+    
+    dated = rollups.dropna(subset=['Published_Day'])
+    return {
+        'total_articles': total_articles,
+        'unique_sources': rollups['Source'].nunique(),
+        'unique_stories': unique_stories,
+        'syndicated_stories': syndicated,
+        'avg_reach_score': rollups['Score_Sum'].sum() / total_articles if total_articles > 0 else float('nan'),
+        'tier_counts': tier_counts,
+        'high_tier_pct': high_tier_pct,
+        'top_sources': top_sources,
+        'top_source_reach': source_reach(sources, top_sources.index),
+        'top_tier1_sources': _summed_counts(rollups[rollups['Reach_Tier'] == 1], 'Source').head(3),
+        # An article counts for every keyword it matched
+        'keyword_counts': _summed_counts(keyword_rollups, 'Keyword'),
+        'category_counts': _summed_counts(rollups, 'Source_Category'),
+        'day_counts': dated.groupby('Published_Day')['Articles'].sum().astype('int64')
+    }
@@ -4,14 +4,20 @@ No terminal required - runs in your browser!
 """
 
 import streamlit as st
-import feedparser
 import pandas as pd
 from datetime import datetime, timedelta
-from urllib.parse import quote_plus
-import time
 import json
-from dateutil import parser as date_parser
-import re
+
+from rss_collector import ArticleStore, collect_articles
+from rss_collector.ai import AnalysisAPIError, analyze_articles, cached_window_analysis
+from rss_collector.enrich import day_to_date, observed_counts
+from rss_collector.fetch import MAX_CONCURRENT_FETCHES, parse_boolean_search
+from rss_collector.export import EXPORT_FORMATS, available_formats, export_bytes, export_cache, filter_fingerprint
+from rss_collector.filters import FilterEngine
+from rss_collector.keywords import keyword_counts
+from rss_collector.metrics import cache_hit_rate, metrics
+from rss_collector.query import QuerySyntaxError, parse_query, plan_queries
+from rss_collector.summary import rollup_stats
 
 # Page configuration
 st.set_page_config(
@@ -25,336 +31,240 @@ if 'custom_keywords' not in st.session_state:
     st.session_state['custom_keywords'] = []
 
 
-def categorize_source(source_name):
+def collect_all_feeds(progress_bar, status_text, keywords, max_workers=MAX_CONCURRENT_FETCHES, store=None):
     """
-    Categorize news sources into different types
-    Returns: category name
+    Collect RSS feeds for all keywords, reporting progress to Streamlit widgets
+    Keywords are fetched concurrently, so progress arrives in completion order.
+    Returns: (articles DataFrame, keyword membership)
     """
-    source_lower = source_name.lower()
-    
-    # Mainstream Media
-    mainstream = [
-        'cnn', 'bbc', 'reuters', 'associated press', 'ap news', 'bloomberg',
-        'financial times', 'wall street journal', 'wsj', 'new york times', 'nyt',
-        'washington post', 'guardian', 'telegraph', 'fox news', 'nbc', 'abc',
-        'cbs', 'npr', 'pbs', 'usa today', 'time', 'newsweek', 'economist',
-        'forbes', 'fortune', 'business insider', 'cnbc', 'marketwatch', 'axios'
-    ]
-    
-    # Trade Press / Industry Publications
-    trade_press = [
-        'techcrunch', 'the verge', 'wired', 'ars technica', 'zdnet', 'cnet',
-        'venturebeat', 'recode', 'engadget', 'gizmodo', 'mashable', 'greentech',
-        'renewable energy world', 'energy storage news', 'utility dive', 'power',
-        'pv magazine', 'solar power world', 'wind power monthly', 'cleantechnica',
-        'electrek', 'green car reports', 'inside evs', 'automotive news',
-        'trade', 'industry week', 'manufacturing', 'chemical', 'engineering'
-    ]
-    
-    # Blogs and Independent Media
-    blogs = [
-        'medium', 'substack', 'blog', 'blogger', 'wordpress', 'tumblr',
-        'ghost', 'writefreely', 'newsletter', 'independent', 'personal site'
-    ]
-    
-    # Government and Academic
-    government_academic = [
-        '.gov', 'government', 'department of', 'ministry of', 'agency',
-        'university', 'college', 'institute', 'research', 'academic',
-        '.edu', 'journal', 'nature', 'science', 'pnas', 'arxiv'
-    ]
-    
-    # NGOs and Think Tanks
-    ngo_thinktank = [
-        'greenpeace', 'wwf', 'nrdc', 'sierra club', 'friends of the earth',
-        'brookings', 'cato', 'heritage', 'cfr', 'carnegie', 'rand',
-        'center for', 'institute for', 'foundation', 'council on'
-    ]
-    
-    # Local and Regional News
-    local_regional = [
-        'tribune', 'gazette', 'herald', 'times', 'post', 'news', 'daily',
-        'chronicle', 'journal', 'observer', 'examiner', 'courier', 'press',
-        'local', 'regional', 'community', 'county', 'city'
-    ]
-    
-    # Check each category
-    for term in mainstream:
-        if term in source_lower:
-            return "Mainstream Media"
+    def on_progress(keyword, done, total, error):
+        if error is not None:
+            st.error(f"Error fetching {keyword}: {error}")
+        status_text.text(f"Fetched articles for: {keyword} ({done}/{total})")
+        progress_bar.progress(done / total)
     
-    for term in trade_press:
-        if term in source_lower:
-            return "Trade Press"
-    
-    for term in government_academic:
-        if term in source_lower:
-            return "Government/Academic"
-    
-    for term in ngo_thinktank:
-        if term in source_lower:
-            return "NGO/Think Tank"
-    
-    for term in blogs:
-        if term in source_lower:
-            return "Blogs/Independent"
-    
-    for term in local_regional:
-        if term in source_lower:
-            return "Local/Regional"
-    
-    # Default category
-    return "Other"
+    return collect_articles(keywords, store=store, max_workers=max_workers, on_progress=on_progress)
+
 
+@st.cache_resource
+def get_article_store():
+    """Open the article store once per server process"""
+    return ArticleStore()
 
-def calculate_reach_tier(source_name):
+
+def get_filter_engine(store, start_date, end_date):
     """
-    Calculate reach tier based on reputation and authority
-    Returns: dict with tier, reach_estimate, reach_score, and reasoning
-    
-    Tier 1: Global news wires & papers of record (90-100 points)
-    Tier 2: Major industry leaders & established media (60-89 points)
-    Tier 3: Respected niche/trade publications (30-59 points)
-    Tier 4: Smaller outlets, blogs, unknown sources (1-29 points)
+    Filter engine for a date window, kept across reruns in the session
+    The window is reloaded only when the dates or the stored data change.
     """
-    source_lower = source_name.lower()
-    
-    # TIER 1: Global News Wires & Papers of Record
-    # Criteria: Primary sources, 100+ Pulitzers, international bureaus, cited by others
-    tier1_sources = {
-        # Global News Wires (primary sources - others cite them)
-        'reuters': {'score': 98, 'reason': 'Global news wire, 2,500+ journalists'},
-        'associated press': {'score': 98, 'reason': 'Primary news wire, 1,400+ newspaper clients'},
-        'ap news': {'score': 98, 'reason': 'Primary news wire, 1,400+ newspaper clients'},
-        'bloomberg': {'score': 97, 'reason': 'Financial news primary source, Bloomberg Terminal standard'},
-        'agence france-presse': {'score': 96, 'reason': 'International news wire'},
-        'afp': {'score': 96, 'reason': 'International news wire'},
-        
-        # Papers of Record (historical authority, 50+ Pulitzers)
-        'new york times': {'score': 97, 'reason': 'US paper of record, 137 Pulitzers'},
-        'nyt': {'score': 97, 'reason': 'US paper of record, 137 Pulitzers'},
-        'wall street journal': {'score': 96, 'reason': 'Business paper of record, 39 Pulitzers'},
-        'wsj': {'score': 96, 'reason': 'Business paper of record, 39 Pulitzers'},
-        'washington post': {'score': 96, 'reason': 'Political paper of record, 69 Pulitzers'},
-        'financial times': {'score': 95, 'reason': 'International business paper of record'},
-        'the guardian': {'score': 94, 'reason': 'UK paper of record, international reach'},
-        'guardian': {'score': 94, 'reason': 'UK paper of record, international reach'},
-        
-        # Major International Broadcasters
-        'bbc': {'score': 95, 'reason': 'Global public broadcaster, 6,000+ journalists'},
-        'bbc news': {'score': 95, 'reason': 'Global public broadcaster, 6,000+ journalists'},
-        'cnn': {'score': 93, 'reason': 'Global breaking news leader, international bureaus'},
-        'the economist': {'score': 94, 'reason': 'Global influence, 175+ years, elite readership'},
-        'economist': {'score': 94, 'reason': 'Global influence, 175+ years, elite readership'},
-    }
-    
-    # TIER 2: Major Industry Leaders & Established Media
-    # Criteria: Industry authority, 20+ reporters, professional audience, awards/recognition
-    tier2_sources = {
-        # Major Business & Financial Media
-        'forbes': {'score': 85, 'reason': 'Major business publication, global reach'},
-        'fortune': {'score': 84, 'reason': 'Established business magazine, Fortune 500 list'},
-        'business insider': {'score': 82, 'reason': 'Major digital business news, 150M+ readers'},
-        'cnbc': {'score': 85, 'reason': 'Leading financial news network'},
-        'marketwatch': {'score': 80, 'reason': 'Major financial news site, Dow Jones owned'},
-        'barrons': {'score': 83, 'reason': 'Premium financial weekly, WSJ sister publication'},
-        
-        # Major Tech Publications
-        'techcrunch': {'score': 85, 'reason': 'VC/startup industry standard, 25+ reporters'},
-        'the verge': {'score': 83, 'reason': 'Leading tech/culture publication, Vox Media'},
-        'wired': {'score': 84, 'reason': 'Established tech magazine, Condé Nast, 30+ years'},
-        'ars technica': {'score': 82, 'reason': 'Deep tech journalism, expert audience'},
-        'recode': {'score': 81, 'reason': 'Tech industry authority, Vox Media'},
-        
-        # Established General News
-        'axios': {'score': 84, 'reason': 'DC insider news, professional readership'},
-        'politico': {'score': 85, 'reason': 'Political news authority, required reading in DC'},
-        'the hill': {'score': 80, 'reason': 'Congressional news standard'},
-        'npr': {'score': 86, 'reason': 'National public radio, 1,000+ member stations'},
-        'pbs': {'score': 84, 'reason': 'Public broadcasting, trusted journalism'},
-        'time': {'score': 82, 'reason': 'Historic news magazine, 100+ years'},
-        'newsweek': {'score': 78, 'reason': 'Established news magazine'},
-        'abc news': {'score': 83, 'reason': 'Major broadcast network'},
-        'nbc news': {'score': 83, 'reason': 'Major broadcast network'},
-        'cbs news': {'score': 83, 'reason': 'Major broadcast network'},
-        'fox news': {'score': 81, 'reason': 'Major cable news network'},
-        'usa today': {'score': 80, 'reason': 'National newspaper, wide circulation'},
-        
-        # Climate/Energy Leaders
-        'canary media': {'score': 78, 'reason': 'Climate journalism leader, professional audience'},
-        'utility dive': {'score': 79, 'reason': 'Utility industry standard'},
-        'greentech media': {'score': 80, 'reason': 'Clean energy authority (now Wood Mackenzie)'},
-        'renewable energy world': {'score': 77, 'reason': 'Renewable energy industry standard'},
-        'energy storage news': {'score': 76, 'reason': 'Battery/storage industry publication'},
-        
-        # Other Major Industry Publications
-        'the information': {'score': 82, 'reason': 'Premium tech journalism, insider access'},
-        'protocol': {'score': 78, 'reason': 'Tech policy authority'},
-        'venturebeat': {'score': 79, 'reason': 'Tech/AI journalism, 20+ years'},
-        'zdnet': {'score': 77, 'reason': 'Enterprise tech authority'},
-        'cnet': {'score': 78, 'reason': 'Consumer tech authority, 25+ years'},
-    }
-    
-    # TIER 3: Respected Niche/Trade Publications
-    # Criteria: Established in niche, cited by peers, 5-20 reporters
-    tier3_sources = {
-        # Tech/Digital Media
-        'engadget': {'score': 55, 'reason': 'Consumer tech blog, 20+ years'},
-        'gizmodo': {'score': 54, 'reason': 'Tech/science blog, Gizmodo Media'},
-        'mashable': {'score': 55, 'reason': 'Digital culture publication'},
-        'the next web': {'score': 52, 'reason': 'Tech industry blog'},
-        '9to5mac': {'score': 50, 'reason': 'Apple news specialist'},
-        'macrumors': {'score': 48, 'reason': 'Apple news community'},
-        
-        # Climate/Energy Niche
-        'cleantechnica': {'score': 55, 'reason': 'Clean tech blog, respected in community'},
-        'electrek': {'score': 56, 'reason': 'EV news leader, 9to5 network'},
-        'green car reports': {'score': 53, 'reason': 'EV/hybrid specialist'},
-        'inside evs': {'score': 54, 'reason': 'EV industry coverage'},
-        'pv magazine': {'score': 52, 'reason': 'Solar industry publication'},
-        'solar power world': {'score': 51, 'reason': 'Solar trade magazine'},
-        'wind power monthly': {'score': 50, 'reason': 'Wind energy trade publication'},
-        
-        # Business/Industry Trades
-        'industry week': {'score': 52, 'reason': 'Manufacturing trade publication'},
-        'automotive news': {'score': 55, 'reason': 'Auto industry trade publication'},
-        'chemical engineering': {'score': 50, 'reason': 'Chemical industry publication'},
-        'manufacturing.net': {'score': 48, 'reason': 'Manufacturing trade media'},
-        
-        # Regional/Local Major
-        'los angeles times': {'score': 58, 'reason': 'Major regional paper, 46 Pulitzers'},
-        'chicago tribune': {'score': 56, 'reason': 'Major regional paper, 27 Pulitzers'},
-        'boston globe': {'score': 56, 'reason': 'Major regional paper, 27 Pulitzers'},
-        'san francisco chronicle': {'score': 54, 'reason': 'Major regional paper'},
-        'miami herald': {'score': 53, 'reason': 'Major regional paper, 22 Pulitzers'},
-        'dallas morning news': {'score': 52, 'reason': 'Major regional paper, 9 Pulitzers'},
-    }
-    
-    # Check Tier 1
-    for source_key, data in tier1_sources.items():
-        if source_key in source_lower:
-            return {
-                'tier': 1,
-                'reach_estimate': '10M+ monthly',
-                'reach_score': data['score'],
-                'reach_label': 'VERY HIGH',
-                'reasoning': data['reason']
-            }
+    key = (start_date, end_date, store.version())
+    cached = st.session_state.get('filter_engine')
+    if cached is None or cached[0] != key:
+        with metrics.timer('ui.filter.load'):
+            engine = FilterEngine(
+                store.load_articles(start_date, end_date),
+                store.load_keyword_membership(start_date, end_date),
+                text_search=lambda term: store.search(term, start_date, end_date)
+            )
+        cached = (key, engine)
+        st.session_state['filter_engine'] = cached
+    return cached[1]
+
+
+def get_window_signature(store, start_date, end_date):
+    """Store signature of a date window (see ArticleStore.window_signature), kept until the data changes"""
+    key = (start_date, end_date, store.version())
+    cached = st.session_state.get('window_signature')
+    if cached is None or cached[0] != key:
+        cached = (key, store.window_signature(start_date, end_date))
+        st.session_state['window_signature'] = cached
+    return cached[1]
+
+
+# Download button label per export format
+EXPORT_LABELS = {'csv': ('📄', 'CSV'), 'json': ('📋', 'JSON'), 'ndjson': ('🧾', 'NDJSON'), 'parquet': ('🗃️', 'Parquet')}
+
+
+def render_downloads(df, fingerprint, file_stem, label, key):
+    """
+    One download button per export format
+    Payloads are built only when a button is clicked, in row chunks, and
+    cached by the fingerprint of whatever produced df. label is formatted
+    with the format's name, e.g. "Download {}".
+    """
+    formats = available_formats()
+    for column, fmt in zip(st.columns(len(formats)), formats):
+        mime, extension = EXPORT_FORMATS[fmt]
+        icon, name = EXPORT_LABELS[fmt]
+        with column:
+            st.download_button(
+                label=f"{icon} {label.format(name)}",
+                data=lambda fmt=fmt: export_cache.get(fingerprint, fmt, lambda: export_bytes(df, fmt)),
+                file_name=f"{file_stem}.{extension}",
+                mime=mime,
+                key=f"{key}_{fmt}",
+                on_click='ignore',
+                use_container_width=True
+            )
+
+
+# Results table sort option -> (column, ascending); each is presorted once per loaded window
+RESULT_SORTS = {
+    'Newest first': ('Published_Date', False),
+    'Oldest first': ('Published_Date', True),
+    'Highest reach score': ('Reach_Score', False),
+    'Reach tier (1 first)': ('Reach_Tier', True),
+    'Source (A-Z)': ('Source', True),
+}
+RESULT_PAGE_SIZES = [25, 50, 100, 250]
+
+
+def render_results_page(engine, mask, total, fingerprint):
+    """
+    Sorted, paginated results table; only the visible page is sent to the browser
+    The page goes back to 1 whenever the filters behind fingerprint change.
+    """
+    if st.session_state.get('results_fingerprint') != fingerprint:
+        st.session_state['results_fingerprint'] = fingerprint
+        st.session_state['results_page'] = 1
     
-    # Check Tier 2
-    for source_key, data in tier2_sources.items():
-        if source_key in source_lower:
-            return {
-                'tier': 2,
-                'reach_estimate': '1M-10M monthly',
-                'reach_score': data['score'],
-                'reach_label': 'HIGH',
-                'reasoning': data['reason']
-            }
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        sort_label = st.selectbox("Sort by", options=list(RESULT_SORTS), key="results_sort")
+    with col2:
+        page_size = st.selectbox("Rows per page", options=RESULT_PAGE_SIZES, index=1, key="results_page_size")
+    page_count = max(1, -(-total // page_size))
+    st.session_state['results_page'] = min(st.session_state.get('results_page', 1), page_count)
+    with col3:
+        page_number = st.number_input("Page", min_value=1, max_value=page_count, step=1, key="results_page")
     
-    # Check Tier 3
-    for source_key, data in tier3_sources.items():
-        if source_key in source_lower:
-            return {
-                'tier': 3,
-                'reach_estimate': '100K-1M monthly',
-                'reach_score': data['score'],
-                'reach_label': 'MEDIUM',
-                'reasoning': data['reason']
-            }
+    column, ascending = RESULT_SORTS[sort_label]
+    with metrics.timer('ui.filter.page'):
+        page_df = engine.page(mask, column, ascending, page_number, page_size)
+    first_row = (page_number - 1) * page_size
+    st.caption(f"Showing {first_row + 1}–{first_row + len(page_df)} of {total} articles (page {page_number} of {page_count})")
     
-    # Default: Tier 4 (Unknown/Small sources)
-    return {
-        'tier': 4,
-        'reach_estimate': '<100K monthly',
-        'reach_score': 20,
-        'reach_label': 'LOW',
-        'reasoning': 'Smaller outlet or unknown source'
-    }
+    st.dataframe(
+        page_df[['Title', 'Source', 'Reach_Tier', 'Reach_Label', 'Source_Category', 'Keyword', 'Published', 'URL']],
+        column_config={
+            "URL": st.column_config.LinkColumn("URL"),
+            "Title": st.column_config.TextColumn("Title", width="large"),
+            "Reach_Tier": st.column_config.NumberColumn("Tier", help="1=Very High, 2=High, 3=Medium, 4=Low"),
+            "Reach_Label": st.column_config.TextColumn("Reach"),
+        },
+        hide_index=True,
+        use_container_width=True
+    )
 
 
-def parse_boolean_search(search_term):
+def saved_search_counts(store, queries):
     """
-    Parse boolean search into Google News format
-    Supports: AND, OR, NOT operators
-    Examples:
-    - "climate AND policy" → "climate policy"
-    - "tesla OR spacex" → "tesla OR spacex"  
-    - "AI NOT crypto" → "AI -crypto"
+    Stored articles matching each saved query, kept until the stored data changes
+    Queries FTS5 cannot express fall back to scanning the history, so they
+    are counted once per store version rather than on every rerun.
+    Returns: dict of query -> article count
     """
-    # Replace NOT with - (Google's exclude operator)
-    search_term = search_term.replace(' NOT ', ' -')
-    # AND is implicit in Google, but we keep it for clarity
-    search_term = search_term.replace(' AND ', ' ')
-    # OR stays as is (Google supports OR)
-    return search_term
+    version = store.version()
+    cached = st.session_state.get('saved_search_counts')
+    if cached is None or cached[0] != version:
+        cached = (version, {})
+        st.session_state['saved_search_counts'] = cached
+    counts = cached[1]
+    for query in queries:
+        if query not in counts:
+            counts[query] = len(store.find_articles(query))
+    return counts
 
 
-@st.cache_data(ttl=3600)  # Cache for 1 hour
-def fetch_google_news_rss(keyword):
-    """Fetch articles from Google News RSS for a specific keyword"""
-    articles = []
-    # Parse boolean operators
-    parsed_keyword = parse_boolean_search(keyword)
-    url = f"https://news.google.com/rss/search?q={quote_plus(parsed_keyword)}&hl=en-US&gl=US&ceid=US:en"
-    
-    try:
-        feed = feedparser.parse(url)
+def render_saved_searches(store, search_term):
+    """
+    Saved search queries: how many stored articles each matches, loading one
+    into the search box, and saving the current search
+    Searches run against the stored history only, never the network.
+    """
+    saved = store.saved_searches()
+    with st.expander(f"💾 Saved Searches ({len(saved)})", expanded=False):
+        if saved:
+            counts = saved_search_counts(store, saved.values())
+            st.dataframe(pd.DataFrame([
+                {'Name': name, 'Query': query, 'Articles in history': counts[query]}
+                for name, query in saved.items()
+            ]), hide_index=True, use_container_width=True)
+            col1, col2, col3 = st.columns([2, 1, 1])
+            with col1:
+                selected = st.selectbox("Saved search", options=list(saved), key="saved_search_name")
+            with col2:
+                st.button("Use", use_container_width=True, key="saved_search_use",
+                          on_click=lambda: st.session_state.update(search_term=saved[selected]))
+            with col3:
+                st.button("Delete", use_container_width=True, key="saved_search_delete",
+                          on_click=lambda: store.delete_search(selected))
         
-        for entry in feed.entries:
-            # Parse the published date
-            published_str = entry.get('published', '')
-            published_date = None
-            
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            name = st.text_input("Save the current search as", key="saved_search_new_name",
+                                 placeholder="e.g. EU policy")
+        with col2:
+            save_clicked = st.button("Save", use_container_width=True, key="saved_search_save",
+                                     disabled=not (search_term and name))
+        if save_clicked:
             try:
-                if published_str:
-                    published_date = date_parser.parse(published_str)
-            except:
-                pass
-            
-            source_name = entry.get('source', {}).get('title', 'Unknown')
-            reach_data = calculate_reach_tier(source_name)
-            
-            article = {
-                'Keyword': keyword,
-                'Title': entry.get('title', ''),
-                'URL': entry.get('link', ''),
-                'Published': published_str,
-                'Published_Date': published_date,
-                'Source': source_name,
-                'Source_Category': categorize_source(source_name),
-                'Reach_Tier': reach_data['tier'],
-                'Reach_Estimate': reach_data['reach_estimate'],
-                'Reach_Score': reach_data['reach_score'],
-                'Reach_Label': reach_data['reach_label'],
-                'Reach_Reasoning': reach_data['reasoning'],
-                'Description': entry.get('summary', '')
-            }
-            articles.append(article)
-    except Exception as e:
-        st.error(f"Error fetching {keyword}: {e}")
-    
-    return articles
+                store.save_search(name.strip(), search_term)
+                st.rerun()
+            except QuerySyntaxError as e:
+                st.error(str(e))
 
 
-def collect_all_feeds(progress_bar, status_text, keywords):
-    """Collect RSS feeds for all keywords"""
-    all_articles = []
-    total_keywords = len(keywords)
-    
-    for i, keyword in enumerate(keywords):
-        status_text.text(f"Fetching articles for: {keyword}")
-        articles = fetch_google_news_rss(keyword)
-        all_articles.extend(articles)
-        progress_bar.progress((i + 1) / total_keywords)
-        time.sleep(1)  # Be nice to Google's servers
-    
-    # Remove duplicates based on URL
-    df = pd.DataFrame(all_articles)
-    if not df.empty:
-        df = df.drop_duplicates(subset=['URL'], keep='first')
-    
-    return df
+def format_bytes(size):
+    """Human-readable byte count"""
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def render_performance_panel():
+    """Sidebar panel with stage timings and fetch counters for this server process"""
+    with st.sidebar.expander("⏱️ Performance", expanded=False):
+        snapshot = metrics.snapshot()
+        counters = snapshot['counters']
+        hit_rate = cache_hit_rate(counters)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Feed requests", counters.get('feed.requests', 0))
+            st.metric("Bytes fetched", format_bytes(counters.get('feed.bytes', 0)))
+        with col2:
+            st.metric("Cache hit rate", f"{hit_rate:.0%}" if hit_rate is not None else "N/A")
+            st.metric("Fetch errors", counters.get('feed.errors', 0))
+        
+        if snapshot['stages']:
+            stage_df = pd.DataFrame([
+                {
+                    'Stage': stage,
+                    'Runs': stats['count'],
+                    'p50 ms': stats['p50'] * 1000,
+                    'p90 ms': stats['p90'] * 1000,
+                    'p99 ms': stats['p99'] * 1000,
+                    'Total s': stats['total']
+                }
+                for stage, stats in snapshot['stages'].items()
+            ])
+            st.dataframe(stage_df.round(2), hide_index=True, use_container_width=True)
+        else:
+            st.caption("No timings recorded yet")
+        
+        st.caption(f"Since {datetime.fromtimestamp(snapshot['since']).strftime('%Y-%m-%d %H:%M:%S')}")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("JSON", data=metrics.to_json(), file_name="rss_collector_metrics.json",
+                               mime="application/json")
+        with col2:
+            st.download_button("Prometheus", data=metrics.to_prometheus(), file_name="rss_collector_metrics.prom",
+                               mime="text/plain")
+        if st.button("Reset metrics"):
+            metrics.reset()
+            st.rerun()
 
 
 def main():
@@ -362,6 +272,11 @@ def main():
     st.title("📰 RSS Feed Collector")
     st.markdown("Collect and analyze RSS feeds from Google News with custom keywords and boolean search")
     
+    # Apply source registry edits to the stored history before anything reads it
+    reclassified = get_article_store().sync_source_registry()
+    if reclassified:
+        st.toast(f"Source registry updated: reclassified {reclassified} stored articles")
+    
     # Sidebar
     st.sidebar.header("⚙️ Keyword Management")
     
@@ -377,8 +292,17 @@ def main():
         """)
         new_keyword = st.text_input("Enter keyword to monitor:", key="new_keyword_input", 
                                     placeholder="e.g., climate AND policy")
+        keyword_error = None
+        if new_keyword and new_keyword.strip():
+            try:
+                parse_query(new_keyword)
+                st.caption(f"Google News query: `{parse_boolean_search(new_keyword)}`")
+            except QuerySyntaxError as e:
+                keyword_error = str(e)
         if st.button("Add Keyword"):
-            if new_keyword and new_keyword.strip():
+            if keyword_error:
+                st.error(keyword_error)
+            elif new_keyword and new_keyword.strip():
                 if new_keyword.strip() not in st.session_state['custom_keywords']:
                     st.session_state['custom_keywords'].append(new_keyword.strip())
                     st.success(f"Added: {new_keyword}")
@@ -441,11 +365,25 @@ def main():
             st.subheader("Current Keywords")
             st.write(f"Monitoring **{len(st.session_state['custom_keywords'])}** keywords:")
             
-            # Display keywords in a nice format
+            # Display keywords in a nice format, with what their last collection found
+            # and, for keywords answered from broader ones, which results they are matched in
+            runs = get_article_store().keyword_runs()
+            plan = plan_queries(st.session_state['custom_keywords'])
+            merged = plan.merged()
             keyword_cols = st.columns(3)
             for i, keyword in enumerate(st.session_state['custom_keywords']):
                 with keyword_cols[i % 3]:
-                    st.markdown(f"✓ {keyword}")
+                    if keyword in runs.index:
+                        line = f"✓ {keyword} · **{runs.at[keyword, 'New_Since_Last_Run']}** new since last run"
+                    else:
+                        line = f"✓ {keyword} · not collected yet"
+                    if keyword in merged:
+                        line += f" · 🔗 matched within {', '.join(plan.sources[keyword])}"
+                    st.markdown(line)
+            
+            if merged:
+                st.caption(f"🔗 {len(plan.requests)} feed requests cover all {len(plan.sources)} keywords: "
+                           f"{', '.join(merged)} will be matched within broader keywords' results")
             
             st.divider()
         
@@ -477,8 +415,11 @@ def main():
                 progress_bar = st.progress(0)
                 status_text = st.empty()
                 
+                store = get_article_store()
+                stored_before = store.count()
                 with st.spinner("Collecting RSS feeds..."):
-                    df = collect_all_feeds(progress_bar, status_text, st.session_state['custom_keywords'])
+                    df, membership = collect_all_feeds(progress_bar, status_text, st.session_state['custom_keywords'], store=store)
+                new_articles = store.count() - stored_before
                 
                 progress_bar.empty()
                 status_text.empty()
@@ -491,7 +432,21 @@ def main():
                     st.session_state['collection_time'] = datetime.now()
                     st.session_state['keywords_used'] = st.session_state['custom_keywords'].copy()
                     
-                    st.success(f"✅ Collection complete! Found {len(df)} unique articles")
+                    st.success(f"✅ Collection complete! Found {len(df)} unique articles "
+                               f"(**{new_articles} new since last run**, {store.count()} in history)")
+                    
+                    # Known articles were read back from the store, not enriched again
+                    with st.expander("🆕 New since last run, by keyword"):
+                        runs = store.keyword_runs().reindex(st.session_state['custom_keywords'])
+                        st.dataframe(
+                            runs[['New_Since_Last_Run', 'Latest_Published']].rename_axis('Keyword').reset_index(),
+                            column_config={
+                                "New_Since_Last_Run": st.column_config.NumberColumn("New since last run"),
+                                "Latest_Published": st.column_config.DatetimeColumn("Latest article"),
+                            },
+                            hide_index=True,
+                            use_container_width=True
+                        )
                     
                     # Display summary
                     st.subheader("📊 Summary")
@@ -537,19 +492,18 @@ def main():
                     
                     # Articles by keyword
                     st.subheader("Articles by Keyword")
-                    keyword_counts = df['Keyword'].value_counts()
-                    st.bar_chart(keyword_counts)
+                    st.bar_chart(keyword_counts(membership))
                     
                     # Articles by source category
                     st.subheader("Articles by Source Category")
-                    category_counts = df['Source_Category'].value_counts()
+                    category_counts = observed_counts(df['Source_Category'])
                     st.bar_chart(category_counts)
                     
                     # Show breakdown of categories
                     st.subheader("📂 Source Category Breakdown")
                     for category in sorted(df['Source_Category'].unique()):
                         with st.expander(f"{category} ({len(df[df['Source_Category'] == category])} articles)"):
-                            sources_in_category = df[df['Source_Category'] == category]['Source'].value_counts()
+                            sources_in_category = observed_counts(df[df['Source_Category'] == category]['Source'])
                             st.write(sources_in_category)
                     
                     # Display articles
@@ -571,58 +525,45 @@ def main():
                     
                     # Download buttons
                     st.subheader("💾 Download Data")
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        csv = df.to_csv(index=False).encode('utf-8')
-                        st.download_button(
-                            label="📄 Download CSV",
-                            data=csv,
-                            file_name=f"rss_feed_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                            mime="text/csv",
-                            use_container_width=True
-                        )
-                    
-                    with col2:
-                        json_str = df.to_json(orient='records', indent=2)
-                        st.download_button(
-                            label="📋 Download JSON",
-                            data=json_str,
-                            file_name=f"rss_feed_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                            mime="application/json",
-                            use_container_width=True
-                        )
+                    render_downloads(
+                        df, filter_fingerprint('collection', st.session_state['collection_time']),
+                        f"rss_feed_{datetime.now().strftime('%Y%m%d_%H%M%S')}", "Download {}", key="download_collection"
+                    )
     
     with tab2:
         st.header("Search & Filter Collected Data")
         
-        if 'articles_df' not in st.session_state:
+        store = get_article_store()
+        if store.count() == 0:
             st.info("👈 Please collect articles first using the 'Collect Feeds' tab")
         else:
-            df = st.session_state['articles_df']
-            collection_time = st.session_state['collection_time']
+            collection_time = store.last_collected_at()
             
             st.text(f"Last collected: {collection_time.strftime('%Y-%m-%d %H:%M:%S')}")
             
             # Show total articles
-            st.metric("Total Articles Collected", len(df))
+            st.metric("Total Articles Collected", store.count())
             
             st.divider()
             
             # Search
             st.subheader("🔍 Text Search")
-            search_term = st.text_input("Search in titles and descriptions", "", placeholder="Type keywords to search...")
+            search_term = st.text_input(
+                "Search in titles and descriptions", "",
+                key="search_term",
+                placeholder="e.g. solar AND (policy OR tariff) NOT \"rooftop\"",
+                help="Words match as prefixes. Supports AND, OR, NOT, parentheses and \"exact phrases\"; "
+                     "OR binds tighter than AND, as in Google."
+            )
+            render_saved_searches(store, search_term)
             
             # Date filter
             st.subheader("📅 Date Filter")
             
-            # Calculate min and max dates from data
-            valid_dates = df[df['Published_Date'].notna()]['Published_Date']
-            if len(valid_dates) > 0:
-                # Convert to datetime and remove timezone for date picker
-                valid_dates_dt = pd.to_datetime(valid_dates).dt.tz_localize(None)
-                min_date = valid_dates_dt.min().date()
-                max_date = valid_dates_dt.max().date()
+            # Calculate min and max dates from the stored history
+            date_bounds = store.date_bounds()
+            if date_bounds is not None:
+                min_date, max_date = date_bounds
             else:
                 min_date = datetime.now().date() - timedelta(days=30)
                 max_date = datetime.now().date()
@@ -666,7 +607,7 @@ def main():
             with col4:
                 button_type = "primary" if st.session_state['filter_quick_filter'] == 'all' else "secondary"
                 if st.button("All time", key="filter_all", type=button_type):
-                    if len(valid_dates) > 0:
+                    if date_bounds is not None:
                         st.session_state['filter_start_date'] = min_date
                         st.session_state['filter_end_date'] = max_date
                         st.session_state['filter_quick_filter'] = 'all'
@@ -717,6 +658,11 @@ def main():
             start_date = st.session_state['filter_start_date']
             end_date = st.session_state['filter_end_date']
             
+            # Load the selected window from the article store (cached across reruns)
+            engine = get_filter_engine(store, start_date, end_date)
+            df = engine.df
+            window_keywords = keyword_counts(engine.membership).index.tolist()
+            
             st.divider()
             
             # Keyword filter
@@ -739,60 +685,35 @@ def main():
             
             selected_keywords = st.multiselect(
                 "Filter by keyword",
-                options=df['Keyword'].unique().tolist(),
-                default=df['Keyword'].unique().tolist()
+                options=window_keywords,
+                default=window_keywords
             )
             
             # Source category filter
             selected_categories = st.multiselect(
                 "Filter by source category",
-                options=sorted(df['Source_Category'].unique().tolist()),
+                options=engine.distinct('Source_Category'),
                 default=[]
             )
             
             # Source filter
             selected_sources = st.multiselect(
                 "Filter by specific source",
-                options=sorted(df['Source'].unique().tolist()),
+                options=engine.distinct('Source'),
                 default=[]
             )
             
-            # Apply filters
-            filtered_df = df.copy()
-            
-            # Date filter
-            if 'Published_Date' in filtered_df.columns:
-                # Convert start and end dates to datetime for comparison
-                start_datetime = pd.Timestamp(start_date)
-                end_datetime = pd.Timestamp(end_date) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
-                
-                # Filter by date, keeping articles without dates
-                date_mask = filtered_df['Published_Date'].isna()
-                if filtered_df['Published_Date'].notna().any():
-                    # Remove timezone info for comparison if present
-                    filtered_df['Published_Date_Compare'] = pd.to_datetime(filtered_df['Published_Date']).dt.tz_localize(None)
-                    date_mask = date_mask | (
-                        (filtered_df['Published_Date_Compare'] >= start_datetime) & 
-                        (filtered_df['Published_Date_Compare'] <= end_datetime)
-                    )
-                filtered_df = filtered_df[date_mask]
-            
-            if search_term:
-                mask = (filtered_df['Title'].str.contains(search_term, case=False, na=False) | 
-                       filtered_df['Description'].str.contains(search_term, case=False, na=False))
-                filtered_df = filtered_df[mask]
-            
-            if selected_tiers_values:
-                filtered_df = filtered_df[filtered_df['Reach_Tier'].isin(selected_tiers_values)]
-            
-            if selected_keywords:
-                filtered_df = filtered_df[filtered_df['Keyword'].isin(selected_keywords)]
-            
-            if selected_categories:
-                filtered_df = filtered_df[filtered_df['Source_Category'].isin(selected_categories)]
-            
-            if selected_sources:
-                filtered_df = filtered_df[filtered_df['Source'].isin(selected_sources)]
+            # Apply filters (the date window was applied by the store query);
+            # only the stages whose widgets changed are recomputed
+            with metrics.timer('ui.filter.apply'):
+                before_search_mask, filtered_mask = engine.apply(
+                    search_term=search_term,
+                    tiers=selected_tiers_values,
+                    keywords=selected_keywords,
+                    categories=selected_categories,
+                    sources=selected_sources
+                )
+            filtered_df = df[filtered_mask]
             
             # Display results
             st.divider()
@@ -801,7 +722,7 @@ def main():
             if search_term:
                 st.success(f"🔍 **Search Active:** Showing results for '{search_term}'")
             
-            st.subheader(f"📊 Results: {len(filtered_df)} articles")
+            st.subheader(f"📊 Results: {len(filtered_df)} articles ({filtered_df['Story_ID'].nunique()} stories)")
             
             # Show active filters
             active_filters = []
@@ -810,7 +731,7 @@ def main():
             if selected_tiers_values:
                 tier_names = [f"Tier {t}" for t in selected_tiers_values]
                 active_filters.append(f"Reach: {', '.join(tier_names)}")
-            if len(selected_keywords) < len(df['Keyword'].unique()):
+            if len(selected_keywords) < len(window_keywords):
                 active_filters.append(f"Keywords: {len(selected_keywords)} selected")
             if selected_categories:
                 active_filters.append(f"Categories: {', '.join(selected_categories)}")
@@ -825,29 +746,9 @@ def main():
                 # Show search statistics if search is active
                 if search_term:
                     search_matches = len(filtered_df)
-                    total_before_search = len(df)
-                    
-                    # Apply all filters except search to see search impact
-                    temp_df = df.copy()
-                    if 'Published_Date' in temp_df.columns:
-                        start_datetime = pd.Timestamp(start_date)
-                        end_datetime = pd.Timestamp(end_date) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
-                        date_mask = temp_df['Published_Date'].isna()
-                        if temp_df['Published_Date'].notna().any():
-                            temp_df['Published_Date_Compare'] = pd.to_datetime(temp_df['Published_Date']).dt.tz_localize(None)
-                            date_mask = date_mask | (
-                                (temp_df['Published_Date_Compare'] >= start_datetime) & 
-                                (temp_df['Published_Date_Compare'] <= end_datetime)
-                            )
-                        temp_df = temp_df[date_mask]
-                    if selected_keywords:
-                        temp_df = temp_df[temp_df['Keyword'].isin(selected_keywords)]
-                    if selected_categories:
-                        temp_df = temp_df[temp_df['Source_Category'].isin(selected_categories)]
-                    if selected_sources:
-                        temp_df = temp_df[temp_df['Source'].isin(selected_sources)]
                     
-                    articles_before_search = len(temp_df)
+                    # All filters except search, from the same pass
+                    articles_before_search = int(before_search_mask.sum())
                     
                     col1, col2, col3 = st.columns(3)
                     with col1:
@@ -862,7 +763,7 @@ def main():
                 
                 # Show category breakdown of results
                 st.subheader("📂 Results by Category")
-                category_counts = filtered_df['Source_Category'].value_counts()
+                category_counts = observed_counts(filtered_df['Source_Category'])
                 col1, col2 = st.columns([2, 1])
                 with col1:
                     st.bar_chart(category_counts)
@@ -891,28 +792,14 @@ def main():
                     top_sources = filtered_df.nlargest(10, 'Reach_Score')[['Source', 'Reach_Score', 'Reach_Label', 'Reach_Reasoning']]
                     st.dataframe(top_sources, hide_index=True, use_container_width=True)
                 
-                display_df = filtered_df[['Title', 'Source', 'Reach_Tier', 'Reach_Label', 'Source_Category', 'Keyword', 'Published', 'URL']]
+                # The filter state: a change returns the table to page 1 and keys cached downloads
+                fingerprint = filter_fingerprint(store.version(), start_date, end_date, search_term, selected_tiers_values,
+                                                 selected_keywords, selected_categories, selected_sources)
+                render_results_page(engine, filtered_mask, len(filtered_df), fingerprint)
                 
-                st.dataframe(
-                    display_df,
-                    column_config={
-                        "URL": st.column_config.LinkColumn("URL"),
-                        "Title": st.column_config.TextColumn("Title", width="large"),
-                        "Reach_Tier": st.column_config.NumberColumn("Tier", help="1=Very High, 2=High, 3=Medium, 4=Low"),
-                        "Reach_Label": st.column_config.TextColumn("Reach"),
-                    },
-                    hide_index=True,
-                    use_container_width=True
-                )
-                
-                # Download filtered results
-                csv = filtered_df.to_csv(index=False).encode('utf-8')
-                st.download_button(
-                    label="📄 Download Filtered Results (CSV)",
-                    data=csv,
-                    file_name=f"filtered_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv"
-                )
+                # Download filtered results, built on demand and cached per filter state
+                render_downloads(filtered_df, fingerprint, f"filtered_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                                 "Download Filtered Results ({})", key="download_filtered")
             else:
                 if search_term:
                     st.error(f"❌ **No Results Found for '{search_term}'**")
@@ -935,20 +822,16 @@ def main():
     with tab3:
         st.header("📊 Summary & Analysis")
         
-        if 'articles_df' not in st.session_state:
+        store = get_article_store()
+        if store.count() == 0:
             st.info("👈 Please collect articles first using the 'Collect Feeds' tab")
         else:
-            df = st.session_state['articles_df']
-            collection_time = st.session_state.get('collection_time', datetime.now())
-            
             st.subheader("🗓️ Select Time Period for Analysis")
             
-            # Calculate date range from data
-            valid_dates = df[df['Published_Date'].notna()]['Published_Date']
-            if len(valid_dates) > 0:
-                valid_dates_dt = pd.to_datetime(valid_dates).dt.tz_localize(None)
-                min_date = valid_dates_dt.min().date()
-                max_date = valid_dates_dt.max().date()
+            # Calculate date range from the stored history
+            date_bounds = store.date_bounds()
+            if date_bounds is not None:
+                min_date, max_date = date_bounds
             else:
                 min_date = datetime.now().date() - timedelta(days=30)
                 max_date = datetime.now().date()
@@ -997,7 +880,7 @@ def main():
             with col5:
                 button_type = "primary" if st.session_state['analysis_quick_filter'] == 'all' else "secondary"
                 if st.button("All data", key="sum_all", type=button_type):
-                    if len(valid_dates) > 0:
+                    if date_bounds is not None:
                         st.session_state['analysis_start_date'] = min_date
                         st.session_state['analysis_end_date'] = max_date
                         st.session_state['analysis_quick_filter'] = 'all'
@@ -1050,24 +933,21 @@ def main():
             
             st.divider()
             
-            # Filter data by date range
-            filtered_df = df.copy()
-            if 'Published_Date' in filtered_df.columns:
-                start_datetime = pd.Timestamp(analysis_start)
-                end_datetime = pd.Timestamp(analysis_end) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
-                
-                date_mask = filtered_df['Published_Date'].isna()
-                if filtered_df['Published_Date'].notna().any():
-                    filtered_df['Published_Date_Compare'] = pd.to_datetime(filtered_df['Published_Date']).dt.tz_localize(None)
-                    date_mask = date_mask | (
-                        (filtered_df['Published_Date_Compare'] >= start_datetime) & 
-                        (filtered_df['Published_Date_Compare'] <= end_datetime)
-                    )
-                filtered_df = filtered_df[date_mask]
+            # Summaries are summed from the store's daily rollups, not the raw articles
+            with metrics.timer('ui.summary.load'):
+                rollups, keyword_rollups = store.load_rollups(analysis_start, analysis_end)
             
-            if len(filtered_df) == 0:
+            if rollups['Articles'].sum() == 0:
                 st.warning("⚠️ No articles found in the selected time period")
             else:
+                with metrics.timer('ui.summary.stats'):
+                    unique_stories, syndicated = store.story_stats(analysis_start, analysis_end)
+                    stats = rollup_stats(rollups, keyword_rollups, unique_stories, syndicated, store.load_sources())
+                total_articles = stats['total_articles']
+                top_keywords = stats['keyword_counts'].head(5).index.tolist()
+                # Identifies the window's articles for the analysis cache without loading them
+                window = get_window_signature(store, analysis_start, analysis_end)
+                
                 # AI-Powered Thematic Analysis Section
                 st.subheader("📝 Thematic Analysis")
                 
@@ -1081,112 +961,87 @@ def main():
                     - **Sentiment & Tone** (positive, negative, neutral, mixed)
                     - **Notable Patterns** (trends, controversies, developments)
                     
+                    Every article in the period is read: each day is summarized separately and the
+                    daily summaries are combined into the final analysis. Results are cached, so
+                    reopening an unchanged period uses no tokens and adding a day only reads that day.
+                    
                     [Get an API key from console.anthropic.com](https://console.anthropic.com/)
                     """)
                     
                     api_key = st.text_input("Enter your Anthropic API Key", type="password", key="anthropic_key")
+                    regenerate = st.checkbox("🔄 Regenerate instead of reusing a cached analysis", key="ai_regenerate",
+                                             help="Requests a fresh analysis of this period. Daily summaries of "
+                                                  "unchanged days are still reused, so only the final steps use tokens.")
                     
                     if api_key and st.button("🚀 Generate AI Analysis"):
-                        with st.spinner(f"Analyzing {len(filtered_df)} articles from {analysis_start.strftime('%b %d')} to {analysis_end.strftime('%b %d')} with Claude AI..."):
+                        with st.spinner(f"Analyzing {total_articles} articles from {analysis_start.strftime('%b %d')} to {analysis_end.strftime('%b %d')} with Claude AI..."):
                             try:
-                                import requests
-                                
-                                # Prepare articles for analysis using current filtered data
-                                current_articles = filtered_df.head(100)
-                                current_articles_text = f"Articles from {analysis_start.strftime('%B %d, %Y')} to {analysis_end.strftime('%B %d, %Y')}:\n\n"
+                                progress_bar = st.progress(0)
+                                status_text = st.empty()
                                 
-                                for idx, row in current_articles.iterrows():
-                                    current_articles_text += f"• [{row['Source']}] {row['Title']}\n"
+                                def on_progress(done, total, cached):
+                                    status_text.text(f"Summarized {done} of {total} article chunks")
+                                    progress_bar.progress(done / total)
                                 
-                                current_articles_text += f"\n\nTotal articles in this period: {len(filtered_df)}"
-                                current_articles_text += f"\nKeywords analyzed: {', '.join(filtered_df['Keyword'].value_counts().head(5).index.tolist())}"
-                                current_articles_text += f"\nDate range: {analysis_start.strftime('%B %d, %Y')} to {analysis_end.strftime('%B %d, %Y')}"
-                                
-                                prompt = f"""Analyze these news articles from {analysis_start.strftime('%B %d, %Y')} to {analysis_end.strftime('%B %d, %Y')}:
-
-{current_articles_text[:4000]}  
-
-Please provide a concise thematic analysis covering:
-1. **Main Themes**: What are the 3-4 dominant themes or topics in this coverage?
-2. **Key Narratives**: What stories or narratives are emerging? What angles are journalists taking?
-3. **Sentiment & Tone**: What is the overall sentiment (positive, negative, neutral, mixed)? 
-4. **Notable Patterns**: Any interesting patterns, controversies, or developments you notice?
-
-Keep the analysis to 3-4 paragraphs, written in clear professional language suitable for an executive summary. 
-Focus specifically on what happened during THIS time period ({analysis_start.strftime('%B %d')} to {analysis_end.strftime('%B %d, %Y')})."""
-                                
-                                response = requests.post(
-                                    "https://api.anthropic.com/v1/messages",
-                                    headers={
-                                        "Content-Type": "application/json",
-                                        "x-api-key": api_key,
-                                        "anthropic-version": "2023-06-01"
-                                    },
-                                    json={
-                                        "model": "claude-sonnet-4-20250514",
-                                        "max_tokens": 1500,
-                                        "messages": [
-                                            {"role": "user", "content": prompt}
-                                        ]
-                                    },
-                                    timeout=30
-                                )
-                                
-                                if response.status_code == 200:
-                                    result = response.json()
-                                    ai_analysis = result['content'][0]['text']
-                                    
-                                    st.success(f"✅ Analysis complete for {len(filtered_df)} articles!")
-                                    st.markdown("### 📝 AI Analysis Results")
-                                    st.info(f"**Period analyzed:** {analysis_start.strftime('%B %d, %Y')} to {analysis_end.strftime('%B %d, %Y')} ({len(filtered_df)} articles)")
-                                    st.markdown(ai_analysis)
-                                    
-                                    # Store in session
-                                    st.session_state['ai_analysis'] = ai_analysis
-                                    st.session_state['ai_analysis_period'] = f"{analysis_start}_{analysis_end}"
-                                    st.session_state['ai_analysis_article_count'] = len(filtered_df)
-                                else:
-                                    st.error(f"API Error {response.status_code}: {response.text}")
+                                # Every article is summarized chunk by chunk; chunks and whole
+                                # article sets analyzed before are served from the cache
+                                with metrics.timer('ui.summary.ai'):
+                                    record, from_cache = analyze_articles(api_key,
+                                                                          store.load_articles(analysis_start, analysis_end),
+                                                                          top_keywords, analysis_start, analysis_end,
+                                                                          on_progress=on_progress, refresh=regenerate,
+                                                                          window=window)
+                                progress_bar.empty()
+                                status_text.empty()
+                                metrics.count('ai.cache_hits' if from_cache else 'ai.requests')
                                 
+                                st.success(f"✅ Analysis complete for {total_articles} articles!"
+                                           + (" (cached, no tokens used)" if from_cache else ""))
+                                st.markdown("### 📝 AI Analysis Results")
+                                st.info(f"**Period analyzed:** {analysis_start.strftime('%B %d, %Y')} to {analysis_end.strftime('%B %d, %Y')} ({total_articles} articles in {record.get('chunk_count', 1)} chunks)")
+                                st.markdown(record['analysis'])
+                            
+                            except AnalysisAPIError as e:
+                                st.error(str(e))
                             except Exception as e:
                                 st.error(f"Error: {str(e)}")
                                 st.info("Please check your API key and try again.")
                 
-                # Show previously generated analysis if available
-                current_period = f"{analysis_start}_{analysis_end}"
-                if 'ai_analysis' in st.session_state and st.session_state.get('ai_analysis_period') == current_period:
+                # Show a previously generated analysis of exactly these articles, if cached
+                cached_record = cached_window_analysis(window, top_keywords, analysis_start, analysis_end)
+                if cached_record is not None:
                     st.markdown("### 📝 In Summary (AI-Generated)")
-                    article_count = st.session_state.get('ai_analysis_article_count', 'N/A')
+                    article_count = cached_record.get('article_count', 'N/A')
                     st.info(f"**Period:** {analysis_start.strftime('%B %d, %Y')} to {analysis_end.strftime('%B %d, %Y')} | **Articles analyzed:** {article_count}")
-                    st.markdown(st.session_state['ai_analysis'])
-                    st.caption("💾 Cached analysis for this period - expand section above to regenerate")
+                    st.markdown(cached_record['analysis'])
+                    st.caption("💾 Cached analysis of these exact articles - reused without new API calls until they change")
                     st.divider()
                 
                 # Statistical Summary
                 st.subheader("📊 Statistical Overview")
                 
-                # Calculate key metrics
-                total_articles = len(filtered_df)
-                unique_sources = filtered_df['Source'].nunique()
-                avg_reach_score = filtered_df['Reach_Score'].mean()
+                # Key metrics
+                unique_sources = stats['unique_sources']
+                avg_reach_score = stats['avg_reach_score']
                 
-                tier1_count = len(filtered_df[filtered_df['Reach_Tier'] == 1])
-                tier2_count = len(filtered_df[filtered_df['Reach_Tier'] == 2])
-                tier3_count = len(filtered_df[filtered_df['Reach_Tier'] == 3])
-                tier4_count = len(filtered_df[filtered_df['Reach_Tier'] == 4])
+                tier1_count = stats['tier_counts'][1]
+                tier2_count = stats['tier_counts'][2]
+                tier3_count = stats['tier_counts'][3]
+                tier4_count = stats['tier_counts'][4]
                 
-                high_tier_pct = ((tier1_count + tier2_count) / total_articles * 100) if total_articles > 0 else 0
+                high_tier_pct = stats['high_tier_pct']
                 
                 # Top sources
-                top_sources = filtered_df['Source'].value_counts().head(5)
-                top_tier1_sources = filtered_df[filtered_df['Reach_Tier'] == 1]['Source'].value_counts().head(3)
+                top_sources = stats['top_sources']
+                top_source_reach = stats['top_source_reach']
+                top_tier1_sources = stats['top_tier1_sources']
                 
-                # Keywords performance
-                keyword_counts = filtered_df['Keyword'].value_counts()
-                top_keyword = keyword_counts.index[0] if len(keyword_counts) > 0 else "N/A"
+                # Keywords performance (an article counts for every keyword it matched)
+                keyword_article_counts = stats['keyword_counts']
+                top_keyword = keyword_article_counts.index[0] if len(keyword_article_counts) > 0 else "N/A"
                 
                 # Category breakdown
-                category_counts = filtered_df['Source_Category'].value_counts()
+                category_counts = stats['category_counts']
                 top_category = category_counts.index[0] if len(category_counts) > 0 else "N/A"
                 
                 # Generate narrative summary
@@ -1197,7 +1052,7 @@ Focus specifically on what happened during THIS time period ({analysis_start.str
 ### Coverage Report: {period_str}
 
 **Overview:**
-During this {days_diff}-day period, we identified **{total_articles} articles** across **{unique_sources} unique sources** 
+During this {days_diff}-day period, we identified **{total_articles} articles** (**{unique_stories} distinct stories**) across **{unique_sources} unique sources** 
 covering your monitored keywords. The average reach score was **{avg_reach_score:.1f}/100**, indicating 
 {"strong elite media coverage" if avg_reach_score > 75 else "good professional coverage" if avg_reach_score > 50 else "broad but moderate reach coverage"}.
 
@@ -1210,9 +1065,9 @@ covering your monitored keywords. The average reach score was **{avg_reach_score
 **Top Performing Sources:**
 """
                 
-                for i, (source, count) in enumerate(top_sources.items(), 1):
-                    reach_info = filtered_df[filtered_df['Source'] == source].iloc[0]
-                    summary_text += f"\n{i}. **{source}** ({count} articles) - Tier {reach_info['Reach_Tier']}, {reach_info['Reach_Label']} reach"
+                source_rows = zip(top_sources.index, top_sources, top_source_reach['Reach_Tier'], top_source_reach['Reach_Label'])
+                for i, (source, count, tier, label) in enumerate(source_rows, 1):
+                    summary_text += f"\n{i}. **{source}** ({count} articles) - Tier {tier}, {label} reach"
                 
                 if len(top_tier1_sources) > 0:
                     summary_text += f"\n\n**Elite Media Coverage (Tier 1):**\n"
@@ -1222,12 +1077,12 @@ covering your monitored keywords. The average reach score was **{avg_reach_score
                 summary_text += f"""
 
 **Keyword Performance:**
-The keyword "**{top_keyword}**" generated the most coverage with {keyword_counts[top_keyword]} articles. 
+The keyword "**{top_keyword}**" generated the most coverage with {keyword_article_counts[top_keyword]} articles. 
 """
                 
-                if len(keyword_counts) > 1:
+                if len(keyword_article_counts) > 1:
                     summary_text += "Other notable keywords:\n"
-                    for keyword, count in list(keyword_counts.items())[1:4]:
+                    for keyword, count in list(keyword_article_counts.items())[1:4]:
                         summary_text += f"- {keyword}: {count} articles\n"
                 
                 summary_text += f"""
@@ -1261,6 +1116,9 @@ Coverage was dominated by **{top_category}** ({category_counts[top_category]} ar
                 if unique_sources < total_articles * 0.3:
                     summary_text += "- 💡 High concentration: Few sources publishing multiple articles - consider diversifying outreach\n"
                 
+                if unique_stories < total_articles:
+                    summary_text += f"- 🔁 Syndication: the {total_articles} articles carry {unique_stories} distinct stories; wire copies and near-identical headlines count once\n"
+                
                 st.markdown(summary_text)
                 
                 st.divider()
@@ -1269,15 +1127,17 @@ Coverage was dominated by **{top_category}** ({category_counts[top_category]} ar
                 st.subheader("📈 Visual Analysis")
                 
                 # Key metrics in columns
-                col1, col2, col3, col4 = st.columns(4)
+                col1, col2, col3, col4, col5 = st.columns(5)
                 
                 with col1:
                     st.metric("Total Articles", total_articles)
                 with col2:
-                    st.metric("Avg Reach Score", f"{avg_reach_score:.1f}/100")
+                    st.metric("Distinct Stories", unique_stories)
                 with col3:
-                    st.metric("Elite Coverage %", f"{high_tier_pct:.1f}%")
+                    st.metric("Avg Reach Score", f"{avg_reach_score:.1f}/100")
                 with col4:
+                    st.metric("Elite Coverage %", f"{high_tier_pct:.1f}%")
+                with col5:
                     st.metric("Articles/Day", f"{articles_per_day:.1f}")
                 
                 # Charts
@@ -1295,13 +1155,14 @@ Coverage was dominated by **{top_category}** ({category_counts[top_category]} ar
                     st.write("**Coverage by Source Category**")
                     st.bar_chart(category_counts)
                 
-                # Timeline if we have dates
-                if filtered_df['Published_Date'].notna().sum() > 0:
+                # Timeline if we have dates (counted on the precomputed day bucket)
+                day_counts = stats['day_counts']
+                if len(day_counts) > 0:
                     st.write("**Coverage Timeline**")
-                    timeline_df = filtered_df[filtered_df['Published_Date'].notna()].copy()
-                    timeline_df['Date'] = pd.to_datetime(timeline_df['Published_Date']).dt.date
-                    daily_counts = timeline_df.groupby('Date').size().reset_index(name='Articles')
-                    daily_counts = daily_counts.set_index('Date')
+                    daily_counts = pd.DataFrame(
+                        {'Articles': day_counts.to_numpy()},
+                        index=pd.Index([day_to_date(day) for day in day_counts.index], name='Date')
+                    )
                     st.line_chart(daily_counts)
                 
                 st.divider()
@@ -1311,7 +1172,7 @@ Coverage was dominated by **{top_category}** ({category_counts[top_category]} ar
                 
                 with col1:
                     st.write("**Top Keywords**")
-                    keyword_df = keyword_counts.head(10).reset_index()
+                    keyword_df = keyword_article_counts.head(10).reset_index()
                     keyword_df.columns = ['Keyword', 'Articles']
                     st.dataframe(keyword_df, hide_index=True, use_container_width=True)
                 
@@ -1319,12 +1180,14 @@ Coverage was dominated by **{top_category}** ({category_counts[top_category]} ar
                     st.write("**Top Sources**")
                     source_df = top_sources.head(10).reset_index()
                     source_df.columns = ['Source', 'Articles']
-                    # Add tier info
-                    source_df['Tier'] = source_df['Source'].apply(
-                        lambda x: filtered_df[filtered_df['Source'] == x].iloc[0]['Reach_Tier']
-                    )
+                    # Add tier info from the source dimension table
+                    source_df = source_df.join(top_source_reach['Reach_Tier'].rename('Tier'), on='Source')
                     st.dataframe(source_df, hide_index=True, use_container_width=True)
                 
+                if len(stats['syndicated_stories']) > 0:
+                    st.write("**Most Syndicated Stories** (near-identical headlines grouped as one story)")
+                    st.dataframe(stats['syndicated_stories'], hide_index=True, use_container_width=True)
+                
                 # Download summary
                 st.divider()
                 st.subheader("💾 Export Summary")
@@ -1335,6 +1198,7 @@ Coverage was dominated by **{top_category}** ({category_counts[top_category]} ar
                     'days': days_diff,
                     'total_articles': total_articles,
                     'unique_sources': unique_sources,
+                    'unique_stories': unique_stories,
                     'avg_reach_score': round(avg_reach_score, 2),
                     'tier1_count': tier1_count,
                     'tier2_count': tier2_count,
@@ -1433,7 +1297,9 @@ Coverage was dominated by **{top_category}** ({category_counts[top_category]} ar
         - Go to **"🔍 Search & Filter"** tab
         - **Filter by reach tier**: Show only Tier 1 articles
         - Filter by keyword, source category, or date
-        - Download filtered results with reach data included
+        - Sort the results table by date, reach score, tier or source and page through it
+        - Download filtered results with reach data included, as CSV, JSON, NDJSON or Parquet
+          (Parquet is the smallest and loads fastest into pandas or a warehouse)
         
         ### Source Categories Explained
         
@@ -1507,6 +1373,15 @@ Coverage was dominated by **{top_category}** ({category_counts[top_category]} ar
         - `Microsoft AND (Azure OR cloud)` - multiple OR conditions
         - `climate policy AND (EU OR Europe) NOT Brexit` - complex queries
         
+        **How queries are read:** OR binds tighter than AND, as in Google, so `climate policy OR law`
+        means climate AND (policy OR law); use parentheses when in doubt. Keywords, the search box and
+        saved searches all use the same rules, so a keyword's query finds the same stored articles
+        as it asked Google for.
+        
+        **Saved Searches:** in the Search & Filter tab, save the current search under a name. Each saved
+        search shows how many stored articles it matches across the whole history, straight from the
+        local full-text index with no feed requests, and can be loaded back into the search box.
+        
         ### Example Keywords You Can Add
         
         **Simple keywords:**
@@ -1527,13 +1402,44 @@ Coverage was dominated by **{top_category}** ({category_counts[top_category]} ar
         - **Combine operators**: "(climate OR environment) AND policy AND (Africa OR Kenya)"
         - **Filter by category** after collection to focus on specific source types
         - **Track mainstream vs trade press** separately for different perspectives
+        - **Overlapping keywords are cheap**: with "solar" in your list, "solar AND policy" or
+          "solar NOT rooftop" is not requested separately but matched against the titles and descriptions
+          of the "solar" results, saving feed requests (it may find fewer articles than its own search would).
+          Keywords using Google operators such as `when:1d` or `site:` are always requested as written
+        
+        ### Source Registry
+        Source categories and outlet reach scores come from `rss_collector/source_registry.json`.
+        Edit it (and bump its `version`) to add outlets or change scores: the change is picked up on the
+        next page load or collection, without a restart, and only stored articles from affected sources
+        are reclassified.
         
         ### Data Freshness
         - Articles are fetched from Google News RSS feeds
-        - Data is cached for 1 hour to avoid excessive requests
+        - Feeds are cached on disk for 1 hour, then revalidated with conditional requests
+        - Unchanged feeds are reused without re-downloading, even after a restart
         - Click "Collect Articles" again to refresh
         - Keywords are saved during your session only
-        - Download your data regularly to build a historical database
+        - Every collected article is kept in a local history (`rss_store/articles.db`)
+        - Search & Filter and Summary read any date range from that history without refetching
+        - Summary statistics come from daily totals the history keeps up to date as articles arrive,
+          so even long periods summarize instantly
+        
+        ### Scheduled Collection (no browser needed)
+        Collection can also run headless, e.g. from cron or a background worker:
+        
+        `python -m rss_collector collect --keywords keywords.txt --out rss_store/`
+        
+        Put one keyword per line in the file; add `--every 15` to keep collecting every 15 minutes.
+        Export stored articles without the browser, e.g.
+        `python -m rss_collector export --out articles.parquet --from 2025-01-01 --search "climate"`
+        (or `--saved "EU policy"` for a saved search).
+        The app then just reads the precollected history from `rss_store/`.
+        Add `--metrics metrics.prom` to write stage timings for Prometheus (or `.json` for JSON).
+        
+        ### Performance Panel
+        The **⏱️ Performance** expander at the bottom of the sidebar shows feed requests, cache hit rate,
+        bytes fetched and p50/p90/p99 timings for each stage (network, parsing, dates, classification,
+        and each tab's computation). Download them as JSON or Prometheus text from the same panel.
         
         ### About This Tool
         This RSS collector helps you monitor media coverage with advanced search and categorization.
@@ -1556,7 +1462,7 @@ Coverage was dominated by **{top_category}** ({category_counts[top_category]} ar
         A: Yes! After collection, expand the "Source Category Breakdown" section.
         
         **Q: How many keywords can I add?**  
-        A: As many as you want! More keywords = longer collection time (1-2 seconds per keyword).
+        A: As many as you want! Feeds are fetched in parallel but paced at one request per second to Google News; throttled requests are retried with backoff, and cached feeds skip the network entirely, so repeat collections of large watchlists stay quick.
         
         **Q: Are my keywords saved permanently?**  
         A: No, keywords reset when you refresh the page. Keep a list saved elsewhere.
@@ -1568,7 +1474,7 @@ Coverage was dominated by **{top_category}** ({category_counts[top_category]} ar
         A: The categorization uses pattern matching. Uncommon sources may not match any category.
         
         **Q: Can I customize the source categories?**  
-        A: Not in the UI, but you can modify the `categorize_source()` function in the code.
+        A: Not in the UI, but you can edit `rss_collector/source_registry.json`, which holds the category terms and each outlet's reach tier and score. Changes apply without a restart: the file is reloaded on the next interaction and stored articles from the affected sources are reclassified.
         """)
         
         st.divider()
@@ -1662,6 +1568,9 @@ Coverage was dominated by **{top_category}** ({category_counts[top_category]} ar
         
         **This type of analysis is now automatic with your CSV exports!**
         """)
+    
+    # Rendered last so it includes the timings of this run's tabs
+    render_performance_panel()
 
 
 if __name__ == "__main__":
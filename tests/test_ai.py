@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+import pytest
+
+import rss_collector.ai as ai
+from benchmarks.fixtures import article_set
+from benchmarks.server import StubMessagesServer
+from rss_collector.ai import AnalysisCache, analyze_articles, build_map_prompt, day_chunks
+from rss_collector.enrich import day_to_date
+
+
+@pytest.fixture
+def api(monkeypatch):
+    with StubMessagesServer(latency=0) as server:
+        monkeypatch.setattr(ai, 'ANTHROPIC_API_URL', server.url)
+        yield server
+
+
+@pytest.fixture(scope='module')
+def articles():
+    df, _ = article_set(2000)
+    return df, day_to_date(df['Published_Day'].min()), day_to_date(df['Published_Day'].max())
+
+
+def test_cache_hit_makes_no_request(api, articles, tmp_path):
+    df, start_date, end_date = articles
+    cache = AnalysisCache(str(tmp_path))
+    first, cached = analyze_articles('stub-key', df, ['solar'], start_date, end_date, cache=cache)
+    assert not cached and api.requests > 0
+    sent = api.requests
+    
+    again, cached = analyze_articles('stub-key', df, ['solar'], start_date, end_date, cache=cache)
+    assert cached
+    assert again['analysis'] == first['analysis']
+    assert api.requests == sent
+
+
+def test_one_more_day_only_summarizes_the_new_chunks(api, articles, tmp_path):
+    df, start_date, end_date = articles
+    last_day = df['Published_Day'].max()
+    earlier = df[df['Published_Day'] < last_day]
+    cache = AnalysisCache(str(tmp_path))
+    analyze_articles('stub-key', earlier, ['solar'], start_date, end_date - timedelta(days=1), cache=cache)
+    sent = len(api.prompts)
+    
+    record, cached = analyze_articles('stub-key', df, ['solar'], start_date, end_date, cache=cache)
+    assert not cached
+    new_chunks = [build_map_prompt(label, chunk) for label, chunk in day_chunks(df[df['Published_Day'] == last_day])]
+    map_prompts = [prompt for prompt in api.prompts[sent:] if prompt.startswith('Summarize these')]
+    assert sorted(map_prompts) == sorted(new_chunks)
+    # Beyond the new chunks only reduce steps are requested, at most one per batch plus the final one
+    reduce_steps = -(-record['chunk_count'] // ai.REDUCE_FAN_IN) + 1
+    assert len(api.prompts) - sent <= len(new_chunks) + reduce_steps
+
+
+def test_reduce_sees_every_chunk(api, articles, tmp_path, monkeypatch):
+    df, start_date, end_date = articles
+    calls = []
+    build_reduce_prompt = ai.build_reduce_prompt
+    
+    def spy(summaries, *args, **kwargs):
+        calls.append((list(summaries), kwargs.get('final', True)))
+        return build_reduce_prompt(summaries, *args, **kwargs)
+    
+    monkeypatch.setattr(ai, 'build_reduce_prompt', spy)
+    analyze_articles('stub-key', df, ['solar'], start_date, end_date, cache=AnalysisCache(str(tmp_path)))
+    
+    labels = [label for label, _ in day_chunks(df)]
+    assert len(labels) > ai.REDUCE_FAN_IN
+    first_round = [summary for summaries, _ in calls[:-(-len(labels) // ai.REDUCE_FAN_IN)] for summary in summaries]
+    assert [summary.split(':\n', 1)[0] for summary in first_round] == labels
+    # Each round of REDUCE_FAN_IN batches takes in exactly the summaries the round before produced
+    count, position = len(labels), 0
+    while count > ai.REDUCE_FAN_IN:
+        batches = -(-count // ai.REDUCE_FAN_IN)
+        reduce_round = calls[position:position + batches]
+        assert not any(final for _, final in reduce_round)
+        assert sum(len(summaries) for summaries, _ in reduce_round) == count
+        count, position = batches, position + batches
+    assert len(calls) == position + 1
+    assert calls[-1][1] and len(calls[-1][0]) == count
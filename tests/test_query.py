@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+from rss_collector.fetch import parse_boolean_search
+from rss_collector.query import QuerySyntaxError, parse_query, plan_queries, query_mask
+
+
+def test_minus_before_phrase_negates_the_phrase():
+    assert parse_query('solar -"tax credit"') == ('and', (('word', 'solar'), ('not', ('phrase', 'tax credit'))))
+    assert parse_boolean_search('solar -"tax credit"') == 'solar -"tax credit"'
+
+
+def test_minus_before_group_negates_the_group():
+    group = ('or', (('word', 'rooftop'), ('word', 'residential')))
+    assert parse_query('solar -(rooftop OR residential)') == ('and', (('word', 'solar'), ('not', group)))
+    assert parse_boolean_search('solar -(rooftop OR residential)') == 'solar -rooftop -residential'
+
+
+def test_minus_before_word_and_not_agree():
+    assert parse_query('solar -wind') == parse_query('solar NOT wind')
+    assert parse_query('solar -"tax credit"') == parse_query('solar NOT "tax credit"')
+
+
+@pytest.mark.parametrize('query', ['solar AND', 'AND solar', 'solar AND AND wind', '(solar AND) wind',
+                                   'solar OR', 'solar NOT'])
+def test_dangling_operator_raises(query):
+    with pytest.raises(QuerySyntaxError):
+        parse_query(query)
+
+
+def test_negated_phrase_is_served_with_the_phrase_excluded():
+    plan = plan_queries(['solar', 'solar -"tax credit"'])
+    assert plan.requests == ['solar']
+    articles = pd.DataFrame({'Title': ['Solar tax credit extended', 'Solar farm opens'], 'Description': ['', '']})
+    assert query_mask(articles, plan.queries['solar -"tax credit"']).tolist() == [False, True]
+
+
+@pytest.mark.parametrize('keyword', ['solar & wind', 'solar "" wind', 'solar - wind'])
+def test_keyword_with_dropped_terms_is_requested_as_written(keyword):
+    plan = plan_queries(['solar', keyword])
+    assert plan.requests == ['solar', keyword]
+    assert plan.merged() == []